@@ -65,6 +65,17 @@ DEFAULT_CONFIG = {
     "PLAYER_INFO_BACKUP_INTERVAL": 45,
     "PLAYER_INFO_BACKUP_INTERVAL_MONGO": 300,
     "PLAYER_SESSIONS_MONGODB": False,
+    "PLAYER_RESUME_CONCURRENCY": 20,
+    "PLAYER_RESUME_NODE_CONCURRENCY": 5,
+    "PLAYER_RESUME_SHARD_RATE": 60,
+    "VOICE_RECONNECT_SHARD_RATE": 60,
+    "PLAYER_MIGRATION_BATCH_SIZE": 10,
+    "NODE_AUTO_DRAIN_CPU": 0,
+    "NODE_AUTO_DRAIN_FRAME_LOSS": 0,
+    "NODE_AUTO_DRAIN_MEMORY": 0,
+    "NODE_AUTO_DRAIN_PERCENT": 25,
+    "POOL_WORKERS": 0,
+    "POOL_WORKER_HEARTBEAT_TIMEOUT": 60,
     "QUEUE_MAX_ENTRIES": 0,
     "ENABLE_DEFER_TYPING": True,
     "VOICE_CHANNEL_LATENCY_RECONNECT": 200,
@@ -72,6 +83,17 @@ DEFAULT_CONFIG = {
     "PLAYLIST_CACHE_TTL": 1800,
     "USE_YTM_TRACKINFO_SCROBBLE": False,
     "ENABLE_SONGREQUEST_MENTION": True,
+    "HEDGED_SEARCH": False,
+    "HEDGED_SEARCH_PROVIDERS": 3,
+    "HEDGED_SEARCH_DELAY": 300,
+    "RECOMMENDATION_CACHE_SIZE": 2000,
+    "RECOMMENDATION_CACHE_TTL": 21600,
+    "SCROBBLE_METADATA_CACHE_SIZE": 50000,
+    "SCROBBLE_METADATA_CACHE_TTL": 2592000,
+    "LOADTRACKS_CACHE_SIZE": 2000,
+    "LOADTRACKS_CACHE_TTL": 600,
+    "LAVALINK_CONNECTOR_LIMIT": 200,
+    "LAVALINK_CONNECT_CONCURRENCY": 4,
 
     ##############################################
     ### Sistema de música - Suporte ao spotify ###
@@ -89,6 +111,8 @@ DEFAULT_CONFIG = {
     "RPC_PUBLIC_URL": "",
     "ENABLE_RPC_COMMAND": False,
     "ENABLE_RPC_AUTH": False,
+    "METRICS_AUTH_TOKEN": "",
+    "METRICS_LOOP_LAG_INTERVAL": 500,
 
     ##################################################
     ### Sistema de música - Local lavalink stuffs: ###
@@ -100,6 +124,9 @@ DEFAULT_CONFIG = {
     "LAVALINK_INITIAL_RAM": 30,
     "LAVALINK_RAM_LIMIT": 120,
     "LAVALINK_CPU_CORES": 2,
+    "LAVALINK_AUTO_TUNE": False,
+    "LAVALINK_INSTANCES": 1,
+    "LAVALINK_HEALTH_CHECK_INTERVAL": 30,
     "LAVALINK_FILE_URL": "https://github.com/zRitsu/LL-binaries/releases/download/0.0.1/Lavalink.jar",
     "SEARCH_PROVIDERS": "scsearch",
     "PREFER_YOUTUBE_NATIVE_PLAYBACK": True,
@@ -197,6 +224,8 @@ def load_config():
         "LAVALINK_INITIAL_RAM",
         "LAVALINK_RAM_LIMIT",
         "LAVALINK_CPU_CORES",
+        "LAVALINK_INSTANCES",
+        "LAVALINK_HEALTH_CHECK_INTERVAL",
         "USER_FAV_MAX_NAME_LENGTH",
         "USER_FAV_MAX_URL_LENGTH",
         "MAX_USER_INTEGRATIONS",
@@ -207,6 +236,17 @@ def load_config():
         "PREFIXED_POOL_TIMEOUT",
         "PLAYER_INFO_BACKUP_INTERVAL",
         "PLAYER_INFO_BACKUP_INTERVAL_MONGO",
+        "PLAYER_RESUME_CONCURRENCY",
+        "PLAYER_RESUME_NODE_CONCURRENCY",
+        "PLAYER_RESUME_SHARD_RATE",
+        "VOICE_RECONNECT_SHARD_RATE",
+        "PLAYER_MIGRATION_BATCH_SIZE",
+        "NODE_AUTO_DRAIN_CPU",
+        "NODE_AUTO_DRAIN_FRAME_LOSS",
+        "NODE_AUTO_DRAIN_MEMORY",
+        "NODE_AUTO_DRAIN_PERCENT",
+        "POOL_WORKERS",
+        "POOL_WORKER_HEARTBEAT_TIMEOUT",
         "LAVALINK_RECONNECT_RETRIES",
         "QUEUE_MAX_ENTRIES",
         "VOICE_CHANNEL_LATENCY_RECONNECT",
@@ -217,6 +257,17 @@ def load_config():
         "SPOTIFY_PLAYLIST_EXTRA_PAGE_LIMIT",
         "BOT_ADD_REMOVE_LOG_CHANNEL_ID",
         "YOUTUBE_TRACK_COOLDOWN",
+        "METRICS_LOOP_LAG_INTERVAL",
+        "HEDGED_SEARCH_PROVIDERS",
+        "HEDGED_SEARCH_DELAY",
+        "RECOMMENDATION_CACHE_SIZE",
+        "RECOMMENDATION_CACHE_TTL",
+        "SCROBBLE_METADATA_CACHE_SIZE",
+        "SCROBBLE_METADATA_CACHE_TTL",
+        "LOADTRACKS_CACHE_SIZE",
+        "LOADTRACKS_CACHE_TTL",
+        "LAVALINK_CONNECTOR_LIMIT",
+        "LAVALINK_CONNECT_CONCURRENCY",
     ]:
 
         if not CONFIG[i]:
@@ -234,6 +285,7 @@ def load_config():
         "INTERACTION_COMMAND_ONLY",
         "RUN_LOCAL_LAVALINK",
         "USE_JABBA",
+        "LAVALINK_AUTO_TUNE",
         "CONNECT_LOCAL_LAVALINK",
         "COMMAND_LOG",
         "RUN_RPC_SERVER",
@@ -247,6 +299,7 @@ def load_config():
         "SENSITIVE_INFO_WARN",
         "ENABLE_DEFER_TYPING",
         "ENABLE_COMMANDS_COOLDOWN",
+        "HEDGED_SEARCH",
 
         "BANS_INTENT",
         "DM_MESSAGES_INTENT",
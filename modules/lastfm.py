@@ -3,27 +3,27 @@ from __future__ import annotations
 import asyncio
 import datetime
 import traceback
-from typing import TYPE_CHECKING, Optional, List
+from typing import TYPE_CHECKING, Optional, List, Dict
 
 import disnake
 from aiohttp import ClientSession
 from disnake.ext import commands
-from rapidfuzz import fuzz
 
 import wavelink
 from utils.db import DBModel, scrobble_model
 from utils.music.errors import GenericError
 from utils.music.lastfm_tools import LastFmException
-from utils.music.models import LavalinkPlayer, LavalinkTrack, exclude_tags
+from utils.music.hedged_search import hedged_search
+from utils.music.matching import title_scores, has_exclude_tags
+from utils.music.models import LavalinkPlayer, LavalinkTrack, normalize_track_name
+from utils.music.ratelimit import priority_background
 from utils.others import CustomContext
 
 if TYPE_CHECKING:
     from utils.client import BotCore
 
-
-def check_track_title(t: str):
-    title = t.lower()
-    return [tg for tg in exclude_tags if tg.lower() not in title]
+# músicas sem resultado são consultadas novamente depois de um dia (o provedor pode passar a ter a música).
+scrobble_metadata_miss_ttl = 86400
 
 
 class LastFMView(disnake.ui.View):
@@ -142,6 +142,10 @@ class LastFmCog(commands.Cog):
     def __init__(self, bot: BotCore):
         self.bot = bot
 
+        if (dispatcher := bot.pool.scrobble_dispatcher) and not dispatcher.save_history:
+            dispatcher.save_history = self.save_scrobble_history
+            dispatcher.on_invalid_session = self.invalidate_session
+
     lastfm_cd = commands.CooldownMapping.from_cooldown(1, 45, commands.BucketType.member)
     lastfm_mc = commands.MaxConcurrency(1, per=commands.BucketType.user, wait=False)
 
@@ -445,18 +449,120 @@ class LastFmCog(commands.Cog):
     async def save_scrobble(self, query: str, track: LavalinkTrack, users: List[disnake.Member]):
 
         for u in users:
+            self.bot.pool.scrobble_dispatcher.add_history(u.id, {"query": query, "duration": track.duration})
+
+    async def save_scrobble_history(self, history: Dict[int, List[dict]]):
 
-            data = await self.bot.pool.local_database.get_data(u.id, collection="scrobbles", db_name=DBModel.users,
+        # uma leitura/escrita por membro com todas as faixas acumuladas desde o último envio da fila.
+        for user_id, tracks in history.items():
+
+            data = await self.bot.pool.local_database.get_data(user_id, collection="scrobbles", db_name=DBModel.users,
                                                                default_model=scrobble_model)
-            data["tracks"].append(
-                {
-                    "query": query,
-                    "duration": track.duration,
-                }
-            )
-            await self.bot.pool.local_database.update_data(u.id, data, collection="scrobbles", db_name=DBModel.users,
+            data["tracks"].extend(tracks)
+            await self.bot.pool.local_database.update_data(user_id, data, collection="scrobbles", db_name=DBModel.users,
                                                            default_model=scrobble_model)
 
+    async def invalidate_session(self, user_id: int):
+
+        user_data = await self.bot.get_global_data(user_id, db_name=DBModel.users)
+        user_data["lastfm"]["sessionkey"] = ""
+        await self.bot.update_global_data(user_id, user_data, db_name=DBModel.users)
+
+        try:
+            del self.bot.pool.lastfm_sessions[user_id]
+        except KeyError:
+            pass
+
+        for bot in self.bot.pool.get_all_bots():
+            for player in bot.music.players.values():
+                try:
+                    del player.lastfm_users[user_id]
+                except KeyError:
+                    pass
+
+    async def get_lastfm_session(self, user: disnake.Member):
+
+        try:
+            return self.bot.pool.lastfm_sessions[user.id]
+        except KeyError:
+            user_data = await self.bot.get_global_data(user.id, db_name=DBModel.users)
+            fminfo = self.bot.pool.lastfm_sessions[user.id] = user_data["lastfm"]
+            return fminfo
+
+    async def resolve_scrobble_metadata(self, player: LavalinkPlayer, track: LavalinkTrack, track_query: str):
+
+        cache = self.bot.pool.scrobble_metadata_cache
+
+        keys = [f"title:{normalize_track_name(track_query)}"]
+
+        if track.ytid:
+            keys.insert(0, f"yt:{track.ytid}")
+
+        for key in keys:
+            if (fmdata := cache.peek(key)) is not None:
+                return fmdata
+
+        def filter_result(result):
+            scores = title_scores(track.title.lower(), [f"{t.authors_string.lower()} - {t.single_title.lower()}" for t in result], 70)
+            if not has_exclude_tags(track.title):
+                return [t for t, score in zip(result, scores) if score > 70 and not has_exclude_tags(t.title)]
+            return [t for t, score in zip(result, scores) if score > 70]
+
+        query = f"{track.author} - {track.title}" if len(track.title) < 11 else track.title
+
+        candidates = []
+
+        if player.bot.spotify:
+            candidates.append(
+                ("spotify", lambda: player.bot.spotify.get_tracks(
+                    query=query, requester=self.bot.user.id, bot=self.bot, check_title=False, priority=priority_background
+                ))
+            )
+
+        candidates.append(
+            ("deezer", lambda: player.bot.deezer.get_tracks(url=query, requester=self.bot.user.id, check_title=False))
+        )
+
+        if self.bot.config["USE_YTM_TRACKINFO_SCROBBLE"]:
+            candidates.append(
+                ("ytmsearch", lambda: player.node.get_tracks(f"ytmsearch:{track_query}", track_cls=LavalinkTrack))
+            )
+
+        async def resolve():
+
+            async def search(factory):
+                return filter_result(await factory())
+
+            # todos os provedores são consultados ao mesmo tempo e os restantes são cancelados no primeiro resultado válido.
+            provider, result, errors = await hedged_search(
+                [(p, lambda f=f: search(f)) for p, f in candidates], stats=self.bot.pool.scrobble_search_stats, delay=0
+            )
+
+            for p, e in errors:
+                if not isinstance(e, wavelink.TrackNotFound):
+                    traceback.print_exception(type(e), e, e.__traceback__)
+
+            if not result:
+                print(f"⚠️ - Last.FM Scrobble - 楽曲の検索結果がありません: {track_query}")
+                for k in keys:
+                    cache.set(k, {}, ttl=scrobble_metadata_miss_ttl)
+                return {}
+
+            result = result[0]
+
+            fmdata = {
+                "name": result.single_title,
+                "artist": result.author,
+                "album": result.album_name,
+            }
+
+            for k in keys[1:]:
+                cache.set(k, fmdata)
+
+            return fmdata
+
+        return await cache.get(keys[0], resolve)
+
     @commands.Cog.listener('on_wavelink_track_end')
     async def startscrooble(self, player: LavalinkPlayer, track: LavalinkTrack, reason: str = None, update_np=False, users=None):
 
@@ -478,6 +584,7 @@ class LastFmCog(commands.Cog):
 
         while counter > 0:
             if not player.guild.me.voice:
+                counter -= 1
                 await asyncio.sleep(2)
                 continue
             break
@@ -493,14 +600,7 @@ class LastFmCog(commands.Cog):
 
         users_fminfo = []
 
-        for u in users:
-
-            try:
-                fminfo = self.bot.pool.lastfm_sessions[u.id]
-            except KeyError:
-                user_data = await self.bot.get_global_data(u.id, db_name=DBModel.users)
-                fminfo = user_data["lastfm"]
-                self.bot.pool.lastfm_sessions[u.id] = fminfo
+        for u, fminfo in zip(users, await asyncio.gather(*[self.get_lastfm_session(u) for u in users])):
 
             if fminfo["scrobble"] is False or not fminfo["sessionkey"]:
                 continue
@@ -522,60 +622,7 @@ class LastFmCog(commands.Cog):
             else:
                 track_query = track.title.lower() if len(track.title) > 12 else f"{track.author} - {track.title}".lower()
 
-                if (fmdata := self.bot.last_fm.cache.get(track_query)) is None:
-
-                    result = None
-
-                    def filter_result(result):
-                        if not [t for t in exclude_tags if t.lower() in track.title]:
-                            result_ = [t for t in result if fuzz.token_sort_ratio(f"{t.authors_string.lower()} - {t.single_title.lower()}", track.title.lower()) > 70 and check_track_title(t.title)]
-                        else:
-                            result_ = [t for t in result if fuzz.token_sort_ratio(f"{t.authors_string.lower()} - {t.single_title.lower()}", track.title.lower()) > 70]
-
-                        return result_
-
-                    try:
-                        result = filter_result(await player.bot.spotify.get_tracks(
-                            query=f"{track.author} - {track.title}" if len(track.title) < 11 else track.title,
-                            requester=self.bot.user.id, bot=self.bot, check_title=False
-                        ))
-                    except:
-                        traceback.print_exc()
-
-                    if not result:
-                        try:
-                            result = filter_result(await player.bot.deezer.get_tracks(
-                                url=f"{track.author} - {track.title}" if len(track.title) < 11 else track.title,
-                                requester=self.bot.user.id, check_title=False
-                            ))
-                        except:
-                            traceback.print_exc()
-
-                    if not result:
-                        if self.bot.config["USE_YTM_TRACKINFO_SCROBBLE"]:
-                            try:
-                                result = filter_result(await player.node.get_tracks(f"ytmsearch:{track_query}", track_cls=LavalinkTrack))
-                            except Exception as e:
-                                if not isinstance(e, wavelink.TrackNotFound):
-                                    traceback.print_exc()
-
-                    if not result:
-                        print(f"⚠️ - Last.FM Scrobble - 楽曲の検索結果がありません: {track_query}")
-                        self.bot.last_fm.cache[track_query] = {}
-                        self.bot.last_fm.scrobble_save_cache()
-                        await self.save_scrobble(query=track_query, track=track, users=users)
-                        return
-
-                    result = result[0]
-
-                    fmdata = {
-                        "name": result.single_title,
-                        "artist": result.author,
-                        "album": result.album_name,
-                    }
-
-                    self.bot.last_fm.cache[track_query] = fmdata
-                    self.bot.last_fm.scrobble_save_cache()
+                fmdata = await self.resolve_scrobble_metadata(player, track, track_query)
 
                 if not fmdata:
                     print(f"⚠️ - Last.FM Scrobble - スキップしました: {track_query}")
@@ -597,38 +644,41 @@ class LastFmCog(commands.Cog):
         if not album and not track.autoplay and track.info["sourceName"] in ("spotify", "deezer", "applemusic", "tidal"):
             album = track.single_title
 
-        for fminfo in users_fminfo:
+        dispatcher = self.bot.pool.scrobble_dispatcher
 
-            try:
-                kwargs = {
-                    "artist": artist, "track": name, "album": album, "duration": duration,
-                    "session_key": fminfo["sessionkey"],
+        if update_np:
+
+            results = await dispatcher.update_nowplaying(
+                [
+                    {"artist": artist, "track": name, "album": album, "duration": duration,
+                     "session_key": fminfo["sessionkey"]} for fminfo in users_fminfo
+                ]
+            )
+
+            for fminfo, result in zip(users_fminfo, results):
+
+                if isinstance(result, LastFmException):
+                    print(f"last.fm failed! user: {fminfo['user_id']} - code: {result.code} - message: {result.message}")
+                    if result.code == 9:
+                        await self.invalidate_session(fminfo["user_id"])
+                    continue
+
+                if isinstance(result, Exception):
+                    traceback.print_exception(type(result), result, result.__traceback__)
+                    continue
+
+                player.lastfm_users[fminfo["user_id"]] = {
+                    "last_url": track.url,
+                    "last_timestamp": datetime.datetime.utcnow() + datetime.timedelta(seconds=duration)
                 }
-                if update_np:
-                    await self.bot.last_fm.update_nowplaying(**kwargs)
-                else:
-                    if track.requester != fminfo["user_id"]:
-                        kwargs["chosen_by_user"] = False
-                    await self.bot.last_fm.track_scrobble(**kwargs)
-            except Exception as e:
-                if isinstance(e, LastFmException):
-                    print(f"last.fm failed! user: {fminfo['user_id']} - code: {e.code} - message: {e.message}")
-                    if e.code == 9:
-                        user_data = await self.bot.get_global_data(fminfo["user_id"], db_name=DBModel.users)
-                        user_data["lastfm"]["sessionkey"] = ""
-                        await self.bot.update_global_data(fminfo["user_id"], user_data, db_name=DBModel.users)
-                        try:
-                            del self.bot.pool.lastfm_sessions[fminfo["user_id"]]
-                        except KeyError:
-                            pass
-                        try:
-                            del player.lastfm_users[fminfo["user_id"]]
-                        except KeyError:
-                            pass
-                        continue
-                traceback.print_exc()
-                continue
 
+            return
+
+        for fminfo in users_fminfo:
+            dispatcher.scrobble(
+                session_key=fminfo["sessionkey"], user_id=fminfo["user_id"], artist=artist, track=name, album=album,
+                duration=duration, chosen_by_user=track.requester == fminfo["user_id"]
+            )
             player.lastfm_users[fminfo["user_id"]] = {
                 "last_url": track.url,
                 "last_timestamp": datetime.datetime.utcnow() + datetime.timedelta(seconds=duration)
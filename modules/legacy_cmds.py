@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import itertools
 import json
 import os
 import re
@@ -18,6 +19,7 @@ from disnake.http import Route
 
 import wavelink
 from config_loader import DEFAULT_CONFIG, load_config
+from utils import profiler
 from utils.client import BotCore
 from utils.db import DBModel
 from utils.music.checks import check_voice, check_requester_channel, can_connect
@@ -119,6 +121,15 @@ class Owner(commands.Cog):
             )
         )
 
+    def check_local_lavalink(self):
+
+        if self.bot.pool.worker_id is not None:
+            # no modo multi-processo o lavalink local é iniciado pelo processo principal.
+            raise GenericError("**マルチプロセスモードでは、ローカルサーバーはメインプロセスで管理されています！**")
+
+        if not self.bot.pool.lavalink_supervisor or not self.bot.pool.lavalink_supervisor.processes:
+            raise GenericError("**ローカルサーバーは使用されていません！**")
+
     updatelavalink_flags = CommandArgparse()
     updatelavalink_flags.add_argument('-yml', '--yml', action='store_true',
                                       help="application.ymlファイルをダウンロードします。")
@@ -131,8 +142,7 @@ class Owner(commands.Cog):
     @commands.command(hidden=True, aliases=["restartll", "rtll", "rll"])
     async def restartlavalink(self, ctx: CustomContext):
 
-        if not self.bot.pool.lavalink_instance:
-            raise GenericError("**ローカルサーバーは使用されていません！**")
+        self.check_local_lavalink()
 
         await self.bot.pool.start_lavalink()
 
@@ -148,15 +158,11 @@ class Owner(commands.Cog):
     @commands.command(hidden=True, aliases=["ull", "updatell", "llupdate", "llu"], extras={"flags": updatelavalink_flags})
     async def updatelavalink(self, ctx: CustomContext, flags: str = ""):
 
-        if not self.bot.pool.lavalink_instance:
-            raise GenericError("**ローカルサーバーは使用されていません！**")
+        self.check_local_lavalink()
 
         args, unknown = ctx.command.extras['flags'].parse_known_args(flags.split())
 
-        try:
-            self.bot.pool.lavalink_instance.kill()
-        except:
-            pass
+        self.bot.pool.lavalink_supervisor.stop()
 
         async with ctx.typing():
 
@@ -175,22 +181,15 @@ class Owner(commands.Cog):
 
         if args.resetids:
             for b in self.bot.pool.bots:
-                try:
-                    node = b.music.nodes["LOCAL"]
-                except KeyError:
-                    continue
-                for p in node.players.values():
-                    for t in p.queue:
-                        t.id = None
-                        t.info["id"] = None
-                for p in node.players.values():
-                    for t in p.played:
-                        t.id = None
-                        t.info["id"] = None
-                for p in node.players.values():
-                    for t in p.queue_autoplay:
-                        t.id = None
-                        t.info["id"] = None
+                for identifier in self.bot.pool.lavalink_supervisor.node_identifiers:
+                    try:
+                        node = b.music.nodes[identifier]
+                    except KeyError:
+                        continue
+                    for p in node.players.values():
+                        for t in itertools.chain(p.queue, p.played, p.queue_autoplay):
+                            t.id = None
+                            t.info["id"] = None
 
         await ctx.send(
             embed=disnake.Embed(
@@ -199,6 +198,51 @@ class Owner(commands.Cog):
             )
         )
 
+    drainnode_flags = CommandArgparse()
+    drainnode_flags.add_argument('-percent', '--percent', type=int, default=100,
+                                 help="移行するプレイヤーの割合（%）。\nEx: -percent 50")
+    drainnode_flags.add_argument('-target', '--target', help="移行先の音楽サーバー（省略時は最適なサーバー）。")
+    drainnode_flags.add_argument('-undrain', '--undrain', action='store_true',
+                                 help="音楽サーバーで新しいプレイヤーを再び受け付けるようにします。")
+
+    @commands.is_owner()
+    @commands.max_concurrency(1, commands.BucketType.default)
+    @commands.command(hidden=True, aliases=["drain", "migratenode", "mgn"], extras={"flags": drainnode_flags},
+                      description="音楽サーバーのプレイヤーを他の音楽サーバーに移行します（全ボット）。")
+    async def drainnode(self, ctx: CustomContext, node: str, *, flags: str = ""):
+
+        args, unknown = ctx.command.extras['flags'].parse_known_args(flags.split())
+
+        if node not in self.bot.music.nodes:
+            raise GenericError(f"音楽サーバー **{node}** が見つかりませんでした。")
+
+        if args.undrain:
+            self.bot.pool.undrain_node(node)
+            await ctx.send(
+                embed=disnake.Embed(
+                    description=f"**音楽サーバー** `{node}` **で新しいプレイヤーを再び受け付けます。**",
+                    color=self.bot.get_color(ctx.guild.me)
+                )
+            )
+            return
+
+        if args.target and args.target not in self.bot.music.nodes:
+            raise GenericError(f"音楽サーバー **{args.target}** が見つかりませんでした。")
+
+        async with ctx.typing():
+            result = await self.bot.pool.drain_node(node, percent=args.percent, target=args.target,
+                                                    block_new=args.percent >= 100)
+
+        txt = f"**音楽サーバー** `{node}` **のプレイヤーを移行しました:** `{result['moved']}/{result['total']}`"
+
+        if result["failed"]:
+            txt += f"\n**失敗:** `{result['failed']}`"
+
+        if args.percent >= 100:
+            txt += f"\n\n`{node}` は新しいプレイヤーを受け付けません（解除: `{ctx.clean_prefix}{ctx.invoked_with} {node} -undrain`）。"
+
+        await ctx.send(embed=disnake.Embed(description=txt, color=self.bot.get_color(ctx.guild.me)))
+
     @commands.is_owner()
     @panel_command(aliases=["rcfg"], description="ボットの設定を再読み込みします。", emoji="⚙",
                    alt_name="ボットの設定を再読み込みします。")
@@ -565,6 +609,47 @@ class Owner(commands.Cog):
         else:
             return txt
 
+    @commands.is_owner()
+    @commands.max_concurrency(1, commands.BucketType.default)
+    @panel_command(aliases=["prof", "profiler"], description="プロセスのサンプリングプロファイルを取得します。",
+                   emoji="🔥", alt_name="プロファイラーを実行 (30秒)")
+    async def profile(self, ctx: Union[CustomContext, disnake.MessageInteraction], seconds: int = 30, interval_ms: int = 10):
+
+        if profiler.current_profiler and profiler.current_profiler.is_running:
+            raise GenericError("**プロファイラーはすでに実行中です！**")
+
+        seconds = min(max(seconds, 1), profiler.max_duration)
+
+        if isinstance(ctx, CustomContext):
+            await ctx.send(
+                embed=disnake.Embed(
+                    description=f"🔥 **{seconds}秒間プロファイリングしています (間隔: {max(interval_ms, 5)}ms)...**",
+                    color=self.bot.get_color(ctx.guild.me)
+                )
+            )
+        else:
+            await ctx.response.defer()
+
+        profiler.current_profiler = profiler.SamplingProfiler(self.bot.pool, interval=interval_ms / 1000)
+
+        await profiler.current_profiler.run_for(seconds)
+
+        p = profiler.current_profiler
+
+        if not p.samples:
+            raise GenericError("**サンプルが収集されませんでした...**")
+
+        txt = f"🔥 **プロファイル完了:** `{p.samples}` サンプル / `{p.elapsed:.1f}s`\n\n" + \
+              "\n".join(f"`{pct:.1f}%` - `{root}`" for root, pct in p.summary())
+
+        file = string_to_file(p.collapsed(), filename=f"profile_{int(disnake.utils.utcnow().timestamp())}.collapsed.txt")
+
+        if isinstance(ctx, CustomContext):
+            await ctx.send(embed=disnake.Embed(description=txt, color=self.bot.get_color(ctx.guild.me)), file=file)
+        else:
+            await ctx.followup.send(file=file, ephemeral=True)
+            return txt
+
     @commands.is_owner()
     @commands.command(hidden=True, aliases=["menu"])
     async def panel(self, ctx: CustomContext):
@@ -258,18 +258,22 @@ class YtOauthLL(commands.Cog):
                 with open('./application.yml', 'w') as file:
                     yaml.dump(yml_data, file)
 
-                if (node := self.bot.music.nodes.get("LOCAL")) and "youtube-plugin" in node.info["plugins"]:
+                # LAVALINK_INSTANCES > 1: todas as instâncias locais (LOCAL, LOCAL_2...) recebem o token.
+                local_nodes = [n for n in self.bot.music.nodes.values()
+                               if n.identifier.startswith("LOCAL") and "youtube-plugin" in n.info["plugins"]]
+
+                for node in local_nodes:
                     resp = await self.bot.session.post(
                         f"{node.rest_uri}/youtube", headers=node._websocket.headers,
                         json={"refreshToken": refresh_token}
                     )
 
                     if resp.status != 204:
-                        txts.append(f"ローカルlavalinkへのrefreshToken適用エラー: {resp.status} - {await resp.text()}")
+                        txts.append(f"ローカルlavalink [{node.identifier}] へのrefreshToken適用エラー: {resp.status} - {await resp.text()}")
                     else:
-                        txts.append("ローカルlavalinkサーバーにrefreshTokenが自動設定されました")
+                        txts.append(f"ローカルlavalinkサーバー [{node.identifier}] にrefreshTokenが自動設定されました")
 
-                else:
+                if not local_nodes:
                     txts.append("application.ymlにrefreshTokenが正常に追加されました！")
 
             except Exception as e:
@@ -456,7 +456,8 @@ class Misc(commands.Cog):
         await inter.response.defer(ephemeral=True)
 
         try:
-            lavalink_ram = psutil.Process(self.bot.pool.lavalink_instance.pid).memory_info().rss
+            # soma de todas as instâncias do lavalink local (LAVALINK_INSTANCES).
+            lavalink_ram = self.bot.pool.lavalink_supervisor.memory_usage()
         except:
             lavalink_ram = 0
 
@@ -37,10 +37,12 @@ from utils.music.converters import time_format, fix_characters, string_to_second
     YOUTUBE_VIDEO_REG, google_search, percentage, music_source_image
 from utils.music.errors import GenericError, MissingVoicePerms, NoVoice, PoolException, parse_error, \
     EmptyFavIntegration, DiffVoiceChannel, NoPlayer
+from utils.music.hedged_search import hedged_search
 from utils.music.interactions import VolumeInteraction, QueueInteraction, SelectInteraction, FavMenuView, ViewMode, \
     SetStageTitle, SelectBotVoice, youtube_regex, ButtonInteraction
 from utils.music.models import LavalinkPlayer, LavalinkTrack, LavalinkPlaylist, PartialTrack, PartialPlaylist, \
-    native_sources, CustomYTDL
+    native_sources, playlist_stream_chunk_size
+from utils.music.reconnect import jitter
 from utils.others import check_cmd, send_idle_embed, CustomContext, PlayerControls, queue_track_index, \
     pool_command, string_to_file, CommandArgparse, music_source_emoji_url, song_request_buttons, \
     select_bot_pool, ProgressBar, update_inter, get_source_emoji_cfg, music_source_emoji
@@ -592,7 +594,10 @@ class Music(commands.Cog):
                     tracks = tracks[:count]
             else:
                 if not await bot.is_owner(user):
-                    tracks.tracks = tracks.tracks[:count]
+                    if isinstance(tracks, LavalinkPlaylist):
+                        tracks.truncate(count)
+                    else:
+                        tracks.tracks = tracks.tracks[:count]
 
         return tracks
 
@@ -1573,7 +1578,8 @@ class Music(commands.Cog):
             await inter.response.defer(ephemeral=ephemeral)
 
         if not queue_loaded:
-            tracks, node = await self.get_tracks(query, inter, inter.author, node=node, source=source, bot=bot, mix=mix)
+            tracks, node = await self.get_tracks(query, inter, inter.author, node=node, source=source, bot=bot, mix=mix,
+                                                 stream=position < 1 and options not in ("shuffle", "reversed"))
             tracks = await self.check_player_queue(inter.author, bot, guild.id, tracks)
 
         try:
@@ -1876,24 +1882,42 @@ class Music(commands.Cog):
                     message_inter=message_inter, node=node, modal_message_id=modal_message_id
                 )
 
-            if options == "shuffle":
-                shuffle(tracks.tracks)
+            # playlists grandes são adicionadas na fila por partes: a primeira parte já permite iniciar a
+            # reprodução e o restante é carregado pelo player em segundo plano.
+            stream_playlist = position < 0 and options not in ("shuffle", "reversed") and \
+                              isinstance(tracks, LavalinkPlaylist) and tracks.is_streamable and \
+                              not player.playlist_stream_task
 
-            if position < 0 or len(tracks.tracks) < 2:
+            if stream_playlist:
+                playlist_tracks = tracks.build_tracks(0, playlist_stream_chunk_size)
+                player.queue.extend(playlist_tracks)
+                player.stream_playlist(tracks, len(playlist_tracks))
 
-                if options == "reversed":
-                    tracks.tracks.reverse()
-                for track in tracks.tracks:
-                    player.queue.append(track)
             else:
-                if options != "reversed":
-                    tracks.tracks.reverse()
-                for track in tracks.tracks:
-                    player.queue.insert(position, track)
 
-                pos_txt = f" (Pos. {position + 1})"
+                if isinstance(tracks, LavalinkPlaylist):
+                    await tracks.load_pending_pages()
+
+                if options == "shuffle":
+                    shuffle(tracks.tracks)
 
-            if tracks.tracks[0].info["sourceName"] == "youtube":
+                if position < 0 or len(tracks.tracks) < 2:
+
+                    if options == "reversed":
+                        tracks.tracks.reverse()
+                    for track in tracks.tracks:
+                        player.queue.append(track)
+                else:
+                    if options != "reversed":
+                        tracks.tracks.reverse()
+                    for track in tracks.tracks:
+                        player.queue.insert(position, track)
+
+                    pos_txt = f" (Pos. {position + 1})"
+
+                playlist_tracks = tracks.tracks
+
+            if playlist_tracks[0].info["sourceName"] == "youtube":
 
                 try:
                     q = f"https://www.youtube.com/playlist?list={query.split('&list=')[1]}"
@@ -1949,11 +1973,13 @@ class Music(commands.Cog):
 
             loadtype = "playlist"
 
-            log_text = f"{inter.author.mention} はプレイリスト [`{fix_characters(tracks.name, 20)}`](<{tracks.url}>){pos_txt} `({len(tracks.tracks)})` を追加しました。"
+            tcount = tracks.track_count if stream_playlist else len(playlist_tracks)
+
+            log_text = f"{inter.author.mention} はプレイリスト [`{fix_characters(tracks.name, 20)}`](<{tracks.url}>){pos_txt} `({tcount})` を追加しました。"
 
             total_duration = 0
 
-            for t in tracks.tracks:
+            for t in playlist_tracks:
                 if not t.is_stream:
                     total_duration += t.duration
 
@@ -1961,19 +1987,19 @@ class Music(commands.Cog):
                 embed.set_author(
                     name="⠂" + fix_characters(tracks.name, 35),
                     url=tracks.url,
-                    icon_url=music_source_image(tracks.tracks[0].info['sourceName'])
+                    icon_url=music_source_image(playlist_tracks[0].info['sourceName'])
                 )
             except KeyError:
                 embed.set_author(
                     name="⠂ Spotify Playlist",
-                    icon_url=music_source_image(tracks.tracks[0].info['sourceName'])
+                    icon_url=music_source_image(playlist_tracks[0].info['sourceName'])
                 )
 
             if image_file:
                 embed.set_thumbnail(f"attachment://{image_file.filename}")
             else:
                 embed.set_thumbnail(url=tracks.thumb)
-            embed.description = f"`{(tcount:=len(tracks.tracks))} 曲`**┃**`{time_format(total_duration)}`**┃**{inter.author.mention}"
+            embed.description = f"`{tcount} 曲`**┃**`{time_format(total_duration)}{'+' if stream_playlist else ''}`**┃**{inter.author.mention}"
             emoji = "🎶"
 
             if reg_query is not None and tracks.uri:
@@ -6925,14 +6951,7 @@ class Music(commands.Cog):
             if node.is_available:
                 return
 
-            for player in list(node.players.values()):
-
-                try:
-                    player._new_node_task.cancel()
-                except:
-                    pass
-
-                player._new_node_task = player.bot.loop.create_task(player._wait_for_new_node())
+            self.bot.reconnect_manager.migrate_node(node)
 
             if self.bot.config["LAVALINK_RECONNECT_RETRIES"] and retries == self.bot.config["LAVALINK_RECONNECT_RETRIES"]:
                 print(f"❌ - {self.bot.user} - [{node.identifier}] Todas as tentativas de reconectar falharam...")
@@ -6961,7 +6980,7 @@ class Music(commands.Cog):
                 print(
                     f'⚠️ - {self.bot.user} - サーバー [{node.identifier}] への再接続に失敗しました。{int(backoff)} 秒後に再試行します。'
                     f' エラー: {error}'[:300])
-            await asyncio.sleep(backoff)
+            await asyncio.sleep(jitter(backoff, 0.2))
             retries += 1
 
     def remove_provider(self, lst, queries: list):
@@ -7129,7 +7148,7 @@ class Music(commands.Cog):
         await node.connect(info=info)
 
     async def get_partial_tracks(self, query: str, ctx: Union[disnake.ApplicationCommandInteraction, CustomContext, disnake.MessageInteraction, disnake.Message],
-            user: disnake.Member, node: wavelink.Node = None, bot: BotCore = None):
+            user: disnake.Member, node: wavelink.Node = None, bot: BotCore = None, stream: bool = False):
 
         if not bot:
             bot = self.bot
@@ -7138,17 +7157,38 @@ class Music(commands.Cog):
 
         exceptions = set()
 
-        if (bot.pool.config["FORCE_USE_DEEZER_CLIENT"] or [n for n in bot.music.nodes.values() if
-                                                           "deezer" not in n.info.get("sourceManagers", [])]):
+        use_deezer = bot.pool.config["FORCE_USE_DEEZER_CLIENT"] or [n for n in bot.music.nodes.values() if
+                                                                    "deezer" not in n.info.get("sourceManagers", [])]
+
+        use_spotify = bot.spotify and not [n for n in bot.music.nodes.values() if "spotify" in n.info.get("sourceManagers", [])]
+
+        # links só são aceitos pelo client do próprio serviço, então apenas buscas por texto são disputadas.
+        if use_deezer and use_spotify and bot.pool.config["HEDGED_SEARCH"] and not URL_REG.match(query):
+
+            provider, tracks, errors = await hedged_search(
+                [
+                    ("deezer", lambda: self.bot.pool.deezer.get_tracks(url=query, requester=user.id, search=True, check_title=80)),
+                    ("spotify", lambda: self.bot.pool.spotify.get_tracks(self.bot, user.id, query, search=True, check_title=80, stream=stream)),
+                ],
+                stats=bot.pool.search_stats, delay=bot.pool.config["HEDGED_SEARCH_DELAY"] / 1000
+            )
+
+            for provider, e in errors:
+                self.bot.dispatch("custom_error", ctx=ctx, error=e)
+                exceptions.add(repr(e))
+
+            return tracks or [], node, exceptions
+
+        if use_deezer:
             try:
                 tracks = await self.bot.pool.deezer.get_tracks(url=query, requester=user.id, search=True, check_title=80)
             except Exception as e:
                 self.bot.dispatch("custom_error", ctx=ctx, error=e)
                 exceptions.add(repr(e))
 
-        if not tracks and bot.spotify and not [n for n in bot.music.nodes.values() if "spotify" in n.info.get("sourceManagers", [])]:
+        if not tracks and use_spotify:
             try:
-                tracks = await self.bot.pool.spotify.get_tracks(self.bot, user.id, query, search=True, check_title=80)
+                tracks = await self.bot.pool.spotify.get_tracks(self.bot, user.id, query, search=True, check_title=80, stream=stream)
             except Exception as e:
                 self.bot.dispatch("custom_error", ctx=ctx, error=e)
                 exceptions.add(repr(e))
@@ -7204,6 +7244,21 @@ class Music(commands.Cog):
                 source = True
                 providers = n.search_providers
 
+            if source and bot.pool.config["HEDGED_SEARCH"] and len(providers) > 1 and not URL_REG.match(query):
+
+                tracks, node_retry, is_partial = await self.hedged_provider_search(
+                    n, providers, query, user, ctx, exceptions, pin_first=isinstance(source, str)
+                )
+
+                if is_partial:
+                    return tracks, node, exceptions
+
+                if not node_retry:
+                    node = n
+                    break
+
+                continue
+
             for search_provider in providers:
 
                 tracks = None
@@ -7258,9 +7313,63 @@ class Music(commands.Cog):
 
         return tracks, node, exceptions
 
+    async def hedged_provider_search(
+            self, node: wavelink.Node, providers: list, query: str, user: disnake.Member,
+            ctx: Union[disnake.ApplicationCommandInteraction, CustomContext, disnake.MessageInteraction, disnake.Message],
+            exceptions: set, pin_first: bool = False):
+
+        stats = self.bot.pool.search_stats
+
+        providers = [p for p in providers if isinstance(p, str) and (
+            p in node.search_providers or p.startswith("dzsearch") or (p.startswith("spsearch") and self.bot.pool.spotify))]
+
+        if not providers:
+            return None, False, False
+
+        # o provedor escolhido pelo membro continua sendo o primeiro, os demais são ordenados pela latência/taxa de acerto.
+        if pin_first:
+            providers = providers[:1] + stats.sort(providers[1:])
+        else:
+            providers = stats.sort(providers)
+
+        async def search(search_provider: str):
+
+            if search_provider not in node.search_providers:
+
+                if search_provider.startswith("dzsearch"):
+                    return await self.bot.pool.deezer.get_tracks(url=query, requester=user.id, search=True, check_title=50)
+
+                return await self.bot.pool.spotify.get_tracks(self.bot, user.id, query, search=True, check_title=50)
+
+            return await node.get_tracks(
+                f"{search_provider}:{query}", track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, requester=user.id
+            )
+
+        provider, tracks, errors = await hedged_search(
+            [(p, lambda p=p: search(p)) for p in providers[:max(self.bot.config["HEDGED_SEARCH_PROVIDERS"], 1)]],
+            stats=stats, delay=self.bot.config["HEDGED_SEARCH_DELAY"] / 1000
+        )
+
+        node_retry = False
+
+        for search_provider, e in errors:
+
+            exceptions.add(repr(e))
+
+            if search_provider in node.search_providers and not isinstance(e, wavelink.TrackNotFound):
+                print(f"検索の処理に失敗しました...\n{query}\n{repr(e)}")
+                node_retry = True
+            else:
+                self.bot.dispatch("custom_error", ctx=ctx, error=e)
+
+        if tracks:
+            return tracks, False, provider not in node.search_providers
+
+        return tracks, node_retry, False
+
     async def get_tracks(
             self, query: str, ctx: Union[disnake.ApplicationCommandInteraction, CustomContext, disnake.MessageInteraction, disnake.Message],
-            user: disnake.Member, node: wavelink.Node = None, source=None, bot: BotCore = None, mix=False):
+            user: disnake.Member, node: wavelink.Node = None, source=None, bot: BotCore = None, mix=False, stream: bool = False):
 
         exceptions = set()
 
@@ -7353,7 +7462,7 @@ class Music(commands.Cog):
 
         if not tracks:
 
-            tracks, node, exceptions = await self.get_partial_tracks(query=query, ctx=ctx, user=user, node=node, bot=bot)
+            tracks, node, exceptions = await self.get_partial_tracks(query=query, ctx=ctx, user=user, node=node, bot=bot, stream=stream)
 
             if not tracks:
 
@@ -7436,7 +7545,7 @@ class Music(commands.Cog):
             # 他のBotを無視
             if player.bot.user.id == member.id and not after.channel:
 
-                await asyncio.sleep(3)
+                await asyncio.sleep(jitter(3))
 
                 if player.is_closing:
                     return
@@ -7774,39 +7883,4 @@ class Music(commands.Cog):
 
 
 def setup(bot: BotCore):
-
-    if not getattr(bot.pool, 'ytdl', None):
-
-        bot.pool.ytdl = CustomYTDL(
-            {
-                'format': 'webm[abr>0]/bestaudio/best',
-                'extract_flat': True,
-                'quiet': True,
-                'no_warnings': True,
-                'lazy_playlist': True,
-                'playlist_items': '1-700',
-                'simulate': True,
-                'download': False,
-                'cachedir': False,
-                'allowed_extractors': [
-                    r'.*youtube.*',
-                    r'.*soundcloud.*',
-                ],
-                'extractor_args': {
-                    'youtube': {
-                        #'player_client': [
-                        #    'web',
-                        #    'android',
-                        #    'android_creator',
-                        #    'web_creator',
-                        #],
-                        'max_comments': [0],
-                    },
-                    'youtubetab': {
-                        "skip": ["webpage", "authcheck"]
-                    }
-                }
-            }
-        )
-
     bot.add_cog(Music(bot))
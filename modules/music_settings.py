@@ -1582,6 +1582,16 @@ class MusicSettings(commands.Cog):
                        f'Lavalinkバージョン: `v{node.version}`\n' \
                        f'Uptime: <t:{int((disnake.utils.utcnow() - datetime.timedelta(milliseconds=node.stats.uptime)).timestamp())}:R>\n'
 
+                if (frame_loss := node.stats_history.mean("frame_loss")) is not None:
+                    txt += f'フレーム損失: `{frame_loss:.2f}%`\n'
+
+                health, reasons = node.stats_history.check()
+
+                txt += f'状態: `{("🟢 正常", "🟡 悪化傾向", "🔴 過負荷")[health]}`' + (" `🚧 移行中`" if node.draining else "") + "\n"
+
+                if reasons:
+                    txt += "```" + "\n".join(reasons) + "```\n"
+
                 if started:
                     txt += "Players: "
                     players = node.stats.playing_players
@@ -2,6 +2,8 @@
 
 # 注意: このシステムは完全に実験的なものです。
 import asyncio
+import heapq
+import itertools
 import os
 import pickle
 import shutil
@@ -9,18 +11,21 @@ import traceback
 import zlib
 from base64 import b64decode, b64encode
 from contextlib import suppress
-from typing import Union
+from typing import Dict, Union
 
 import aiofiles
 import disnake
 from disnake.ext import commands
 
+import wavelink
 from utils.client import BotCore
 from utils.db import DBModel
 from utils.music.checks import can_connect, can_send_message
 from utils.music.errors import PoolException
 from utils.music.filters import AudioFilter
 from utils.music.models import LavalinkPlayer
+from utils.music.ratelimit import RateLimiter
+from utils.music.track_encoder import decode_track
 from utils.others import send_idle_embed, CustomContext
 
 
@@ -38,6 +43,11 @@ class PlayerSession(commands.Cog):
         if not hasattr(bot, 'players_resumed'):
             bot.players_resumed ={}
 
+        self.resuming_nodes: Dict[str, int] = {}
+        self.node_waiters = []
+        self.node_waiters_counter = itertools.count()
+        self.shard_ratelimiters: Dict[int, RateLimiter] = {}
+
         self.resume_task = bot.loop.create_task(self.resume_players())
 
     @commands.Cog.listener()
@@ -235,47 +245,160 @@ class PlayerSession(commands.Cog):
 
         try:
 
-            mongo_sessions = await self.get_player_sessions_mongo()
-            local_sessions = await self.get_player_sessions_local()
+            hints = self.bot.config["EXTRA_HINTS"].split("||")
 
-            data_list = {}
+            queue = asyncio.PriorityQueue()
 
-            if self.bot.config["PLAYER_SESSIONS_MONGODB"] and self.bot.config["MONGO"]:
-                for d in local_sessions:
-                    data_list[d["_id"]] = d
-                    print(f"{self.bot.user} - サーバーのセッションデータを移行中: {d['_id']} | ローカルDB -> Mongo")
-                    await self.save_session_mongo(d["_id"], d)
-                    self.delete_data_local(d["_id"])
-                for d in mongo_sessions:
-                    data_list[d["_id"]] = d
+            workers = [
+                self.bot.loop.create_task(self.resume_worker(queue, hints))
+                for _ in range(max(self.bot.config["PLAYER_RESUME_CONCURRENCY"], 1))
+            ]
 
-            else:
-                for d in mongo_sessions:
-                    data_list[d["_id"]] = d
-                    print(f"{self.bot.user} - サーバーのセッションデータを移行中: {d['_id']} | Mongo -> ローカルDB")
-                    await self.save_session_local(d["_id"], d)
-                    if self.bot.config["MONGO"]:
-                        await self.delete_data_mongo(d["_id"])
-                for d in local_sessions:
-                    data_list[d["_id"]] = d
-
-            mongo_sessions.clear()
-            local_sessions.clear()
+            try:
+                await self.enqueue_sessions(queue)
+                await queue.join()
+            finally:
+                for w in workers:
+                    w.cancel()
 
-            hints = self.bot.config["EXTRA_HINTS"].split("||")
+        except Exception:
+            print(f"{self.bot.user} - プレーヤーの復元に失敗しました:\n{traceback.format_exc()}")
+
+        self.bot.player_resumed = True
+
+    def resume_priority(self, data: dict):
+
+        # servidores com membros ouvindo e players não pausados são restaurados primeiro.
+        try:
+            has_listeners = any(not m.bot for m in self.bot.get_channel(data["voice_channel"]).members)
+        except:
+            has_listeners = False
+
+        return (0 if has_listeners else 2) + (1 if data.get("paused") else 0)
+
+    async def enqueue_sessions(self, queue: asyncio.PriorityQueue):
+
+        # as sessões são enviadas pra fila conforme são lidas (sem aguardar a leitura de todos os arquivos).
+        seen = set()
+        counter = itertools.count()
+
+        def put(d: dict):
+            if d["_id"] in seen or d["_id"] in self.bot.players_resumed:
+                return
+            seen.add(d["_id"])
+            queue.put_nowait((self.resume_priority(d), next(counter), d))
+
+        mongo_sessions = await self.get_player_sessions_mongo()
+
+        if self.bot.config["PLAYER_SESSIONS_MONGODB"] and self.bot.config["MONGO"]:
+            for d in mongo_sessions:
+                put(d)
+            async for d in self.iter_player_sessions_local():
+                print(f"{self.bot.user} - サーバーのセッションデータを移行中: {d['_id']} | ローカルDB -> Mongo")
+                await self.save_session_mongo(d["_id"], d)
+                self.delete_data_local(d["_id"])
+                put(d)
+
+        else:
+            async for d in self.iter_player_sessions_local():
+                put(d)
+            for d in mongo_sessions:
+                print(f"{self.bot.user} - サーバーのセッションデータを移行中: {d['_id']} | Mongo -> ローカルDB")
+                await self.save_session_local(d["_id"], d)
+                if self.bot.config["MONGO"]:
+                    await self.delete_data_mongo(d["_id"])
+                put(d)
+
+        mongo_sessions.clear()
+
+    async def resume_worker(self, queue: asyncio.PriorityQueue, hints: list):
+
+        while True:
+
+            priority, _, data = await queue.get()
+
+            try:
+                await self.schedule_resume(data, hints, priority)
+            except Exception:
+                print(f"{self.bot.user} - プレーヤーの復元に失敗しました {data['_id']}:\n{traceback.format_exc()}")
+            finally:
+                queue.task_done()
+
+    async def schedule_resume(self, data: dict, hints: list, priority: int):
+
+        node = None
+
+        guild = self.bot.get_guild(data["_id"])
+
+        if guild and int(data["_id"]) not in self.bot.music.players:
+            # limita as conexões em canais de voz por shard (gateway) e a quantidade de players restaurando por node.
+            await self.get_shard_ratelimiter(guild.shard_id).acquire(priority)
+            node = await self.acquire_node(priority)
+
+        try:
+            task = self.bot.players_resumed[data['_id']] = self.bot.loop.create_task(
+                self.resume_player(data, hints=hints, node=node)
+            )
+            await task
+        finally:
+            if node:
+                self.release_node(node)
+
+    def get_shard_ratelimiter(self, shard_id: int) -> RateLimiter:
+        try:
+            return self.shard_ratelimiters[shard_id]
+        except KeyError:
+            ratelimiter = self.shard_ratelimiters[shard_id] = RateLimiter(
+                requests=max(self.bot.config["PLAYER_RESUME_SHARD_RATE"], 1), window=60
+            )
+            return ratelimiter
+
+    async def acquire_node(self, priority: int = 0) -> wavelink.Node:
 
-            for data in data_list.values():
+        # as vagas liberadas vão pra quem já está esperando (por prioridade/ordem de chegada), evitando que um worker
+        # que acabou de liberar um node passe na frente dos demais.
+        future = self.bot.loop.create_future()
+        heapq.heappush(self.node_waiters, (priority, next(self.node_waiters_counter), future))
 
+        try:
+            while True:
+                self.dispatch_nodes()
                 try:
-                    self.bot.players_resumed[data['_id']]
-                except KeyError:
-                    self.bot.players_resumed[data['_id']] = self.bot.loop.create_task(self.resume_player(data, hints=hints))
-                    await asyncio.sleep(1)
+                    return await asyncio.wait_for(asyncio.shield(future), timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release_node(future.result())
+            else:
+                future.cancel()
+            raise
 
-        except Exception:
-            print(f"{self.bot.user} - プレーヤーの復元に失敗しました {data['_id']}:\n{traceback.format_exc()}")
+    def dispatch_nodes(self):
 
-        self.bot.player_resumed = True
+        limit = max(self.bot.config["PLAYER_RESUME_NODE_CONCURRENCY"], 1)
+
+        while self.node_waiters:
+
+            if self.node_waiters[0][2].done():
+                heapq.heappop(self.node_waiters)
+                continue
+
+            nodes = [
+                n for n in self.bot.music.nodes.values()
+                if n.available and n.is_available and self.resuming_nodes.get(n.identifier, 0) < limit
+            ]
+
+            if not nodes:
+                return
+
+            node = min(nodes, key=lambda n: len(n.players) + self.resuming_nodes.get(n.identifier, 0))
+            self.resuming_nodes[node.identifier] = self.resuming_nodes.get(node.identifier, 0) + 1
+            heapq.heappop(self.node_waiters)[2].set_result(node)
+
+    def release_node(self, node: wavelink.Node):
+        self.resuming_nodes[node.identifier] = max(self.resuming_nodes.get(node.identifier, 1) - 1, 0)
+        self.dispatch_nodes()
 
     async def update_player(
             self,
@@ -312,6 +435,9 @@ class PlayerSession(commands.Cog):
         except:
             track_id = None
 
+        if track_id:
+            track_id = self.playable_track_id(player.node, track_id)
+
         if track_id and has_members:
             data.update(
                 {
@@ -327,6 +453,22 @@ class PlayerSession(commands.Cog):
                 player.queue.appendleft(player.current)
             await player.process_next(start_position=position)
 
+    def playable_track_id(self, node: wavelink.Node, track_id: str):
+
+        # ids corrompidos ou de sources que o servidor atual não tem (ex: faixa de um plugin do servidor usado antes
+        # de reiniciar) são descartados para a faixa ser processada novamente.
+        try:
+            info = decode_track(track_id)[1]
+        except Exception:
+            return
+
+        # no lavalink v3 o sourceManagers é só um valor padrão (o /v4/info não existe), igual ao compatibility_key.
+        if node.version > 3 and (source_managers := node.info.get("sourceManagers")) \
+                and info["sourceName"] not in source_managers:
+            return
+
+        return track_id
+
     async def voice_check(self, voice_channel: Union[disnake.VoiceChannel, disnake.StageChannel], position: int = 0):
 
         wait_counter = 30
@@ -364,7 +506,7 @@ class PlayerSession(commands.Cog):
             except Exception as e:
                 print(f"{self.bot.user} - サーバー {guild.name} のステージで発言できませんでした。エラー: {repr(e)}")
 
-    async def resume_player(self, data: dict, hints: list = None):
+    async def resume_player(self, data: dict, hints: list = None, node: wavelink.Node = None):
 
         if hints is None:
             hints = []
@@ -531,7 +673,7 @@ class PlayerSession(commands.Cog):
                         await self.delete_data(guild.id)
                     return
 
-                while True:
+                while not node:
 
                     node = self.bot.music.get_best_node()
 
@@ -541,8 +683,6 @@ class PlayerSession(commands.Cog):
                         except asyncio.TimeoutError:
                             continue
 
-                    break
-
                 try:
                     player: LavalinkPlayer = self.bot.music.get_player(
                         node_id=node.identifier,
@@ -713,14 +853,21 @@ class PlayerSession(commands.Cog):
 
         return guild_data
 
-    async def get_player_sessions_local(self):
+    def load_session_file(self, file_content: bytes):
+        try:
+            file_content = zlib.decompress(file_content)
+        except zlib.error:
+            pass
+        return pickle.loads(file_content)
 
-        guild_data = []
+    async def iter_player_sessions_local(self):
 
         try:
             files = os.listdir(f"./local_database/player_sessions/{self.bot.user.id}")
         except FileNotFoundError:
-            return guild_data
+            return
+
+        loop = asyncio.get_running_loop()
 
         for file_content in files:
 
@@ -729,18 +876,19 @@ class PlayerSession(commands.Cog):
 
             guild_id = file_content[:-4]
 
-            async with aiofiles.open(f'./local_database/player_sessions/{self.bot.user.id}/{guild_id}.pkl', 'rb') as f:
-                file_content = await f.read()
-                try:
-                    file_content = zlib.decompress(file_content)
-                except zlib.error:
-                    pass
-                data = pickle.loads(file_content)
+            try:
+                async with aiofiles.open(f'./local_database/player_sessions/{self.bot.user.id}/{guild_id}.pkl', 'rb') as f:
+                    file_content = await f.read()
+                data = await loop.run_in_executor(None, self.load_session_file, file_content)
+            except Exception:
+                print(f"{self.bot.user} - セッションファイルの読み込みに失敗しました: {guild_id}\n{traceback.format_exc()}")
+                continue
 
             if data:
-                guild_data.append(data)
+                yield data
 
-        return guild_data
+    async def get_player_sessions_local(self):
+        return [d async for d in self.iter_player_sessions_local()]
 
     async def save_session_mongo(self, id_: Union[int, str], data: dict):
         await self.bot.pool.mongo_database.update_data(
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# uso: python -m tests.bench_loadtracks
+import asyncio
+import time
+
+from tests.mock_lavalink import lavalink_info, make_node, playlist_payload
+from utils.music.models import LavalinkPlaylist
+
+queries = {
+    "youtube": "https://www.youtube.com/playlist?list=PL0123456789",
+    "spotify": "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M",
+}
+
+
+async def measure(node, query: str, access: bool, limit: int = None, repeat: int = 20):
+
+    best = None
+
+    for _ in range(repeat):
+        node._client.bot.pool.playlist_cache.clear()
+        start = time.perf_counter()
+        playlist = await node.get_tracks(query, playlist_cls=LavalinkPlaylist, requester=1)
+        if limit:
+            playlist.truncate(limit)
+        if access:
+            playlist.tracks
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+async def main(size: int = 1000):
+
+    for source, query in queries.items():
+
+        node = make_node(info=lavalink_info(["youtube", "spotify"]), responses={query: playlist_payload(size, source)})
+
+        for name, kwargs in (
+            ("load only", {"access": False}),
+            ("load + truncate(100) + tracks", {"access": True, "limit": 100}),
+            ("load + tracks", {"access": True}),
+        ):
+            elapsed = await measure(node, query, **kwargs)
+            print(f"{source:<8} {size} tracks | {name:<30} {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
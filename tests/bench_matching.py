@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# uso: python -m tests.bench_matching
+import timeit
+
+from rapidfuzz import fuzz
+
+from tests.test_matching import search_results
+from utils.music.matching import filter_by_title
+
+
+def main():
+
+    searches = [search_results(seed) for seed in range(100)]
+
+    def old():
+        for query, labels in searches:
+            [label for label in labels if fuzz.token_sort_ratio(label, query) >= 70]
+
+    def new():
+        for query, labels in searches:
+            filter_by_title(query, labels, labels, 70)
+
+    for name, func in (("token_sort_ratio por item", old), ("filter_by_title", new)):
+        elapsed = min(timeit.repeat(func, number=10, repeat=5)) / 10
+        print(f"{name}: {elapsed * 1000:.2f} ms (100 buscas x 100 resultados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# uso: python -m tests.bench_player_resume
+import asyncio
+import random
+import time
+
+from tests.test_player_resume import ResumeNode, make_resume_cog, make_session
+
+
+async def resume(sessions: list, shards: int, nodes: int, latency: float):
+
+    nodes = [ResumeNode(f"node-{n}", latency=latency) for n in range(nodes)]
+    cog = make_resume_cog(sessions, nodes, shards=shards)
+
+    start = time.monotonic()
+    await cog.resume_players()
+
+    listeners = {d["_id"] for d in sessions if d["voice_channel"] % 10}
+    finished = {guild_id: t - start for guild_id, t in cog.resumed}
+
+    return (
+        max(finished[g] for g in listeners),
+        max(finished.values()),
+        max(n.max_inflight for n in nodes),
+    )
+
+
+def main():
+
+    rnd = random.Random(0)
+    sessions = [make_session(n, rnd.random() < 0.3, rnd.random() < 0.1) for n in range(1, 1001)]
+    latency = 0.05
+
+    print(f"{len(sessions)} sessões, 16 shards, 3 nodes, {latency * 1000:.0f} ms por restauração no lavalink falso")
+    # o código anterior criava uma task por segundo, sem prioridade.
+    print(f"antes (1 sessão/s): última sessão iniciada em ~{len(sessions) - 1} s")
+
+    listeners, total, inflight = asyncio.run(resume(sessions, shards=16, nodes=3, latency=latency))
+
+    print(f"agora: sessões com ouvintes em {listeners:.2f} s, todas em {total:.2f} s (máx. {inflight} por node)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# uso: python -m tests.bench_serializers
+import json
+import timeit
+
+from wavelink.serializers import backend, loads
+
+
+def frame_stream(players: int = 200):
+
+    # sequência parecida com a recebida de um node com vários players: um playerUpdate por player a cada
+    # intervalo, um stats e alguns eventos.
+    frames = []
+
+    for n in range(players):
+        frames.append({
+            "op": "playerUpdate", "guildId": str(10 ** 17 + n),
+            "state": {"time": 1700000000000 + n, "position": n * 1000, "connected": True, "ping": 40},
+        })
+
+    frames.append({
+        "op": "stats", "players": players, "playingPlayers": players, "uptime": 123456789,
+        "memory": {"free": 1, "used": 2, "allocated": 3, "reservable": 4},
+        "cpu": {"cores": 4, "systemLoad": 0.5, "lavalinkLoad": 0.1},
+        "frameStats": {"sent": 3000, "nulled": 0, "deficit": 0},
+    })
+
+    for n in range(players // 10):
+        frames.append({
+            "op": "event", "type": "TrackStartEvent", "guildId": str(10 ** 17 + n),
+            "track": {"encoded": "Q" * 300, "info": {"title": f"title {n}", "author": "author", "length": 200000}},
+        })
+
+    return [json.dumps(f) for f in frames]
+
+
+def loadtracks_payload(size: int = 1000):
+    return json.dumps({
+        "loadType": "playlist",
+        "data": {
+            "info": {"name": "playlist", "selectedTrack": -1},
+            "tracks": [
+                {
+                    "encoded": "Q" * 300,
+                    "info": {
+                        "identifier": f"id{n}", "isSeekable": True, "author": "author", "length": 200000,
+                        "isStream": False, "position": 0, "title": f"title {n}",
+                        "uri": f"https://www.youtube.com/watch?v=id{n}", "sourceName": "youtube",
+                        "artworkUrl": None, "isrc": None,
+                    },
+                    "pluginInfo": {},
+                } for n in range(size)
+            ]
+        }
+    }).encode()
+
+
+def main(repeat: int = 5):
+
+    frames = frame_stream()
+    payload = loadtracks_payload()
+
+    print(f"backend: {backend}")
+
+    for name, func in (("json", json.loads), (backend, loads)):
+        best = min(timeit.repeat(lambda: [func(f) for f in frames], number=10, repeat=repeat)) / 10
+        print(f"{name:<8} {len(frames)} frames: {best * 1000:.2f} ms")
+        best = min(timeit.repeat(lambda: func(payload), number=10, repeat=repeat)) / 10
+        print(f"{name:<8} loadtracks ({len(payload) // 1024} KB): {best * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
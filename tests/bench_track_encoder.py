@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# uso: python -m tests.bench_track_encoder
+import timeit
+
+from tests.test_track_encoder import spotify_track, youtube_track
+from utils.music.track_encoder import decode_tracks, encode_track, encode_tracks
+
+
+def main(size: int = 1000, repeat: int = 5):
+
+    tracks = [dict(spotify_track, identifier=f"{spotify_track['identifier']}{n}") for n in range(size // 2)] + \
+             [dict(youtube_track, identifier=f"{youtube_track['identifier']}{n}") for n in range(size // 2)]
+
+    encoded = encode_tracks(tracks)
+
+    for name, func in (
+        ("encode_track (loop)", lambda: [encode_track(t)[1] for t in tracks]),
+        ("encode_tracks", lambda: encode_tracks(tracks)),
+        ("decode_tracks", lambda: decode_tracks(encoded)),
+    ):
+        best = min(timeit.repeat(func, number=10, repeat=repeat)) / 10
+        print(f"{name:<20} {size} tracks: {best * 1000:.2f} ms ({best / size * 1e6:.2f} us/track)")
+
+
+if __name__ == "__main__":
+    main()
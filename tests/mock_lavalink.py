@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Node/pool falsos para testar e medir o código do wavelink sem um servidor lavalink."""
+import json
+from types import SimpleNamespace
+from typing import Optional
+
+import wavelink
+from utils.music.recommendation_cache import RecommendationCache
+
+
+def make_pool(**kwargs):
+    return SimpleNamespace(
+        playlist_cache={},
+        loadtracks_cache=RecommendationCache(path=None, name="test"),
+        recommendation_cache=RecommendationCache(path=None, name="test"),
+        lavalink_stats={},
+        lavalink_stats_history={},
+        draining_nodes=set(),
+        **kwargs
+    )
+
+
+def make_node(identifier: str = "node", pool=None, info: Optional[dict] = None, version: int = 4,
+              responses: Optional[dict] = None, port: int = 2333) -> wavelink.Node:
+
+    pool = pool or make_pool()
+
+    node = wavelink.Node(
+        host="127.0.0.1", port=port, shards=1, user_id=1, client=SimpleNamespace(bot=SimpleNamespace(pool=pool)),
+        session=None, rest_uri=f"http://127.0.0.1:{port}", password="youshallnotpass", region="us_central",
+        identifier=identifier,
+    )
+
+    if info is not None:
+        node.update_info(dict(info, check_version=version))
+    node.version = version
+
+    node.requests = []
+
+    async def request_tracks(query: str, *, retry_on_failure: bool = False):
+        node.requests.append(query)
+        return (responses or {}).get(query)
+
+    node.request_tracks = request_tracks
+
+    return node
+
+
+def lavalink_info(source_managers: list, plugins: dict = None) -> dict:
+    return {
+        "sourceManagers": source_managers,
+        "plugins": [{"name": k, "version": v} for k, v in (plugins or {}).items()],
+    }
+
+
+def track_payload(n: int, source: str = "youtube") -> dict:
+
+    if source == "spotify":
+        info = {
+            "identifier": f"{n:022d}", "isSeekable": True, "author": f"Artist {n % 50}", "length": 200000,
+            "isStream": False, "position": 0, "title": f"Song {n}", "uri": f"https://open.spotify.com/track/{n:022d}",
+            "sourceName": "spotify", "artworkUrl": "https://i.scdn.co/image/ab67616d0000b273", "isrc": f"USUM7{n:07d}",
+        }
+        plugin_info = {"albumName": f"Album {n % 20}", "albumUrl": "https://open.spotify.com/album/x",
+                       "artistUrl": "https://open.spotify.com/artist/x", "artistArtworkUrl": None,
+                       "previewUrl": None, "isPreview": False}
+    else:
+        info = {
+            "identifier": f"v{n:010d}", "isSeekable": True, "author": f"Channel {n % 50}", "length": 200000,
+            "isStream": False, "position": 0, "title": f"Video {n}", "uri": f"https://www.youtube.com/watch?v=v{n:010d}",
+            "sourceName": "youtube", "artworkUrl": f"https://i.ytimg.com/vi/v{n:010d}/hqdefault.jpg", "isrc": None,
+        }
+        plugin_info = {}
+
+    return {"encoded": "QAAA" + "A" * 296, "info": info, "pluginInfo": plugin_info}
+
+
+def playlist_payload(size: int, source: str = "youtube") -> bytes:
+    return json.dumps({
+        "loadType": "playlist",
+        "data": {
+            "info": {"name": f"{source} playlist", "selectedTrack": -1},
+            "pluginInfo": {"type": "playlist"} if source == "spotify" else {},
+            "tracks": [track_payload(n, source) for n in range(size)],
+        }
+    }).encode()
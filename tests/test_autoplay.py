@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from types import MethodType, SimpleNamespace
+
+from tests.mock_lavalink import lavalink_info, make_node, make_pool, track_payload
+from utils.client import BotPool
+from utils.music.models import LavalinkPlayer, LavalinkTrack
+
+
+class FakeLastFM:
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_similar_artists(self, artist: str):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [{"name": f"{artist} similar {n}"} for n in range(3)]
+
+
+def test_concurrent_seeds_share_lastfm_artists():
+
+    async def run():
+        player = SimpleNamespace(bot=SimpleNamespace(last_fm=FakeLastFM()), lastfm_artists=[],
+                                 lastfm_artists_lock=asyncio.Lock())
+        track = SimpleNamespace(ytid=None, author="Artist", title="Song")
+        artists = await asyncio.gather(*[LavalinkPlayer.next_lastfm_artist(player, track) for _ in range(6)])
+        return player, artists
+
+    player, artists = asyncio.run(run())
+
+    # a lista só é recarregada quando acaba e cada seed recebe um artista diferente.
+    assert player.bot.last_fm.calls == 2
+    assert artists == ["Artist", "Artist similar 0", "Artist similar 1", "Artist similar 2", "Artist", "Artist similar 0"]
+
+
+def make_player(node, pool):
+
+    player = SimpleNamespace(
+        bot=SimpleNamespace(pool=pool, last_fm=None, spotify=None, user=SimpleNamespace(id=1)), node=node,
+        native_yt=True, lastfm_artists=[], lastfm_artists_lock=asyncio.Lock(), searches=[]
+    )
+
+    for name in ("fetch_autoqueue_seed", "source_recommendations_key", "cached_recommendations", "next_lastfm_artist"):
+        setattr(player, name, MethodType(getattr(LavalinkPlayer, name), player))
+
+    async def search_recommendations(track_data, queries):
+        player.searches.append(queries)
+        info = dict(track_payload(1, "spotify")["info"])
+        return [LavalinkTrack(id_=f"{node.identifier}-encoded", info=info, requester=1)], None
+
+    player.search_recommendations = search_recommendations
+
+    return player
+
+
+def make_recommendation_pool():
+    pool = make_pool(config={"FORCE_USE_DEEZER_CLIENT": False})
+    pool.process_track_cls = lambda *args, **kwargs: BotPool.process_track_cls(pool, *args, **kwargs)
+    return pool
+
+
+def seed_track():
+    return LavalinkTrack(id_="seed", info=dict(track_payload(0)["info"]), requester=1)
+
+
+def test_recommendations_keep_encoded_ids():
+
+    pool = make_recommendation_pool()
+    node = make_node("a", pool, info=lavalink_info(["youtube", "spotify"], {"lavasrc-plugin": "4.0.0"}))
+    node.search_providers = ["ytsearch"]
+
+    async def run():
+        player = make_player(node, pool)
+        first = await player.fetch_autoqueue_seed(seed_track(), [])
+        second = await player.fetch_autoqueue_seed(seed_track(), [])
+        return player, first, second
+
+    player, (first, _), (second, _) = asyncio.run(run())
+
+    assert len(player.searches) == 1
+    assert first[0].id == second[0].id == "a-encoded"
+    assert first[0] is not second[0] and first[0].info is not second[0].info
+
+
+def test_recommendations_are_shared_only_between_compatible_nodes():
+
+    pool = make_recommendation_pool()
+    lavasrc = lavalink_info(["youtube", "spotify"], {"lavasrc-plugin": "4.0.0"})
+
+    nodes = [
+        make_node("a", pool, info=lavasrc, port=1),
+        make_node("b", pool, info=lavasrc, port=2),
+        make_node("c", pool, info=lavalink_info(["youtube"]), port=3),
+    ]
+
+    async def run():
+        players = []
+        for node in nodes:
+            node.search_providers = ["ytsearch"]
+            player = make_player(node, pool)
+            tracks, exception = await player.fetch_autoqueue_seed(seed_track(), [])
+            players.append((player, tracks))
+        return players
+
+    (a, a_tracks), (b, b_tracks), (c, c_tracks) = asyncio.run(run())
+
+    assert len(a.searches) == 1 and not b.searches and len(c.searches) == 1
+    assert b_tracks[0].id == "a-encoded"
+    assert c_tracks[0].id == "c-encoded"
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from types import SimpleNamespace
+
+from tests.test_stats_history import clock, fill, make_stats  # noqa: F401
+from utils.client import BotPool
+from wavelink.stats import StatsHistory
+
+config = {
+    "PLAYER_MIGRATION_BATCH_SIZE": 2,
+    "NODE_AUTO_DRAIN_CPU": 90,
+    "NODE_AUTO_DRAIN_FRAME_LOSS": 1,
+    "NODE_AUTO_DRAIN_MEMORY": 0,
+}
+
+
+class Moves:
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.inflight = 0
+        self.max_inflight = 0
+        self.order = []
+
+
+def make_node(identifier: str, health: int = 0, available: bool = True, draining: bool = False):
+    return SimpleNamespace(identifier=identifier, health=health, available=available, is_available=available,
+                           draining=draining, players={})
+
+
+def make_bot(nodes: list):
+    nodes = {n.identifier: n for n in nodes}
+    return SimpleNamespace(music=SimpleNamespace(nodes=nodes, get_node=nodes.get))
+
+
+def make_player(guild_id: int, bot, node, moves: Moves, playing: bool = True, paused: bool = False):
+
+    player = SimpleNamespace(guild_id=guild_id, bot=bot, node=node, is_closing=False, _new_node_task=None,
+                             current=object() if playing else None, paused=paused, update=False, native_yt=False)
+    node.players[guild_id] = player
+
+    async def change_node(identifier):
+        moves.inflight += 1
+        moves.max_inflight = max(moves.max_inflight, moves.inflight)
+        moves.order.append(guild_id)
+        try:
+            await asyncio.sleep(moves.latency)
+        finally:
+            moves.inflight -= 1
+        del player.node.players[guild_id]
+        player.node = bot.music.nodes[identifier]
+        player.node.players[guild_id] = player
+
+    player.change_node = change_node
+    player.set_command_log = lambda **kwargs: None
+
+    return player
+
+
+def make_pool(players: list):
+    return SimpleNamespace(config=config, draining_nodes=set(),
+                           get_node_players=lambda identifier: [p for p in players if p.node.identifier == identifier])
+
+
+def test_drain_moves_idle_players_first_and_balances():
+
+    async def run():
+        moves = Moves()
+        source, node_b, node_c = make_node("a"), make_node("b"), make_node("c", health=1)
+        bot = make_bot([source, node_b, node_c])
+        players = [make_player(n, bot, source, moves, playing=n % 2 == 0, paused=n == 4) for n in range(8)]
+        pool = make_pool(players)
+        result = await BotPool.drain_node(pool, "a", percent=50)
+        return result, moves, source, node_b, node_c
+
+    result, moves, source, node_b, node_c = asyncio.run(run())
+
+    assert result == {"total": 4, "moved": 4, "failed": 0}
+    # parados (ímpares) e pausado (4) vão antes dos que estão tocando.
+    assert sorted(moves.order) == [1, 3, 4, 5]
+    assert moves.max_inflight == 2
+    # o servidor com tendência de sobrecarga (health 1) só é usado sem outra opção.
+    assert len(node_b.players) == 4 and not node_c.players
+    assert len(source.players) == 4
+
+
+def test_drain_skips_and_fails():
+
+    async def run():
+        moves = Moves()
+        source, other = make_node("a"), make_node("b", available=False)
+        bot = make_bot([source, other])
+        players = [make_player(n, bot, source, moves) for n in range(3)]
+        players[0].is_closing = True
+        pool = make_pool(players)
+        result = await BotPool.drain_node(pool, "a", block_new=True)
+        return pool, result, moves
+
+    pool, result, moves = asyncio.run(run())
+
+    assert pool.draining_nodes == {"a"}
+    assert result == {"total": 2, "moved": 0, "failed": 2}
+    assert not moves.order
+
+
+def test_node_overload_reason(clock):
+
+    pool = SimpleNamespace(config=config)
+
+    node = SimpleNamespace(stats_history=StatsHistory())
+    fill(node.stats_history, clock, [10, 10, 10])
+    assert BotPool.node_overload_reason(pool, node) is None
+
+    node = SimpleNamespace(stats_history=StatsHistory())
+    for n in range(3):
+        assert node.stats_history.add(make_stats(cpu=95, uptime=1000000 + n * 60000))
+        clock.now += 60
+    assert BotPool.node_overload_reason(pool, node) == "cpu: 95.0%"
+
+    node = SimpleNamespace(stats_history=StatsHistory())
+    node.stats_history.add(make_stats(cpu=50, deficit=60))
+    assert BotPool.node_overload_reason(pool, node) == "frame_loss: 2.0%"
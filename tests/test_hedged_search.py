@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+from utils.music.hedged_search import SearchProviderStats, hedged_search
+
+
+def run(candidates, **kwargs):
+    stats = SearchProviderStats()
+    return asyncio.run(hedged_search(candidates, stats=stats, **kwargs)), stats
+
+
+def test_first_good_result_wins():
+
+    async def fast():
+        return ["a"]
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    (provider, result, errors), stats = run([("fast", fast), ("slow", slow)], delay=1)
+
+    assert (provider, result, errors) == ("fast", ["a"], [])
+    assert stats.get("fast").wins == 1
+    assert stats.get("slow").attempts == 0
+
+
+def test_failure_starts_next_provider():
+
+    async def broken():
+        raise Exception("offline")
+
+    async def empty():
+        return []
+
+    async def good():
+        return ["b"]
+
+    (provider, result, errors), stats = run([("broken", broken), ("empty", empty), ("good", good)], delay=10)
+
+    assert provider == "good"
+    assert [p for p, e in errors] == ["broken"]
+    assert stats.get("broken").errors == 1
+    assert stats.get("empty").attempts == 1 and stats.get("empty").wins == 0
+
+
+def test_slow_provider_is_cancelled():
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def good():
+        return ["c"]
+
+    (provider, result, errors), stats = run([("slow", slow), ("good", good)], delay=0.01)
+
+    assert provider == "good"
+    assert stats.get("slow").attempts == 1 and stats.get("slow").wins == 0
+    assert stats.summary()["good"]["wins"] == 1
+
+
+def test_tasks_finishing_together_are_recorded_by_result():
+
+    event = asyncio.Event()
+
+    async def first():
+        await event.wait()
+        return ["first"]
+
+    async def second():
+        event.set()
+        return ["second"]
+
+    (provider, result, errors), stats = run([("first", first), ("second", second)], delay=0.01)
+
+    # as duas terminaram no mesmo ciclo: vence a iniciada primeiro e nenhuma é contada como cancelada.
+    assert (provider, result) == ("first", ["first"])
+    assert stats.get("first").wins == stats.get("second").wins == 1
+
+
+def test_sort_prefers_fast_and_reliable():
+    stats = SearchProviderStats()
+    for _ in range(5):
+        stats.record("fast", 0.1, "win")
+        stats.record("slow", 1.0, "win")
+        stats.record("flaky", 0.1, "error")
+    assert stats.sort(["flaky", "slow", "fast"]) == ["fast", "flaky", "slow"]
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from collections import deque
+from types import SimpleNamespace
+
+from tests.mock_lavalink import lavalink_info, make_node, playlist_payload
+from utils.music.models import LavalinkPlayer, LavalinkPlaylist, LavalinkTrack
+
+yt_playlist = "https://www.youtube.com/playlist?list=PL0123456789"
+
+
+def load(size: int = 50):
+    node = make_node(info=lavalink_info(["youtube"]), responses={yt_playlist: playlist_payload(size)})
+    return asyncio.run(node.get_tracks(yt_playlist, playlist_cls=LavalinkPlaylist, requester=1))
+
+
+def test_tracks_are_built_on_access():
+    playlist = load()
+    assert playlist._tracks is None
+    assert playlist.track_count == 50
+
+    tracks = playlist.tracks
+    assert len(tracks) == 50
+    assert all(isinstance(t, LavalinkTrack) for t in tracks)
+    assert tracks[0].playlist is playlist
+    assert tracks[0].requester == 1
+    assert playlist.tracks is tracks
+
+
+def test_truncate_before_access():
+    playlist = load()
+    playlist.truncate(10)
+    assert playlist._tracks is None
+    assert playlist.track_count == 10
+    assert [t.identifier for t in playlist.tracks] == [f"v{n:010d}" for n in range(10)]
+
+
+def test_truncate_after_access():
+    playlist = load()
+    playlist.tracks
+    playlist.truncate(5)
+    assert playlist.track_count == len(playlist.tracks) == 5
+
+
+def test_tracks_setter():
+    playlist = load()
+    playlist.tracks = playlist.tracks[:3]
+    assert playlist.track_count == 3
+
+
+def streamed_playlist(pages: int = 3, page_size: int = 100, expected_count: int = None, fail_at: int = None):
+
+    playlist = load(page_size)
+    closed = []
+
+    async def pending_pages():
+        try:
+            for page in range(1, pages):
+                if page == fail_at:
+                    raise Exception("page failed")
+                yield [t for t in LavalinkPlaylist(
+                    {"playlistInfo": {"name": ""}, "tracks": [
+                        dict(t, info=dict(t["info"], identifier=f"p{page}-{n}")) for n, t in enumerate(playlist.data["tracks"])
+                    ]}, url="", encoded_name="encoded").tracks]
+        finally:
+            closed.append(True)
+
+    playlist.tracks
+    playlist.pending_pages = pending_pages()
+    playlist.expected_count = expected_count if expected_count is not None else pages * page_size
+
+    return playlist, closed
+
+
+def test_load_pending_pages():
+    playlist, closed = streamed_playlist()
+    asyncio.run(playlist.load_pending_pages())
+    assert len(playlist.tracks) == playlist.track_count == 300
+    assert playlist.tracks[-1].identifier == "p2-99"
+    assert playlist.pending_pages is None
+    assert closed
+
+
+def test_load_pending_pages_respects_truncate():
+    playlist, closed = streamed_playlist()
+    playlist.truncate(150)
+    asyncio.run(playlist.load_pending_pages())
+    assert len(playlist.tracks) == playlist.track_count == 150
+    assert closed
+
+
+def stream(playlist):
+
+    logs = []
+    player = SimpleNamespace(is_closing=False, queue=deque(), update=False, playlist_stream_task=True,
+                             set_command_log=lambda **kwargs: logs.append(kwargs))
+
+    asyncio.run(LavalinkPlayer._stream_playlist(player, playlist, 0))
+
+    return player, logs
+
+
+def test_stream_playlist():
+    playlist, closed = streamed_playlist()
+    player, logs = stream(playlist)
+    assert len(player.queue) == 300
+    assert logs[-1]["emoji"] == "🎶" and "`300`" in logs[-1]["text"]
+    assert player.playlist_stream_task is None and closed
+
+
+def test_stream_playlist_error_is_not_reported_as_complete():
+    playlist, closed = streamed_playlist(fail_at=2)
+    player, logs = stream(playlist)
+    assert len(player.queue) == 200
+    assert logs[-1]["emoji"] == "⚠️" and "`200/300`" in logs[-1]["text"]
+    assert player.playlist_stream_task is None and closed
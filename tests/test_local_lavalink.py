@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+from types import SimpleNamespace
+
+from utils.music.local_lavalink import LocalLavalinkSupervisor
+
+
+def test_node_identifiers():
+    supervisor = LocalLavalinkSupervisor(SimpleNamespace(), instances=3, base_port=9000)
+    assert supervisor.node_identifiers == ["LOCAL", "LOCAL_2", "LOCAL_3"]
+    assert [supervisor.port(i) for i in range(3)] == [9000, 9001, 9002]
+
+
+def test_memory_usage_sums_instances():
+    supervisor = LocalLavalinkSupervisor(SimpleNamespace(), instances=2)
+    assert supervisor.memory_usage() == 0
+
+    # processo atual no lugar das instâncias do lavalink (pid inexistente é ignorado).
+    supervisor.processes = {0: SimpleNamespace(pid=os.getpid()), 1: SimpleNamespace(pid=os.getpid())}
+    single = LocalLavalinkSupervisor(SimpleNamespace())
+    single.processes = {0: SimpleNamespace(pid=os.getpid()), 1: SimpleNamespace(pid=2 ** 22 + 1)}
+
+    total = supervisor.memory_usage()
+    assert total > 0
+    assert abs(single.memory_usage() * 2 - total) < total * 0.1
+
+
+class Response:
+
+    def __init__(self, status: int):
+        self.status = status
+
+    async def __aenter__(self):
+        if isinstance(self.status, Exception):
+            raise self.status
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def test_check_instance_counts_only_server_errors():
+
+    responses = []
+    session = SimpleNamespace(get=lambda *args, **kwargs: Response(responses.pop(0)))
+    supervisor = LocalLavalinkSupervisor(SimpleNamespace(get_lavalink_session=lambda: session,
+                                                         lavalink_stats_history={}),
+                                         failure_threshold=2, startup_grace=0)
+    supervisor.processes = {0: SimpleNamespace(poll=lambda: None)}
+    supervisor.started = {0: 0}
+    supervisor.failures = {0: 0}
+
+    # lavalink v3 responde 404 no /v4/info.
+    responses.extend([200, 404, 404])
+    for _ in range(3):
+        assert asyncio.run(supervisor.check_instance(0)) is None
+    assert supervisor.failures[0] == 0
+
+    responses.extend([503, ConnectionError()])
+    assert asyncio.run(supervisor.check_instance(0)) is None
+    assert asyncio.run(supervisor.check_instance(0)).startswith("/v4/info")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import random
+
+from rapidfuzz import fuzz
+
+from utils.music.matching import (
+    TagMatcher, exclude_tags, exclude_tags_2, exclude_tags_2_matcher, exclude_tags_matcher, filter_by_title,
+    has_exclude_tags, title_scores
+)
+
+words = ["love", "night", "remix", "live", "feat", "the", "dance", "heart", "ação", "coração", "sky", "edit",
+         "official", "video", "audio", "lyrics", "-", "(", ")", "2024"]
+
+
+def search_results(seed: int, size: int = 100):
+
+    # simula uma busca: a query e resultados com variações do mesmo título misturados com títulos aleatórios.
+    rnd = random.Random(seed)
+    query = " ".join(rnd.choices(words, k=rnd.randint(2, 6)))
+    labels = []
+
+    for _ in range(size):
+        choice = rnd.random()
+        if choice < 0.2:
+            labels.append(query)
+        elif choice < 0.5:
+            tokens = query.split()
+            rnd.shuffle(tokens)
+            labels.append(" ".join(tokens + rnd.choices(words, k=rnd.randint(0, 3))))
+        else:
+            labels.append(" ".join(rnd.choices(words, k=rnd.randint(1, 8))))
+
+    return query, labels
+
+
+def test_filter_by_title_matches_per_item_loop():
+
+    for seed in range(50):
+        query, labels = search_results(seed)
+        items = list(range(len(labels)))
+        for cutoff in (50, 70, 75, 85, 100):
+            old = [i for i, label in zip(items, labels) if fuzz.token_sort_ratio(label, query) >= cutoff]
+            assert filter_by_title(query, items, labels, cutoff) == old
+
+
+def test_title_scores_matches_per_item_loop():
+
+    for seed in range(50):
+        query, labels = search_results(seed)
+        scores = title_scores(query, labels, 70)
+        old = [fuzz.token_sort_ratio(query, label) for label in labels]
+        # comparações usadas no lastfm (> 70) e no autoplay (< 75).
+        assert [s > 70 for s in scores] == [s > 70 for s in old]
+        assert [s < 75 for s in title_scores(query, labels, 75)] == [s < 75 for s in old]
+        assert [s for s in scores if s] == [s for s in old if s >= 70]
+
+
+def test_title_scores_empty():
+    assert title_scores("query", []) == []
+    assert filter_by_title("query", [], [], 70) == []
+
+
+def test_tag_matcher_matches_any_tag_in_lower():
+
+    for seed in range(50):
+        query, labels = search_results(seed)
+        for matcher, tags in ((exclude_tags_matcher, exclude_tags), (exclude_tags_2_matcher, exclude_tags_2)):
+            for text in [query, query.upper(), *labels, "Artist - Song (8D Audio)", "NIGHTCORE mix", ""]:
+                assert matcher.search(text) == any(tag in text.lower() for tag in tags)
+                assert has_exclude_tags(text, matcher) == matcher.search(text)
+
+
+def test_tag_matcher_literal_tags():
+    matcher = TagMatcher(["a.b", "(live)"])
+    assert matcher.search("song (LIVE)")
+    assert matcher.search("A.B")
+    assert not matcher.search("axb")
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from types import SimpleNamespace
+
+from utils import metrics
+from utils.metrics import Histogram, MetricsRegistry, format_labels
+from web_app import MetricsHandler
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "requests")
+    counter.inc(node="a")
+    counter.inc(2, node="a")
+    gauge = registry.gauge("players", "players")
+    gauge.set(5)
+    gauge.set(3)
+
+    assert registry.counter("requests_total") is counter
+    assert registry.render().splitlines() == [
+        "# HELP requests_total requests", "# TYPE requests_total counter", 'requests_total{node="a"} 3',
+        "# HELP players players", "# TYPE players gauge", "players 3",
+    ]
+
+    gauge.remove()
+    gauge.remove(bot="missing")
+    assert registry.render().splitlines()[-2:] == ["# HELP players players", "# TYPE players gauge"]
+
+
+def test_histogram_buckets():
+    histogram = Histogram("latency", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value, op="x")
+
+    assert histogram.render()[2:] == [
+        'latency_bucket{op="x",le="0.1"} 2',
+        'latency_bucket{op="x",le="1"} 3',
+        'latency_bucket{op="x",le="+Inf"} 4',
+        'latency_sum{op="x"} 2.65',
+        'latency_count{op="x"} 4',
+    ]
+    assert histogram.snapshot(op="x") == {"count": 4, "sum": 2.65, "avg": 2.65 / 4}
+    assert histogram.snapshot(op="y") is None
+
+
+def test_label_escaping():
+    assert format_labels((("node", 'a"b\\c\nd'),)) == '{node="a\\"b\\\\c\\nd"}'
+
+
+def test_loop_lag_sampler():
+
+    async def run():
+        histogram = metrics.loop_lag
+        before = (histogram.snapshot() or {"count": 0})["count"]
+        task = asyncio.create_task(metrics.loop_lag_sampler(0.01))
+        await asyncio.sleep(0.005)
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        task.cancel()
+        snapshot = histogram.snapshot()
+        return snapshot["count"] - before, snapshot["sum"]
+
+    count, total = asyncio.run(run())
+
+    assert count >= 1
+    assert total >= 0.08
+
+
+def make_handler(bots: list, token: str = "", authorization: str = None):
+
+    handler = SimpleNamespace(
+        pool=SimpleNamespace(get_all_bots=lambda: bots), config={"METRICS_AUTH_TOKEN": token},
+        request=SimpleNamespace(headers={"Authorization": authorization} if authorization else {}),
+        status=200, output=[], set_header=lambda *args: None,
+    )
+    handler.set_status = lambda status: setattr(handler, "status", status)
+    handler.write = handler.output.append
+
+    MetricsHandler.get(handler)
+
+    return handler
+
+
+def test_metrics_handler_auth():
+    assert make_handler([], token="secret").status == 401
+    assert make_handler([], token="secret", authorization="Bearer wrong").status == 401
+    assert make_handler([], token="secret", authorization="Bearer secret").output
+    assert make_handler([], token="secret", authorization="secret").output
+    assert make_handler([]).output
+
+
+def test_metrics_handler_drops_disconnected_bots():
+
+    bot = SimpleNamespace(identifier="test_bot", is_ready=lambda: True, latency=0.05,
+                          music=SimpleNamespace(players={1: None}))
+
+    assert 'musicbot_players{bot="test_bot"} 1' in make_handler([bot]).output[0]
+
+    bot.is_ready = lambda: False
+
+    assert 'bot="test_bot"' not in make_handler([bot]).output[0]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from tests.mock_lavalink import lavalink_info, make_node
+from wavelink.node import normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  ytsearch:Foo   BAR ") == "ytsearch:foo bar"
+    assert normalize_query("SCSEARCH:Foo\tBar") == "scsearch:foo bar"
+    assert normalize_query(" https://www.youtube.com/watch?v=AbC ") == "https://www.youtube.com/watch?v=AbC"
+    assert normalize_query("Foo  Bar") == "Foo  Bar"
+
+
+def test_compatibility_key_shared_between_equal_nodes():
+    a = make_node("a", info=lavalink_info(["youtube", "spotify"], {"lavasrc": "4.0", "youtube": "1.5"}))
+    b = make_node("b", info=lavalink_info(["spotify", "youtube"], {"youtube": "1.5", "lavasrc": "4.0"}))
+    assert a.compatibility_key == b.compatibility_key != "node:a"
+
+
+def test_compatibility_key_differs_by_plugins_and_sources():
+    base = make_node("a", info=lavalink_info(["youtube", "spotify"], {"lavasrc": "4.0"}))
+    other_plugin = make_node("b", info=lavalink_info(["youtube", "spotify"], {"lavasrc": "4.1"}))
+    other_source = make_node("c", info=lavalink_info(["youtube"], {"lavasrc": "4.0"}))
+    assert len({base.compatibility_key, other_plugin.compatibility_key, other_source.compatibility_key}) == 3
+
+
+def test_compatibility_key_falls_back_to_node():
+    # info sintetizado pra lavalink v3 (sem /v4/info) e node ainda sem info.
+    v3 = make_node("v3", info={"sourceManagers": ["youtube", "soundcloud", "http"]}, version=3)
+    other_v3 = make_node("other", info={"sourceManagers": ["youtube", "soundcloud", "http"]}, version=3)
+    assert v3.compatibility_key == "node:v3"
+    assert other_v3.compatibility_key == "node:other"
+    assert make_node("empty").compatibility_key == "node:empty"
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+from modules.player_resume import PlayerSession
+from tests.test_track_encoder import spotify_track
+from utils.music.track_encoder import encode_track
+
+
+class ResumeNode:
+    """Node lavalink falso: só registra os PATCH de player e quantos estão em andamento ao mesmo tempo."""
+
+    def __init__(self, identifier: str, latency: float = 0, players: int = 0):
+        self.identifier = identifier
+        self.available = True
+        self.is_available = True
+        self.players = {n: None for n in range(players)}
+        self.latency = latency
+        self.inflight = 0
+        self.max_inflight = 0
+        self.updates = []
+
+    async def update_player(self, guild_id: int, data: dict):
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.inflight -= 1
+        self.updates.append(guild_id)
+
+
+def make_session(guild_id: int, listeners: bool = True, paused: bool = False):
+    return {"_id": guild_id, "voice_channel": guild_id * 10 + int(listeners), "paused": paused}
+
+
+def make_resume_cog(sessions: list, nodes: list, shards: int = 1, **config):
+
+    # o cog roda dentro do loop atual (chamar dentro de asyncio.run).
+    channels = {}
+
+    for d in sessions:
+        channels[d["voice_channel"]] = SimpleNamespace(
+            members=[SimpleNamespace(bot=True)] + ([SimpleNamespace(bot=False)] if d["voice_channel"] % 10 else [])
+        )
+
+    async def wait_until_ready():
+        pass
+
+    bot = SimpleNamespace(
+        config=dict({
+            "PLAYER_RESUME_CONCURRENCY": 20, "PLAYER_RESUME_NODE_CONCURRENCY": 5, "PLAYER_RESUME_SHARD_RATE": 60,
+            "PLAYER_SESSIONS_MONGODB": False, "MONGO": "", "EXTRA_HINTS": "",
+        }, **config),
+        music=SimpleNamespace(nodes={n.identifier: n for n in nodes}, players={}),
+        players_resumed={}, player_resuming=False, player_resumed=False, bot_ready=True, user="bot",
+        loop=asyncio.get_running_loop(), wait_until_ready=wait_until_ready,
+        get_guild=lambda guild_id: SimpleNamespace(id=guild_id, shard_id=guild_id % shards),
+        get_channel=channels.get,
+    )
+
+    cog = PlayerSession.__new__(PlayerSession)
+    cog.bot = bot
+    cog.resuming_nodes = {}
+    cog.node_waiters = []
+    cog.node_waiters_counter = itertools.count()
+    cog.shard_ratelimiters = {}
+    cog.resumed = []
+
+    async def get_player_sessions_mongo():
+        return []
+
+    async def iter_player_sessions_local():
+        for d in sessions:
+            yield d
+
+    async def resume_player(data: dict, hints: list = None, node=None):
+        await node.update_player(data["_id"], {"paused": data["paused"]})
+        cog.resumed.append((data["_id"], time.monotonic()))
+
+    cog.get_player_sessions_mongo = get_player_sessions_mongo
+    cog.iter_player_sessions_local = iter_player_sessions_local
+    cog.resume_player = resume_player
+
+    return cog
+
+
+def test_resume_priority():
+
+    async def run():
+        sessions = [make_session(1, False, True), make_session(2, False), make_session(3, True, True), make_session(4)]
+        cog = make_resume_cog(sessions, [ResumeNode("a")], PLAYER_RESUME_CONCURRENCY=1)
+        assert [cog.resume_priority(d) for d in sessions] == [3, 2, 1, 0]
+        await cog.resume_players()
+        return [guild_id for guild_id, _ in cog.resumed], cog.bot.player_resumed
+
+    assert asyncio.run(run()) == ([4, 3, 2, 1], True)
+
+
+def test_resume_respects_node_limit_and_load():
+
+    async def run():
+        nodes = [ResumeNode("a", latency=0.01, players=30), ResumeNode("b", latency=0.01)]
+        sessions = [make_session(n, n % 2 == 0) for n in range(1, 41)]
+        cog = make_resume_cog(sessions, nodes, shards=4, PLAYER_RESUME_NODE_CONCURRENCY=3)
+        await cog.resume_players()
+        return nodes, cog
+
+    nodes, cog = asyncio.run(run())
+
+    assert len(cog.resumed) == 40
+    assert sorted(nodes[0].updates + nodes[1].updates) == list(range(1, 41))
+    assert all(n.max_inflight <= 3 for n in nodes)
+    # o node com menos players recebe mais sessões.
+    assert len(nodes[1].updates) > len(nodes[0].updates)
+    assert cog.resuming_nodes == {"a": 0, "b": 0}
+
+
+def test_resume_skips_already_resumed():
+
+    async def run():
+        cog = make_resume_cog([make_session(1), make_session(2), make_session(1)], [ResumeNode("a")])
+        cog.bot.players_resumed[2] = None
+        await cog.resume_players()
+        return [guild_id for guild_id, _ in cog.resumed]
+
+    assert asyncio.run(run()) == [1]
+
+
+def test_waiting_workers_keep_priority_for_free_nodes():
+
+    # há mais workers que vagas nos nodes: quem libera um node não pode passar na frente de quem já espera.
+    async def run():
+        sessions = [make_session(n, n > 30) for n in range(1, 61)]
+        cog = make_resume_cog(sessions, [ResumeNode("a", latency=0.01)], PLAYER_RESUME_NODE_CONCURRENCY=2)
+        await cog.resume_players()
+        return [guild_id for guild_id, _ in cog.resumed]
+
+    resumed = asyncio.run(run())
+
+    assert sorted(resumed[:30]) == list(range(31, 61))
+
+
+def test_playable_track_id():
+
+    track_id = encode_track(spotify_track)[1]
+    v4_node = SimpleNamespace(version=4, info={"sourceManagers": ["youtube", "soundcloud", "http"]})
+    v3_node = SimpleNamespace(version=3, info={"sourceManagers": ["youtube", "soundcloud", "http"]})
+
+    assert PlayerSession.playable_track_id(None, v4_node, track_id) is None
+    assert PlayerSession.playable_track_id(None, SimpleNamespace(version=4, info={"sourceManagers": ["spotify"]}),
+                                           track_id) == track_id
+    # sourceManagers do v3 é só um valor padrão: o id é mantido.
+    assert PlayerSession.playable_track_id(None, v3_node, track_id) == track_id
+    assert PlayerSession.playable_track_id(None, v3_node, "corrompido") is None
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from types import SimpleNamespace
+
+from utils.pool_ipc import PoolIPCClient, PoolSupervisor, claim_preferred_timeout
+
+
+async def start_pool(workers: int = 2):
+
+    supervisor = PoolSupervisor(SimpleNamespace(), workers=workers)
+    server = await asyncio.start_server(supervisor.handle_connection, host="127.0.0.1", port=0)
+    port = server.sockets[0].getsockname()[1]
+
+    clients = []
+    tasks = []
+
+    for worker_id in range(workers):
+        client = PoolIPCClient(SimpleNamespace(get_all_bots=lambda: []), worker_id=worker_id, port=port)
+        clients.append(client)
+        tasks.append(asyncio.create_task(client.run()))
+
+    while len(supervisor.connections) < workers:
+        await asyncio.sleep(0.01)
+
+    async def close():
+        for task in tasks:
+            task.cancel()
+        for client in clients:
+            if client.writer:
+                client.writer.close()
+        # as conexões do lado do supervisor terminam ao receber o EOF.
+        while supervisor.connections:
+            await asyncio.sleep(0.01)
+        server.close()
+
+    return supervisor, clients, close
+
+
+def test_first_claim_wins():
+
+    async def run():
+        supervisor, clients, close = await start_pool()
+        try:
+            first = await clients[0].claim("msg-1", guild_id=1)
+            second = await clients[1].claim("msg-1", guild_id=1)
+            return first, second
+        finally:
+            await close()
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_worker_in_member_voice_channel_has_priority():
+
+    async def run():
+        supervisor, clients, close = await start_pool()
+        try:
+            clients[1].update_voice_state(guild_id=1, bot_id=100, channel_id=10)
+            while 1 not in supervisor.voice_states:
+                await asyncio.sleep(0.01)
+
+            start = time.monotonic()
+            other = asyncio.create_task(clients[0].claim("msg-2", guild_id=1, channel_id=10))
+            await asyncio.sleep(0.05)
+            preferred = await clients[1].claim("msg-2", guild_id=1, channel_id=10)
+            result = (await other, preferred, time.monotonic() - start)
+
+            # o processo com o bot no canal não recebeu a mensagem: o primeiro assume após o timeout.
+            start = time.monotonic()
+            fallback = await clients[0].claim("msg-3", guild_id=1, channel_id=10)
+            return result, (fallback, time.monotonic() - start)
+        finally:
+            await close()
+
+    (other, preferred, elapsed), (fallback, fallback_elapsed) = asyncio.run(run())
+
+    assert (other, preferred) == (False, True)
+    assert elapsed < claim_preferred_timeout
+    assert fallback is True
+    assert fallback_elapsed >= claim_preferred_timeout * 0.9
+
+
+def test_drop_worker_clears_voice_states():
+    supervisor = PoolSupervisor(SimpleNamespace(), workers=2)
+    supervisor.update_voice_state(0, {"guild_id": 1, "bot_id": 100, "channel_id": 10})
+    supervisor.update_voice_state(1, {"guild_id": 1, "bot_id": 101, "channel_id": 11})
+    assert supervisor.preferred_worker(1, 11) == 1
+    supervisor.drop_worker(1)
+    assert supervisor.preferred_worker(1, 11) is None
+    assert supervisor.voice_states == {1: {100: (10, 0)}}
+    supervisor.update_voice_state(0, {"guild_id": 1, "bot_id": 100, "channel_id": None})
+    assert supervisor.voice_states == {}
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from types import SimpleNamespace
+
+from utils.profiler import SamplingProfiler
+
+
+async def busy_command(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def make_pool():
+    command = SimpleNamespace(callback=busy_command, qualified_name="busy")
+    bot = SimpleNamespace(walk_commands=lambda: [command], application_commands=[])
+    return SimpleNamespace(get_all_bots=lambda: [bot])
+
+
+def test_samples_are_attributed_to_task_and_command():
+
+    async def run():
+        profiler = SamplingProfiler(make_pool(), interval=0.005)
+        profiler.start()
+        await asyncio.create_task(busy_command(0.3), name="busy")
+        await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+        return profiler
+
+    profiler = asyncio.run(run())
+
+    assert profiler.samples >= 10
+    root, percent = profiler.summary(1)[0]
+    assert root == "task:busy_command;cmd:busy"
+    assert percent > 50
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in profiler.collapsed().splitlines())
+    assert "test_profiler.py:busy_command" in profiler.collapsed()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from utils.music.ratelimit import RateLimiter, priority_background, priority_interactive
+
+
+def test_burst_then_refill():
+
+    async def run():
+        ratelimiter = RateLimiter(requests=5, window=0.5)
+        start = time.monotonic()
+        for _ in range(5):
+            await ratelimiter.acquire()
+        burst = time.monotonic() - start
+        await ratelimiter.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(run())
+
+    assert burst < 0.05
+    # 10 tokens por segundo: o sexto pedido espera ~0.1s.
+    assert 0.07 < total < 0.3
+
+
+def test_interactive_requests_go_first():
+
+    async def run():
+        ratelimiter = RateLimiter(requests=1, window=0.05)
+        await ratelimiter.acquire()
+
+        order = []
+
+        async def request(name, priority):
+            await ratelimiter.acquire(priority)
+            order.append(name)
+
+        await asyncio.gather(
+            request("background 1", priority_background),
+            request("background 2", priority_background),
+            request("interactive", priority_interactive),
+        )
+
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "background 1", "background 2"]
+
+
+def test_block_delays_requests():
+
+    async def run():
+        ratelimiter = RateLimiter(requests=100, window=1)
+        ratelimiter.block(0.1)
+        start = time.monotonic()
+        await ratelimiter.acquire()
+        return time.monotonic() - start
+
+    assert 0.08 < asyncio.run(run()) < 0.3
+
+
+def test_cancelled_waiter_does_not_use_a_token():
+
+    async def run():
+        ratelimiter = RateLimiter(requests=1, window=0.1)
+        await ratelimiter.acquire()
+
+        waiter = asyncio.create_task(ratelimiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        start = time.monotonic()
+        await ratelimiter.acquire()
+        elapsed = time.monotonic() - start
+        await asyncio.sleep(0)
+        return elapsed, ratelimiter.tokens
+
+    elapsed, tokens = asyncio.run(run())
+
+    # sem o pedido cancelado a espera é de um token só (~0.1s).
+    assert elapsed < 0.18
+    assert tokens < 1
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from utils.music.recommendation_cache import RecommendationCache
+
+
+def test_concurrent_gets_share_factory():
+
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["track"]
+
+    async def run():
+        cache = RecommendationCache(path=None, name="test")
+        results = await asyncio.gather(*[cache.get("key", factory) for _ in range(5)])
+        return cache, results
+
+    cache, results = asyncio.run(run())
+
+    assert results == [["track"]] * 5
+    assert len(calls) == 1
+    assert cache.peek("key") == ["track"]
+    assert not cache.pending
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+
+    async def factory():
+        await asyncio.sleep(0.02)
+        return ["track"]
+
+    async def run():
+        cache = RecommendationCache(path=None, name="test")
+        leader = asyncio.create_task(cache.get("key", factory))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get("key", factory))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return cache, result
+
+    cache, result = asyncio.run(run())
+
+    assert result == ["track"]
+    assert cache.peek("key") == ["track"]
+    assert not cache.pending
+
+
+def test_factory_error_reaches_every_caller():
+
+    async def factory():
+        await asyncio.sleep(0.01)
+        raise ValueError("load failed")
+
+    async def run():
+        cache = RecommendationCache(path=None, name="test")
+        results = await asyncio.gather(*[cache.get("key", factory) for _ in range(3)], return_exceptions=True)
+        return cache, results
+
+    cache, results = asyncio.run(run())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.peek("key") is None
+    assert not cache.pending
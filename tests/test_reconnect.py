@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from types import SimpleNamespace
+
+from utils.music.ratelimit import priority_background
+from utils.music.reconnect import ReconnectManager, jitter
+
+
+class Migrations:
+
+    def __init__(self, latency: float = 0.01, fail: set = None):
+        self.latency = latency
+        self.fail = fail or set()
+        self.inflight = 0
+        self.max_inflight = 0
+        self.calls = []
+
+
+def make_manager(batch_size: int = 3, shard_rate: int = 60):
+    bot = SimpleNamespace(
+        config={"PLAYER_MIGRATION_BATCH_SIZE": batch_size, "VOICE_RECONNECT_SHARD_RATE": shard_rate},
+        identifier="bot", user="bot", loop=asyncio.get_running_loop(),
+    )
+    return ReconnectManager(bot)
+
+
+def make_player(guild_id: int, migrations: Migrations, node_id: str = "a"):
+
+    player = SimpleNamespace(_new_node_task=None, node=SimpleNamespace(identifier=node_id),
+                             guild=SimpleNamespace(id=guild_id, shard_id=0), channels=[])
+
+    async def _wait_for_new_node(ignore_node=None):
+        migrations.inflight += 1
+        migrations.max_inflight = max(migrations.max_inflight, migrations.inflight)
+        migrations.calls.append(guild_id)
+        try:
+            await asyncio.sleep(migrations.latency)
+        finally:
+            migrations.inflight -= 1
+        if guild_id in migrations.fail:
+            raise Exception("no nodes")
+
+    async def connect(channel_id):
+        player.channels.append(channel_id)
+
+    player._wait_for_new_node = _wait_for_new_node
+    player.connect = connect
+
+    return player
+
+
+def test_migrate_node_in_batches():
+
+    async def run():
+        manager = make_manager(batch_size=3)
+        migrations = Migrations(fail={4})
+        node = SimpleNamespace(players={n: make_player(n, migrations) for n in range(10)})
+        manager.migrate_node(node)
+        progress = dict(manager.migrations["a"])
+        await asyncio.gather(*[p._new_node_task for p in node.players.values()], return_exceptions=True)
+        await asyncio.sleep(0)
+        return manager, migrations, progress
+
+    manager, migrations, progress = asyncio.run(run())
+
+    assert progress == {"total": 10, "done": 0, "failed": 0}
+    assert migrations.max_inflight == 3
+    assert sorted(migrations.calls) == list(range(10))
+    assert manager.migrations == {}
+
+
+def test_migrate_without_restart_keeps_running_task():
+
+    async def run():
+        manager = make_manager()
+        migrations = Migrations(latency=0.05)
+        player = make_player(1, migrations)
+        manager.migrate(player)
+        task = player._new_node_task
+        manager.migrate(player, restart=False)
+        assert player._new_node_task is task
+        manager.migrate(player)
+        assert player._new_node_task is not task
+        await player._new_node_task
+        await asyncio.sleep(0)
+        return task, manager
+
+    task, manager = asyncio.run(run())
+
+    assert task.cancelled()
+    assert manager.migrations == {}
+
+
+def test_reconnect_voice_waits_for_shard_slot():
+
+    async def run():
+        manager = make_manager(shard_rate=60)
+        manager.get_shard_ratelimiter(0).tokens = 0
+        player = make_player(1, Migrations())
+        start = time.monotonic()
+        await manager.reconnect_voice(player, 10, priority=priority_background)
+        return player.channels, time.monotonic() - start
+
+    channels, elapsed = asyncio.run(run())
+
+    # 60 por minuto: um token a cada segundo.
+    assert channels == [10]
+    assert 0.9 < elapsed < 1.5
+
+
+def test_jitter_range():
+    values = [jitter(10) for _ in range(1000)]
+    assert 5 <= min(values) and max(values) <= 15
+    assert max(values) - min(values) > 5
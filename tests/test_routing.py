@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+from utils.music.routing import PoolRouter
+
+guild_id = 100
+text_channel_id = 200
+author_id = 300
+
+
+def make_perms(view_channel=True, read_message_history=True, send_messages=True):
+    return SimpleNamespace(
+        view_channel=view_channel, read_message_history=read_message_history, send_messages=send_messages
+    )
+
+
+def make_bot(bot_id: int, identifier: str, voice_channel_id: int = None, ready: bool = True, member: bool = True,
+             perms=None, channel: bool = True):
+
+    me = SimpleNamespace(voice=SimpleNamespace(channel=SimpleNamespace(id=voice_channel_id)) if voice_channel_id else None)
+    guild = SimpleNamespace(id=guild_id, me=me, get_member=lambda user_id: SimpleNamespace(id=user_id) if member else None)
+    text_channel = SimpleNamespace(id=text_channel_id, permissions_for=lambda m: perms or make_perms())
+
+    return SimpleNamespace(
+        user=SimpleNamespace(id=bot_id), identifier=identifier, bot_ready=ready, guild=guild,
+        get_guild=lambda g_id: guild if g_id == guild_id else None,
+        get_channel=lambda c_id: text_channel if channel and c_id == text_channel_id else None,
+    )
+
+
+def make_router(*bots):
+
+    router = PoolRouter(SimpleNamespace(bots=list(bots), guild_bots={}))
+
+    for bot in bots:
+        router.add_guild(bot, bot.guild)
+
+    return router
+
+
+def make_ctx(voice_channel_id: int = None):
+    return SimpleNamespace(
+        guild_id=guild_id, channel=SimpleNamespace(id=text_channel_id),
+        author=SimpleNamespace(id=author_id, voice=SimpleNamespace(channel=SimpleNamespace(id=voice_channel_id)) if voice_channel_id else None),
+    )
+
+
+def test_route_to_bot_in_member_voice_channel():
+    free = make_bot(1, "a")
+    voiced = make_bot(2, "b", voice_channel_id=10)
+    router = make_router(free, voiced)
+    assert router.route_message(make_ctx(10)) is voiced
+    assert router.route_message(make_ctx(11)) is free
+    assert router.route_message(make_ctx()) is free
+
+
+def test_route_skips_bots_that_cant_read_or_reply():
+    bots = [
+        make_bot(1, "a", ready=False),
+        make_bot(2, "b", voice_channel_id=20),
+        make_bot(3, "c", member=False),
+        make_bot(4, "d", channel=False),
+        make_bot(5, "e", perms=make_perms(view_channel=False)),
+        make_bot(6, "f", perms=make_perms(read_message_history=False)),
+        make_bot(7, "g", perms=make_perms(send_messages=False)),
+        make_bot(9, "i"),
+        make_bot(8, "h"),
+    ]
+    router = make_router(*bots)
+    assert router.route_message(make_ctx()) is bots[-1]
+
+
+def test_voice_bot_without_history_permission_is_skipped():
+    voiced = make_bot(1, "a", voice_channel_id=10, perms=make_perms(read_message_history=False))
+    free = make_bot(2, "b")
+    assert make_router(voiced, free).route_message(make_ctx(10)) is free
+    assert make_router(voiced).route_message(make_ctx(10)) is None
+
+
+def test_voice_index_updates():
+    bot = make_bot(1, "a", voice_channel_id=10)
+    router = make_router(bot)
+    assert router.voice_bot(guild_id, 10) is bot
+
+    router.update_voice(bot, guild_id, 11)
+    assert router.voice_bot(guild_id, 10) is None
+    assert router.voice_bot(guild_id, 11) is bot
+
+    router.remove_guild(bot, guild_id)
+    assert router.voice_bot(guild_id, 11) is None
+    assert router.bots_in_guild(guild_id) == []
+    assert router.voice_bots == {} and router.guild_members == {}
+
+
+def test_pool_bots_cache():
+    bot = make_bot(1, "a")
+    extra = make_bot(2, "b")
+    router = PoolRouter(SimpleNamespace(bots=[bot], guild_bots={str(guild_id): [extra]}))
+    assert router.pool_bots(guild_id) == [bot, extra]
+    assert router.pool_bots(1) == [bot]
+    router.pool.bots.append(extra)
+    assert router.pool_bots(1) == [bot]
+    router.invalidate()
+    assert router.pool_bots(1) == [bot, extra]
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from utils.music.lastfm_tools import LastFM, LastFmException
+from utils.music.scrobble import ScrobbleDispatcher, max_scrobble_age
+
+
+class FakeLastFM:
+
+    def __init__(self, errors: dict = None):
+        self.batches = []
+        self.errors = errors or {}
+
+    async def track_scrobble_batch(self, session_key: str, scrobbles: list):
+        if code := self.errors.get(session_key):
+            raise LastFmException({"error": code, "message": "error"})
+        self.batches.append((session_key, [s["track"] for s in scrobbles]))
+
+
+def make_dispatcher(tmp_path, **errors):
+    return ScrobbleDispatcher(FakeLastFM(errors), path=str(tmp_path / "queue"))
+
+
+def add(dispatcher: ScrobbleDispatcher, session_key: str, count: int, user_id: int = 1):
+    for n in range(count):
+        dispatcher.scrobble(session_key, user_id, "artist", f"{session_key} {n}")
+
+
+def test_batches_per_session(tmp_path):
+
+    async def run():
+        dispatcher = make_dispatcher(tmp_path)
+        add(dispatcher, "a", 120)
+        add(dispatcher, "b", 10, user_id=2)
+        assert dispatcher.wakeup.is_set()
+        sizes = []
+        for _ in range(3):
+            await dispatcher.flush()
+            sizes.append([(k, len(v)) for k, v in dispatcher.last_fm.batches])
+            dispatcher.last_fm.batches.clear()
+        return dispatcher, sizes
+
+    dispatcher, sizes = asyncio.run(run())
+
+    assert sizes == [[("a", 50), ("b", 10)], [("a", 50)], [("a", 20)]]
+    assert not any(dispatcher.queue.values())
+    assert ScrobbleDispatcher(FakeLastFM(), path=str(tmp_path / "queue")).queue == {}
+
+
+def test_queue_survives_restart(tmp_path):
+
+    async def run():
+        dispatcher = make_dispatcher(tmp_path, a=16)
+        add(dispatcher, "a", 3)
+        await dispatcher.flush()
+
+    asyncio.run(run())
+
+    restored = ScrobbleDispatcher(FakeLastFM(), path=str(tmp_path / "queue"))
+    assert [i["track"] for i in restored.queue["a"]] == ["a 0", "a 1", "a 2"]
+
+
+def test_retryable_error_requeues_in_order(tmp_path):
+
+    async def run():
+        dispatcher = make_dispatcher(tmp_path, a=29)
+        add(dispatcher, "a", 60)
+        dispatcher.queue["a"][1]["timestamp"] = int(time.time() - max_scrobble_age - 60)
+        await dispatcher.flush()
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+
+    # o lote volta pra frente da fila (sem o scrobble antigo demais) e espera antes da próxima tentativa.
+    assert [i["track"] for i in dispatcher.queue["a"]] == [f"a {n}" for n in range(60) if n != 1]
+    assert dispatcher.retry_after["a"] > time.time() + 30
+
+
+def test_invalid_session_drops_queue(tmp_path):
+
+    invalid = []
+
+    async def run():
+        dispatcher = make_dispatcher(tmp_path, a=9, b=6)
+
+        async def on_invalid_session(user_id):
+            invalid.append(user_id)
+
+        dispatcher.on_invalid_session = on_invalid_session
+        add(dispatcher, "a", 60, user_id=5)
+        add(dispatcher, "b", 2)
+        await dispatcher.flush()
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+
+    # erro 9 descarta a fila da sessão e outros erros (ex: 6) descartam só o lote.
+    assert invalid == [5]
+    assert not any(dispatcher.queue.values())
+
+
+def test_track_scrobble_batch_params():
+
+    lastfm = LastFM("key", "secret")
+    sent = []
+
+    async def post_lastfm(params):
+        sent.append(params)
+
+    lastfm.post_lastfm = post_lastfm
+
+    asyncio.run(lastfm.track_scrobble_batch("sk", [
+        {"artist": "A", "track": "T", "album": "Al", "duration": 200, "timestamp": 10, "chosen_by_user": True},
+        {"artist": "B", "track": "U", "album": None, "duration": None, "timestamp": 20, "chosen_by_user": False},
+    ]))
+
+    params = dict(sent[0])
+    api_sig = params.pop("api_sig")
+
+    assert params == {
+        "method": "track.scrobble", "api_key": "key", "sk": "sk",
+        "artist[0]": "A", "track[0]": "T", "timestamp[0]": "10", "album[0]": "Al", "duration[0]": "200",
+        "artist[1]": "B", "track[1]": "U", "timestamp[1]": "20", "chosenByUser[1]": "0",
+    }
+    assert api_sig == lastfm.generate_api_sig(params)
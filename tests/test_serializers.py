@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+from wavelink.serializers import dumps, loads, read_json
+
+player_update = {
+    "op": "playerUpdate",
+    "guildId": "1234567890",
+    "state": {"time": 1700000000000, "position": 60000, "connected": True, "ping": 50},
+}
+
+
+class FakeResponse:
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def read(self):
+        return self.data
+
+    def get_encoding(self):
+        return "utf-8"
+
+
+def test_loads_str_and_bytes():
+    raw = json.dumps(player_update)
+    assert loads(raw) == player_update
+    assert loads(raw.encode()) == player_update
+
+
+def test_dumps_round_trip():
+    data = dict(player_update, title="Café ☕")
+    assert json.loads(dumps(data)) == data
+
+
+def test_read_json():
+    data = {"loadType": "search", "data": [{"encoded": "QAAA", "info": {"title": "ação"}}]}
+    assert asyncio.run(read_json(FakeResponse(json.dumps(data).encode()))) == data
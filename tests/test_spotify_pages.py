@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+
+from utils.music.audio_sources.spotify import SpotifyClient
+
+
+def make_client(page_limit: int = 100, concurrency: int = 5, latency: float = 0.01, seed: int = 0):
+
+    client = SpotifyClient.__new__(SpotifyClient)
+    client.playlist_extra_page_limit = page_limit
+    client.page_concurrency = concurrency
+    client.inflight = 0
+    client.max_inflight = 0
+    client.offsets = []
+    client.cancelled = 0
+
+    rnd = random.Random(seed)
+
+    async def request(path: str, params: dict = None, priority: int = 0):
+        client.inflight += 1
+        client.max_inflight = max(client.max_inflight, client.inflight)
+        client.offsets.append(params["offset"])
+        try:
+            # páginas terminam fora de ordem.
+            await asyncio.sleep(latency * rnd.uniform(0.5, 1.5))
+        except asyncio.CancelledError:
+            client.cancelled += 1
+            raise
+        finally:
+            client.inflight -= 1
+        return {"items": [f"track {params['offset'] + n}" for n in range(100)]}
+
+    client.request = request
+
+    return client
+
+
+async def collect(client: SpotifyClient, total: int, stop_after: int = None):
+    pages = []
+    async for items in client.iter_playlist_pages("playlist", total=total):
+        pages.append(items)
+        if stop_after and len(pages) == stop_after:
+            break
+    return pages
+
+
+def test_pages_in_playlist_order():
+    client = make_client()
+    pages = asyncio.run(collect(client, total=1050))
+    assert [p[0] for p in pages] == [f"track {o}" for o in range(100, 1050, 100)]
+    assert sorted(client.offsets) == list(range(100, 1050, 100))
+    assert client.max_inflight == 5
+
+
+def test_page_limit():
+    client = make_client(page_limit=2)
+    pages = asyncio.run(collect(client, total=1000))
+    assert [p[0] for p in pages] == ["track 100", "track 200", "track 300"]
+    assert asyncio.run(collect(make_client(), total=100)) == []
+
+
+def test_stopping_early_cancels_pending_pages():
+
+    async def run():
+        client = make_client(concurrency=20, latency=0.05)
+        pages = await collect(client, total=2000, stop_after=1)
+        await asyncio.sleep(0)
+        return client, pages
+
+    client, pages = asyncio.run(run())
+
+    assert len(pages) == 1
+    assert client.cancelled > 0
+    assert client.inflight == 0
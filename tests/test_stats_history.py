@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from wavelink import stats as stats_module
+from wavelink.stats import Stats, StatsHistory
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(stats_module, "time", clock)
+    return clock
+
+
+def make_stats(memory: float = 10, cpu: float = 10, deficit: int = 0, uptime: int = 1000000):
+    return Stats(None, {
+        "uptime": uptime, "players": 1, "playingPlayers": 1,
+        "memory": {"free": 0, "used": memory, "allocated": 100, "reservable": 100},
+        "cpu": {"cores": 1, "systemLoad": cpu / 100, "lavalinkLoad": 0.1},
+        "frameStats": {"sent": 3000, "nulled": 0, "deficit": deficit},
+    })
+
+
+def fill(history: StatsHistory, clock: Clock, memory: list, interval: float = 60):
+    for n, value in enumerate(memory):
+        assert history.add(make_stats(memory=value, uptime=1000000 + n * 60000))
+        clock.now += interval
+    clock.now -= interval
+
+
+def test_min_interval(clock):
+    history = StatsHistory(min_interval=30)
+    assert history.add(make_stats())
+    clock.now += 10
+    assert not history.add(make_stats())
+    clock.now += 25
+    assert history.add(make_stats())
+    assert len(history.samples) == 2
+
+
+def test_trend_and_check(clock):
+
+    history = StatsHistory()
+    fill(history, clock, [10, 10, 10, 10])
+    assert history.trend("memory") == 0
+    assert history.check() == (0, [])
+
+    history = StatsHistory()
+    fill(history, clock, [40, 50, 60, 70, 80])
+    # 10% a cada 60s: abaixo do limite agora, mas acima dele em 300s.
+    assert history.trend("memory") == pytest.approx(10 / 60)
+    assert history.predict("memory") == pytest.approx(70 + 10 / 60 * 300)
+    level, reasons = history.check()
+    assert level == 1 and reasons[0].startswith("memory")
+
+    history = StatsHistory()
+    fill(history, clock, [95, 95, 95])
+    assert history.check()[0] == 2
+
+    history = StatsHistory()
+    history.add(make_stats(deficit=60))
+    assert history.mean("frame_loss") == 2
+    assert history.check() == (2, ["frame_loss: 2.0%"])
+
+
+def test_gap_starts_new_series(clock):
+    history = StatsHistory()
+    fill(history, clock, [95, 95, 95])
+    clock.now += history.max_age + 1
+    assert history.add(make_stats(memory=10))
+    assert len(history.samples) == 1
+    assert history.mean("memory") == 10
+
+
+def test_restart_starts_new_series(clock):
+    history = StatsHistory()
+    fill(history, clock, [95, 95, 95])
+    clock.now += 60
+    assert history.add(make_stats(memory=10, uptime=5000))
+    assert [data["memory"] for t, data in history.samples] == [10]
+
+
+def test_stale_history_is_ignored(clock):
+    history = StatsHistory()
+    fill(history, clock, [95, 95, 95])
+    assert history.check()[0] == 2
+    clock.now += history.max_age + 1
+    assert history.mean("memory") is None
+    assert history.trend("memory") == 0
+    assert history.check() == (0, [])
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import struct
+from base64 import b64encode
+
+import pytest
+
+from utils.music.track_encoder import decode_track, decode_tracks, encode_track, encode_tracks
+
+
+def utf(value: str) -> bytes:
+    data = value.encode()
+    return struct.pack(">H", len(data)) + data
+
+
+def nullable_utf(value) -> bytes:
+    return b"\x01" + utf(value) if value else b"\x00"
+
+
+def lavaplayer_message(version: int, fields: bytes) -> str:
+    # mesmo formato do MessageOutput do lavaplayer: header com a flag de versionado + tamanho da mensagem.
+    if version == 1:
+        return b64encode(struct.pack(">i", len(fields)) + fields).decode()
+    body = bytes([version]) + fields
+    return b64encode(struct.pack(">i", len(body) | 1 << 30) + body).decode()
+
+
+youtube_track = {
+    "title": "Rick Astley - Never Gonna Give You Up (Official Music Video)",
+    "author": "Rick Astley",
+    "length": 212000,
+    "identifier": "dQw4w9WgXcQ",
+    "isStream": False,
+    "uri": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "artworkUrl": "https://i.ytimg.com/vi/dQw4w9WgXcQ/maxresdefault.jpg",
+    "isrc": None,
+    "sourceName": "youtube",
+    "position": 0,
+}
+
+spotify_track = {
+    "title": "Blinding Lights",
+    "author": "The Weeknd",
+    "length": 200040,
+    "identifier": "0VjIjW4GlUZAMYd2vXMi3b",
+    "isStream": False,
+    "uri": "https://open.spotify.com/track/0VjIjW4GlUZAMYd2vXMi3b",
+    "artworkUrl": "https://i.scdn.co/image/ab67616d0000b2738863bc11d2aa12b54f5aeb36",
+    "isrc": "USUG11904206",
+    "sourceName": "spotify",
+    "position": 35000,
+}
+
+
+def v3_fields(track: dict, source_fields: bytes = b"") -> bytes:
+    return (
+        utf(track["title"]) + utf(track["author"]) + struct.pack(">q", track["length"]) + utf(track["identifier"])
+        + bytes([track["isStream"]]) + nullable_utf(track["uri"]) + nullable_utf(track["artworkUrl"])
+        + nullable_utf(track["isrc"]) + utf(track["sourceName"]) + source_fields + struct.pack(">q", track["position"])
+    )
+
+
+@pytest.mark.parametrize("track", [youtube_track, spotify_track])
+def test_encode_matches_lavaplayer_layout(track):
+    assert encode_track(track) == (3, lavaplayer_message(3, v3_fields(track)))
+
+
+@pytest.mark.parametrize("track", [youtube_track, spotify_track])
+def test_round_trip(track):
+    version, decoded = decode_track(encode_track(track)[1])
+    assert version == 3
+    assert decoded == track
+
+
+def test_round_trip_v2():
+    track = {k: v for k, v in youtube_track.items() if k not in ("artworkUrl", "isrc")}
+    version, encoded = encode_track(track)
+    assert version == 2
+    assert decode_track(encoded) == (2, track)
+
+
+def test_decode_v1_message():
+    fields = (
+        utf("Song") + utf("Artist") + struct.pack(">q", 1000) + utf("abc") + b"\x00" + utf("soundcloud")
+        + struct.pack(">q", 0)
+    )
+    version, track = decode_track(lavaplayer_message(1, fields))
+    assert version == 1
+    assert track["title"] == "Song"
+    assert track["uri"] is None
+    assert track["sourceName"] == "soundcloud"
+
+
+def test_decode_skips_unknown_source_fields():
+    # o http source grava o formato do arquivo depois do sourceName.
+    track = dict(youtube_track, sourceName="http", position=1234)
+    version, decoded = decode_track(lavaplayer_message(3, v3_fields(track, utf("mp3"))))
+    assert decoded == track
+
+
+def test_decode_with_source_decoder():
+    track = dict(youtube_track, sourceName="http")
+    encoded = lavaplayer_message(3, v3_fields(track, utf("mp3")))
+
+    def http_decoder(reader, info):
+        info["probeInfo"] = reader.read_utf()
+
+    assert decode_track(encoded, {"http": http_decoder})[1]["probeInfo"] == "mp3"
+
+
+def test_decode_non_ascii():
+    track = dict(spotify_track, title="Café del Mar", author="Energy 52")
+    assert decode_track(lavaplayer_message(3, v3_fields(track)))[1]["title"] == "Café del Mar"
+
+
+def test_decode_truncated():
+    encoded = encode_track(youtube_track)[1]
+    with pytest.raises(Exception):
+        decode_track(encoded[:-12])
+
+
+def test_batch_matches_single():
+    tracks = [youtube_track, spotify_track, dict(spotify_track, isrc=None, position=0)] * 3
+    encoded = encode_tracks(tracks)
+    assert encoded == [encode_track(t)[1] for t in tracks]
+    assert decode_tracks(encoded) == tracks
+
+
+def test_missing_keys():
+    with pytest.raises(Exception):
+        encode_tracks([{"title": "x"}])
@@ -6,10 +6,13 @@ import datetime
 import gc
 import json
 import logging
+import math
 import os
 import pickle
 import subprocess
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
 from copy import deepcopy
 from importlib import import_module
@@ -21,7 +24,6 @@ import aiohttp
 import disnake
 import requests
 from aiohttp import ClientSession
-from async_timeout import timeout
 from cachetools import TTLCache
 from disnake.ext import commands
 from disnake.http import Route
@@ -29,18 +31,25 @@ from user_agent import generate_user_agent
 
 import wavelink
 from config_loader import load_config
+from utils import metrics
 from utils.db import MongoDatabase, LocalDatabase, get_prefix, DBModel, global_db_models
 from utils.music.audio_sources.deezer import DeezerClient
 from utils.music.audio_sources.spotify import SpotifyClient
 from utils.music.checks import check_pool_bots
 from utils.music.errors import GenericError
+from utils.music.hedged_search import SearchProviderStats
 from utils.music.lastfm_tools import LastFM
-from utils.music.local_lavalink import run_lavalink
+from utils.music.recommendation_cache import RecommendationCache
+from utils.music.reconnect import ReconnectManager
+from utils.music.routing import PoolRouter
+from utils.music.scrobble import ScrobbleDispatcher
+from utils.music.local_lavalink import LocalLavalinkSupervisor
 from utils.music.models import music_mode, LavalinkPlayer, LavalinkPlaylist, LavalinkTrack, PartialTrack, \
     native_sources, CustomYTDL
 from utils.music.remote_lavalink_serverlist import get_lavalink_servers
 from utils.others import CustomContext, token_regex, sort_dict_recursively
 from utils.owner_panel import PanelView
+from utils.pool_ipc import PoolSupervisor, PoolIPCClient
 from web_app import WSClient, start
 
 if os.name != "nt":
@@ -72,31 +81,59 @@ class BotPool:
     song_select_cooldown = commands.CooldownMapping.from_cooldown(rate=2, per=15, type=commands.BucketType.member)
 
     def __init__(self):
+        self.startup = metrics.StartupTimer()
+        self.worker_id: Optional[int] = int(os.environ["POOL_WORKER_ID"]) if os.environ.get("POOL_WORKER_ID") else None
+        self.worker_count: int = int(os.environ.get("POOL_WORKERS") or 1)
+        # no modo multi-processo cada processo usa seus próprios arquivos de cache/fila.
+        worker_suffix = f"_{self.worker_id}" if self.worker_id else ""
+        self.ipc: Optional[PoolIPCClient] = None
+        self.supervisor: Optional[PoolSupervisor] = None
         self.user_prefix_cache = {}
         self.guild_prefix_cache = {}
         self.mongo_database: Optional[MongoDatabase] = None
         self.local_database: Optional[LocalDatabase] = None
         self.ws_client: Optional[WSClient] = None
         self.emoji_data = {}
-        self.config = self.load_cfg()
+        with self.startup.phase("config"):
+            self.config = self.load_cfg()
         self.playlist_cache = TTLCache(maxsize=self.config["PLAYLIST_CACHE_SIZE"], ttl=self.config["PLAYLIST_CACHE_TTL"])
         self.partial_track_cache =  TTLCache(maxsize=1000, ttl=80400)
         self.integration_cache = TTLCache(maxsize=500, ttl=7200)
         self.spotify: Optional[SpotifyClient] = None
         self.deezer = DeezerClient(self.playlist_cache)
-        self.lavalink_instance: Optional[subprocess.Popen] = None
+        self.search_stats = SearchProviderStats()
+        # buscas do scrobble usam outro perfil (spotify/deezer/ytmsearch sem filtro de título).
+        self.scrobble_search_stats = SearchProviderStats()
+        self.recommendation_cache = RecommendationCache(maxsize=self.config["RECOMMENDATION_CACHE_SIZE"],
+                                                        ttl=self.config["RECOMMENDATION_CACHE_TTL"],
+                                                        path=f"./.recommendation_cache{worker_suffix}")
+        self.scrobble_metadata_cache = RecommendationCache(maxsize=self.config["SCROBBLE_METADATA_CACHE_SIZE"],
+                                                           ttl=self.config["SCROBBLE_METADATA_CACHE_TTL"],
+                                                           path=f"./.lastfm_metadata_cache{worker_suffix}",
+                                                           name="scrobble_metadata")
+        self.loadtracks_cache = RecommendationCache(maxsize=self.config["LOADTRACKS_CACHE_SIZE"],
+                                                    ttl=self.config["LOADTRACKS_CACHE_TTL"], path=None,
+                                                    name="loadtracks")
+        self.lavalink_supervisor: Optional[LocalLavalinkSupervisor] = None
         self.commit = ""
         self.remote_git_url = ""
         self.max_counter: int = 0
         self.message_ids = TTLCache(ttl=30, maxsize=20000)
+        self.router = PoolRouter(self)
         self.bot_mentions = set()
         self.single_bot = True
         self.loop: Optional[asyncio.EventLoop] = None
         self.failed_bots: dict = {}
         self.current_useragent = self.reset_useragent()
         self.processing_gc: bool = False
-        self.lavalink_connect_queue = {}
+        self.lavalink_session: Optional[aiohttp.ClientSession] = None
+        self.lavalink_ws_session: Optional[aiohttp.ClientSession] = None
+        self.lavalink_stats = {}
+        self.lavalink_stats_history = {}
+        self.lavalink_connect_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.draining_nodes = set()
         self.last_fm: Optional[LastFM] = None
+        self.scrobble_dispatcher: Optional[ScrobbleDispatcher] = None
         self.lastfm_sessions = {}
         self.player_skins = {}
         self.player_static_skins = {}
@@ -106,39 +143,43 @@ class BotPool:
         self.default_idling_skin = self.config.get("DEFAULT_IDLING_SKIN", "default")
         self.cache_updater_task: Optional[asyncio.Task] = None
         self.lyric_data_cache = TTLCache(maxsize=30000, ttl=600*10)
-        self.ytdl = CustomYTDL(
-            {
-                'format': 'webm[abr>0]/bestaudio/best',
-                'extract_flat': True,
-                'quiet': True,
-                'no_warnings': True,
-                'lazy_playlist': True,
-                'playlist_items': '1-700',
-                'simulate': True,
-                'download': False,
-                'cachedir': False,
-                'allowed_extractors': [
-                    r'.*youtube.*',
-                    r'.*soundcloud.*',
-                ],
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': [
-                            'web',
-                            'android',
-                            'android_creator',
-                            'web_creator',
-                        ],
-                        'max_comments': [0],
-                    },
-                    'youtubetab': {
-                        "skip": ["webpage", "authcheck"]
-                    }
+        # o yt-dlp só é inicializado no primeiro uso (carregar os extractors deixa a inicialização mais lenta).
+        self.ytdl_options = {
+            'format': 'webm[abr>0]/bestaudio/best',
+            'extract_flat': True,
+            'quiet': True,
+            'no_warnings': True,
+            'lazy_playlist': True,
+            'playlist_items': '1-700',
+            'simulate': True,
+            'download': False,
+            'cachedir': False,
+            'allowed_extractors': [
+                r'.*youtube.*',
+                r'.*soundcloud.*',
+            ],
+            'extractor_args': {
+                'youtube': {
+                    'player_client': [
+                        'web',
+                        'android',
+                        'android_creator',
+                        'web_creator',
+                    ],
+                    'max_comments': [0],
+                },
+                'youtubetab': {
+                    "skip": ["webpage", "authcheck"]
                 }
             }
-        )
+        }
+        self.ytdl_instance: Optional[CustomYTDL] = None
 
-        self.load_cache()
+    @property
+    def ytdl(self) -> CustomYTDL:
+        if not self.ytdl_instance:
+            self.ytdl_instance = CustomYTDL(self.ytdl_options)
+        return self.ytdl_instance
 
     def reset_useragent(self):
         self.current_useragent = generate_user_agent()
@@ -172,21 +213,27 @@ class BotPool:
             async with aiofiles.open("./local_database/playlist_cache.pkl", 'wb') as f:
                 await f.write(pickle.dumps(self.playlist_cache))
 
-    async def connect_lavalink_queue_task(self, identifier: str):
-
-        delay_secs = int(self.config.get("LAVALINK_QUEUE_DELAY", 1.5))
-
-        try:
-            while True:
-                async with timeout(600):
-                    bot, data = await self.lavalink_connect_queue[identifier].get()
-                    await bot.get_cog("Music").connect_node(data)
-                    await asyncio.sleep(delay_secs)
-        except asyncio.TimeoutError:
-            pass
+    def get_lavalink_session(self) -> aiohttp.ClientSession:
+        # sessão/connector http único para os nodes de todos os bots da pool (as conexões rest com cada servidor
+        # lavalink são reaproveitadas entre os bots).
+        if not self.lavalink_session or self.lavalink_session.closed:
+            self.lavalink_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config["LAVALINK_CONNECTOR_LIMIT"], ttl_dns_cache=300,
+                                               keepalive_timeout=60)
+            )
+        return self.lavalink_session
+
+    def get_lavalink_ws_session(self) -> aiohttp.ClientSession:
+        # websockets ficam abertos o tempo todo (um por bot em cada node): num connector separado e sem limite pra não
+        # ocuparem as vagas das requisições rest.
+        if not self.lavalink_ws_session or self.lavalink_ws_session.closed:
+            self.lavalink_ws_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0, ttl_dns_cache=300)
+            )
+        return self.lavalink_ws_session
 
     def get_guild_bots(self, guild_id: int) -> list:
-        return self.bots + self.guild_bots.get(str(guild_id), [])
+        return self.router.pool_bots(guild_id)
 
     def get_all_bots(self) -> list:
 
@@ -200,6 +247,13 @@ class BotPool:
 
         return list(allbots)
 
+    async def claim_message(self, msg_id: str, guild_id: int, voice_channel_id: Optional[int] = None) -> bool:
+        # modo multi-processo: somente um processo da pool processa a mensagem (com prioridade para o processo que
+        # já tem um bot no canal de voz do membro).
+        if self.ipc:
+            return await self.ipc.claim(msg_id, guild_id, voice_channel_id)
+        return True
+
     @property
     def database(self) -> Union[LocalDatabase, MongoDatabase]:
 
@@ -208,27 +262,24 @@ class BotPool:
 
         return self.local_database
 
-    async def start_lavalink(self):
+    def get_lavalink_supervisor(self) -> LocalLavalinkSupervisor:
 
-        if self.lavalink_instance:
-            try:
-                self.lavalink_instance.kill()
-            except:
-                traceback.print_exc()
+        if not self.lavalink_supervisor:
+            self.lavalink_supervisor = LocalLavalinkSupervisor(
+                self, instances=self.config["LAVALINK_INSTANCES"],
+                base_port=int(os.environ.get("SERVER_PORT") or 8090),
+                health_interval=self.config["LAVALINK_HEALTH_CHECK_INTERVAL"],
+            )
+
+        return self.lavalink_supervisor
+
+    async def start_lavalink(self):
 
         if not self.loop:
             self.loop = asyncio.get_event_loop()
 
         try:
-            self.lavalink_instance = await self.loop.run_in_executor(
-                None, lambda: run_lavalink(
-                    lavalink_file_url=self.config['LAVALINK_FILE_URL'],
-                    lavalink_initial_ram=self.config['LAVALINK_INITIAL_RAM'],
-                    lavalink_ram_limit=self.config['LAVALINK_RAM_LIMIT'],
-                    lavalink_additional_sleep=int(self.config['LAVALINK_ADDITIONAL_SLEEP']),
-                    use_jabba=self.config["USE_JABBA"]
-                )
-            )
+            await self.get_lavalink_supervisor().start()
         except Exception:
             traceback.print_exc()
 
@@ -301,6 +352,7 @@ class BotPool:
             self.failed_bots[bot.identifier] = e
             try:
                 self.bots.remove(bot)
+                self.router.invalidate()
             except:
                 pass
 
@@ -315,7 +367,17 @@ class BotPool:
             await asyncio.sleep(3)
 
         music_cog = bot.get_cog("Music")
-        if music_cog:
+        if not music_cog:
+            return
+
+        try:
+            semaphore = self.lavalink_connect_semaphores[data["identifier"]]
+        except KeyError:
+            semaphore = self.lavalink_connect_semaphores[data["identifier"]] = asyncio.Semaphore(
+                max(self.config["LAVALINK_CONNECT_CONCURRENCY"], 1)
+            )
+
+        async with semaphore:
             await music_cog.connect_node(data)
 
     async def check_node(self, data: dict):
@@ -370,7 +432,7 @@ class BotPool:
                     backoff += 2
                     retries += 1
 
-        if data['identifier'] == 'LOCAL' and self.mongo_database and data["info"]["check_version"] > 3 and [i for i in data["info"].get("plugins", {}) if i["name"] == "youtube-plugin"]:
+        if data['identifier'].startswith('LOCAL') and self.mongo_database and data["info"]["check_version"] > 3 and [i for i in data["info"].get("plugins", {}) if i["name"] == "youtube-plugin"]:
 
             try:
                 mongo_data = await self.mongo_database._connect["global"]["global"].find_one({"_id": "youtube_data"}) or {}
@@ -396,28 +458,162 @@ class BotPool:
 
         for bot in self.get_all_bots():
             self.loop.create_task(self.connect_node(bot, data))
-            await asyncio.sleep(1)
 
     def node_check(self, lavalink_servers: dict, start_local=True):
 
         if start_local and "LOCAL" not in lavalink_servers:
-            localnode = {
-                'host': '127.0.0.1',
-                'port': os.environ.get("SERVER_PORT") or 8090,
-                'password': 'youshallnotpass',
-                'identifier': 'LOCAL',
-                'region': 'us_central',
-                'retries': 120,
-                'prefer_youtube_native_playback': self.config["PREFER_YOUTUBE_NATIVE_PLAYBACK"],
-                'only_use_native_search_providers': self.config["ONLY_USE_NATIVE_SEARCH_PROVIDERS"],
-                'search_providers': self.config["SEARCH_PROVIDERS"].strip().split() or ["amsearch", "tdsearch", "spsearch", "ytsearch", "scsearch"]
-            }
-            self.loop.create_task(self.check_node(localnode))
+
+            supervisor = self.get_lavalink_supervisor()
+
+            for instance in range(supervisor.instances):
+                localnode = dict(
+                    supervisor.node_data(instance),
+                    prefer_youtube_native_playback=self.config["PREFER_YOUTUBE_NATIVE_PLAYBACK"],
+                    only_use_native_search_providers=self.config["ONLY_USE_NATIVE_SEARCH_PROVIDERS"],
+                    search_providers=self.config["SEARCH_PROVIDERS"].strip().split() or ["amsearch", "tdsearch", "spsearch", "ytsearch", "scsearch"]
+                )
+                self.loop.create_task(self.check_node(localnode))
 
         for data in lavalink_servers.values():
             self.loop.create_task(self.check_node(data))
 
-    def process_track_cls(self, data: list, playlists: dict = None):
+    def get_node_players(self, identifier: str) -> list:
+
+        players = []
+
+        for bot in self.get_all_bots():
+            try:
+                node = bot.music.nodes[identifier]
+            except KeyError:
+                continue
+            players.extend(p for p in node.players.values() if not p.is_closing)
+
+        return players
+
+    async def drain_node(self, identifier: str, percent: int = 100, target: str = None, block_new: bool = False) -> dict:
+        """
+        Move os players do servidor lavalink informado (de todos os bots da pool) para os outros servidores,
+        mantendo a faixa, posição, filtros, volume e pause. Com block_new o servidor também deixa de receber novos
+        players até ser liberado com undrain_node.
+        """
+
+        if block_new:
+            self.draining_nodes.add(identifier)
+
+        # players parados/pausados vão primeiro (a troca de servidor não é percebida pelos membros).
+        players = sorted(self.get_node_players(identifier), key=lambda p: bool(p.current) and not p.paused)
+
+        players = players[:math.ceil(len(players) * min(max(percent, 0), 100) / 100)]
+
+        result = {"total": len(players), "moved": 0, "failed": 0}
+
+        semaphore = asyncio.Semaphore(max(self.config["PLAYER_MIGRATION_BATCH_SIZE"], 1))
+
+        # players atribuídos a cada servidor nesta migração (as requisições ainda não terminaram).
+        assigned = {}
+
+        def select_node(player):
+
+            if target:
+                return player.bot.music.get_node(target)
+
+            nodes = [n for n in player.bot.music.nodes.values()
+                     if n.identifier != identifier and n.available and n.is_available and not n.draining]
+
+            if nodes:
+                return min(nodes, key=lambda n: (n.health, len(n.players) + assigned.get(n.identifier, 0)))
+
+        async def move(player):
+
+            async with semaphore:
+
+                if player.is_closing or (player._new_node_task and not player._new_node_task.done()) \
+                        or player.node.identifier != identifier:
+                    result["total"] -= 1
+                    return
+
+                if not (node := select_node(player)) or not node.is_available or node == player.node:
+                    result["failed"] += 1
+                    return
+
+                assigned[node.identifier] = assigned.get(node.identifier, 0) + 1
+
+                try:
+                    await player.change_node(node.identifier)
+                except Exception:
+                    traceback.print_exc()
+                    result["failed"] += 1
+                    return
+                finally:
+                    assigned[node.identifier] -= 1
+
+                player.native_yt = True
+                player.set_command_log(text=f"プレイヤーが音楽サーバー **{node.identifier}** に移動しました。", emoji="🌎")
+                player.update = True
+                result["moved"] += 1
+
+        await asyncio.gather(*[move(p) for p in players])
+
+        print(f"🔀 - [{identifier}] プレイヤーの移行が完了しました: {result['moved']}/{result['total']}（失敗: {result['failed']}）")
+
+        return result
+
+    def undrain_node(self, identifier: str):
+        self.draining_nodes.discard(identifier)
+
+    def node_overload_reason(self, node: wavelink.Node) -> Optional[str]:
+
+        # considera a média recente e a tendência das estatísticas (o limite previsto para os próximos minutos também
+        # inicia a migração, antes do áudio começar a falhar).
+        level, reasons = node.stats_history.check(
+            {
+                "cpu": self.config["NODE_AUTO_DRAIN_CPU"],
+                "frame_loss": self.config["NODE_AUTO_DRAIN_FRAME_LOSS"],
+                "memory": self.config["NODE_AUTO_DRAIN_MEMORY"],
+            }
+        )
+
+        if level:
+            return " | ".join(reasons)
+
+    async def node_health_monitor(self, interval: int = 60, cooldown: int = 600):
+
+        last_drain = {}
+
+        while True:
+
+            await asyncio.sleep(interval)
+
+            try:
+                nodes = {}
+
+                for bot in self.get_all_bots():
+                    for node in bot.music.nodes.values():
+                        if node.stats and node.is_available:
+                            nodes.setdefault(node.identifier, node)
+
+                if len(nodes) < 2:
+                    continue
+
+                for identifier, node in nodes.items():
+
+                    if identifier in self.draining_nodes or time.monotonic() - last_drain.get(identifier, 0) < cooldown:
+                        continue
+
+                    if not (reason := self.node_overload_reason(node)):
+                        continue
+
+                    last_drain[identifier] = time.monotonic()
+
+                    print(f"⚠️ - [{identifier}] 音楽サーバーが過負荷です（{reason}）。"
+                          f"プレイヤーの{self.config['NODE_AUTO_DRAIN_PERCENT']}%を他のサーバーに移行します。")
+
+                    self.loop.create_task(self.drain_node(identifier, percent=self.config["NODE_AUTO_DRAIN_PERCENT"]))
+
+            except Exception:
+                traceback.print_exc()
+
+    def process_track_cls(self, data: list, playlists: dict = None, keep_ids: bool = False):
 
         if not playlists:
             playlists = {}
@@ -444,7 +640,9 @@ class BotPool:
                     playlists[playlist["url"]] = playlist_cls
                     playlist = playlist_cls
 
-            if info["sourceName"] not in native_sources:
+            # ids de sources de plugins só são mantidos quando o servidor de origem é compatível (ex: cache de
+            # recomendações separado por compatibility_key).
+            if not keep_ids and info["sourceName"] not in native_sources:
                 try:
                     del info["id"]
                 except KeyError:
@@ -564,20 +762,35 @@ class BotPool:
         except Exception:
             print(traceback.format_exc())
 
-    def setup(self):
+    def run_supervisor(self, workers: int, start_local: bool = False):
 
-        self.load_skins()
+        if not self.config["MONGO"]:
+            print("⚠️ - マルチプロセスモードではMongoDBの使用を推奨します（ローカルデータベースは複数のプロセスで共有されます）。")
 
-        if self.config['ENABLE_LOGGER']:
+        self.supervisor = PoolSupervisor(self, workers=workers,
+                                         heartbeat_timeout=self.config["POOL_WORKER_HEARTBEAT_TIMEOUT"])
 
-            if not os.path.isdir("./.logs"):
-                os.makedirs("./.logs")
+        if start_local:
+            print("⚠️ - マルチプロセスモード: ローカルLavalinkはメインプロセスで監視されるため、統計情報によるチェックと"
+                  "再起動前のプレイヤー移動は行われません（プロセスと/v4/infoのみ確認します）。")
+            self.loop.create_task(self.start_lavalink())
 
-            logger = logging.getLogger()
-            logger.setLevel(logging.DEBUG)
-            handler = logging.FileHandler(filename='./.logs/disnake.log', encoding='utf-8', mode='w')
-            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
-            logger.addHandler(handler)
+        self.loop.create_task(self.supervisor.run())
+
+        if self.config["RUN_RPC_SERVER"]:
+            # as conexões rpc dos bots de cada processo são feitas com o servidor rpc deste processo.
+            try:
+                start(self)
+            except KeyboardInterrupt:
+                return
+
+        else:
+            try:
+                self.loop.run_forever()
+            except KeyboardInterrupt:
+                return
+
+    def load_lavalink_serverlist(self):
 
         LAVALINK_SERVERS = {}
 
@@ -600,6 +813,100 @@ class BotPool:
         else:
             ini_file = "lavalink.ini"
 
+        return LAVALINK_SERVERS, ini_file
+
+    def load_git_info(self):
+
+        try:
+            self.commit = check_output(['git', 'rev-parse', 'HEAD']).decode('ascii').strip()
+            print(f"📥 - コミットバージョン: {self.commit}")
+        except:
+            self.commit = None
+
+        try:
+            self.remote_git_url = check_output(['git', 'remote', '-v']).decode(
+                'ascii').strip().split("\n")[0][7:].replace(".git", "").replace(" (fetch)", "")
+        except:
+            pass
+
+        if not self.remote_git_url:
+            self.remote_git_url = self.config["SOURCE_REPO"]
+
+    def setup(self):
+
+        os.environ.update(
+            {
+                "GIT_DIR": self.config["GIT_DIR"],
+                "JISHAKU_HIDE": "true",
+                "JISHAKU_NO_DM_TRACEBACK": "true",
+                "JISHAKU_NO_UNDERSCORE": "true",
+             }
+        )
+
+        # etapas independentes (arquivos, rede e git) são executadas em paralelo.
+        executor = ThreadPoolExecutor(max_workers=4)
+        skins_task = executor.submit(self.startup.run, "skins", self.load_skins)
+        cache_task = executor.submit(self.startup.run, "caches", self.load_cache)
+        git_task = executor.submit(self.startup.run, "git", self.load_git_info)
+        serverlist_task = executor.submit(self.startup.run, "lavalink_serverlist", self.load_lavalink_serverlist)
+
+        if self.config['ENABLE_LOGGER']:
+
+            if not os.path.isdir("./.logs"):
+                os.makedirs("./.logs")
+
+            logger = logging.getLogger()
+            logger.setLevel(logging.DEBUG)
+            handler = logging.FileHandler(filename='./.logs/disnake.log', encoding='utf-8', mode='w')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+            logger.addHandler(handler)
+
+        intents = disnake.Intents(**{i[:-7].lower(): v for i, v in self.config.items() if i.lower().endswith("_intent")})
+        intents.members = True
+        intents.guilds = True
+
+        mongo_key = self.config.get("MONGO")
+
+        with self.startup.phase("database"):
+
+            if mongo_key:
+                self.mongo_database = MongoDatabase(mongo_key, timeout=self.config["MONGO_TIMEOUT"],
+                                                    cache_maxsize=self.config["DBCACHE_SIZE"],
+                                                    cache_ttl=self.config["DBCACHE_TTL"])
+                print("🍃 - 使用中のデータベース: MongoDB")
+            else:
+                print("🎲 - 使用中のデータベース: TinyMongo | 注意: データベースファイルはlocal_databaseフォルダにローカル保存されます")
+
+            self.local_database = LocalDatabase(cache_maxsize=self.config["DBCACHE_SIZE"],
+                                                cache_ttl=self.config["DBCACHE_TTL"])
+
+        prefix = get_prefix if intents.message_content else commands.when_mentioned
+
+        self.ws_client = WSClient(self.config["RPC_SERVER"], pool=self)
+
+        with self.startup.phase("music_sources"):
+
+            try:
+                spotify_client = SpotifyClient(
+                    client_id=self.config['SPOTIFY_CLIENT_ID'],
+                    client_secret=self.config['SPOTIFY_CLIENT_SECRET'],
+                    playlist_extra_page_limit=self.config['SPOTIFY_PLAYLIST_EXTRA_PAGE_LIMIT']
+                )
+            except Exception as e:
+                print(f"⚠️ - Spotifyの内部サポートが無効になりました: {repr(e)}")
+                spotify_client = None
+
+            self.spotify = spotify_client
+
+            if self.config["LASTFM_KEY"] and self.config["LASTFM_SECRET"]:
+                self.last_fm = LastFM(api_key=self.config["LASTFM_KEY"], api_secret=self.config["LASTFM_SECRET"])
+                self.last_fm.recommendation_cache = self.recommendation_cache
+                self.scrobble_dispatcher = ScrobbleDispatcher(
+                    self.last_fm, path=f"./.lastfm_scrobble_queue_{self.worker_id}" if self.worker_id else "./.lastfm_scrobble_queue"
+                )
+
+        LAVALINK_SERVERS, ini_file = serverlist_task.result()
+
         for key, value in self.config.items():
 
             if key.lower().startswith("lavalink_node_"):
@@ -632,66 +939,6 @@ class BotPool:
         else:
             start_local = False
 
-        intents = disnake.Intents(**{i[:-7].lower(): v for i, v in self.config.items() if i.lower().endswith("_intent")})
-        intents.members = True
-        intents.guilds = True
-
-        mongo_key = self.config.get("MONGO")
-
-        if mongo_key:
-            self.mongo_database = MongoDatabase(mongo_key, timeout=self.config["MONGO_TIMEOUT"],
-                                                cache_maxsize=self.config["DBCACHE_SIZE"],
-                                                cache_ttl=self.config["DBCACHE_TTL"])
-            print("🍃 - 使用中のデータベース: MongoDB")
-        else:
-            print("🎲 - 使用中のデータベース: TinyMongo | 注意: データベースファイルはlocal_databaseフォルダにローカル保存されます")
-
-        self.local_database = LocalDatabase(cache_maxsize=self.config["DBCACHE_SIZE"],
-                                            cache_ttl=self.config["DBCACHE_TTL"])
-
-        os.environ.update(
-            {
-                "GIT_DIR": self.config["GIT_DIR"],
-                "JISHAKU_HIDE": "true",
-                "JISHAKU_NO_DM_TRACEBACK": "true",
-                "JISHAKU_NO_UNDERSCORE": "true",
-             }
-        )
-
-        try:
-            self.commit = check_output(['git', 'rev-parse', 'HEAD']).decode('ascii').strip()
-            print(f"📥 - コミットバージョン: {self.commit}")
-        except:
-            self.commit = None
-
-        try:
-            self.remote_git_url = check_output(['git', 'remote', '-v']).decode(
-                'ascii').strip().split("\n")[0][7:].replace(".git", "").replace(" (fetch)", "")
-        except:
-            pass
-
-        if not self.remote_git_url:
-            self.remote_git_url = self.config["SOURCE_REPO"]
-
-        prefix = get_prefix if intents.message_content else commands.when_mentioned
-
-        self.ws_client = WSClient(self.config["RPC_SERVER"], pool=self)
-
-        try:
-            spotify_client = SpotifyClient(
-                client_id=self.config['SPOTIFY_CLIENT_ID'],
-                client_secret=self.config['SPOTIFY_CLIENT_SECRET'],
-                playlist_extra_page_limit=self.config['SPOTIFY_PLAYLIST_EXTRA_PAGE_LIMIT']
-            )
-        except Exception as e:
-            print(f"⚠️ - Spotifyの内部サポートが無効になりました: {repr(e)}")
-            spotify_client = None
-
-        self.spotify = spotify_client
-
-        if self.config["LASTFM_KEY"] and self.config["LASTFM_SECRET"]:
-            self.last_fm = LastFM(api_key=self.config["LASTFM_KEY"], api_secret=self.config["LASTFM_SECRET"])
-
         all_tokens = {}
 
         for k, v in dict(os.environ, **self.config).items():
@@ -715,8 +962,12 @@ class BotPool:
             elif (token := tokens.pop()) not in all_tokens.values():
                 all_tokens[k] = token
 
+        bot_index = 0
+
         def load_bot(bot_name: str, token: str, guild_id: str = None, load_modules_log: bool = False):
 
+            nonlocal bot_index
+
             try:
                 token = token.split().pop()
             except:
@@ -726,6 +977,12 @@ class BotPool:
                 print(f"{bot_name} をスキップしました（トークンが指定されていません）...")
                 return
 
+            bot_index += 1
+
+            # modo multi-processo: cada processo carrega somente a sua parte dos bots.
+            if self.worker_id is not None and (bot_index - 1) % self.worker_count != self.worker_id:
+                return
+
             try:
                 test_guilds = list([int(i) for i in self.config[f"TEST_GUILDS_{bot_name}"].split("||")])
             except:
@@ -759,6 +1016,27 @@ class BotPool:
 
                     return True
 
+            @bot.listen("on_voice_state_update")
+            async def update_voice_routing(member: disnake.Member, before: disnake.VoiceState, after: disnake.VoiceState):
+
+                if member.id != bot.user.id or before.channel == after.channel:
+                    return
+
+                channel_id = after.channel.id if after.channel else None
+
+                self.router.update_voice(bot, member.guild.id, channel_id)
+
+                if self.ipc:
+                    self.ipc.update_voice_state(member.guild.id, bot.user.id, channel_id)
+
+            @bot.listen("on_guild_join")
+            async def add_guild_routing(guild: disnake.Guild):
+                self.router.add_guild(bot, guild)
+
+            @bot.listen("on_guild_remove")
+            async def remove_guild_routing(guild: disnake.Guild):
+                self.router.remove_guild(bot, guild.id)
+
             @bot.listen("on_resumed")
             async def clear_gc():
 
@@ -858,6 +1136,7 @@ class BotPool:
 
             @bot.event
             async def on_ready():
+                self.router.load_bot(bot)
                 print(f'🟢 - {bot.user} - [{bot.user.id}] オンラインになりました。')
 
             async def initial_setup():
@@ -867,12 +1146,14 @@ class BotPool:
                 if bot.session is None:
                     bot.session = aiohttp.ClientSession()
 
-                bot.music.session = bot.session
+                bot.music.session = self.get_lavalink_session()
+                bot.music.ws_session = self.get_lavalink_ws_session()
 
                 try:
                     bot.interaction_id = bot.user.id
 
-                    bot.load_modules(load_modules_log=load_modules_log)
+                    with self.startup.phase("load_modules"):
+                        bot.load_modules(load_modules_log=load_modules_log)
 
                     bot.sync_command_cooldowns()
 
@@ -890,6 +1171,9 @@ class BotPool:
 
                 bot.bot_ready = True
 
+                if self.startup.ready():
+                    print(self.startup.report())
+
             bot.loop.create_task(initial_setup())
 
             if guild_id:
@@ -897,10 +1181,12 @@ class BotPool:
                 try:
                     self.guild_bots[guild_id].append(bot)
                 except KeyError:
-                    self.guild_bots = {guild_id: [bot]}
+                    self.guild_bots[guild_id] = [bot]
             else:
                 self.bots.append(bot)
 
+            self.router.invalidate()
+
         if len(all_tokens) > 1:
             self.single_bot = False
 
@@ -909,27 +1195,53 @@ class BotPool:
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
 
-        for k, v in all_tokens.items():
-            load_bot(k, v, load_modules_log=load_modules_log)
-            load_modules_log = False
+        for task in (skins_task, cache_task, git_task):
+            task.result()
 
-        try:
-            with open("guild_bots.json") as f:
-                guild_bots = json.load(f)
-        except FileNotFoundError:
-            pass
-        except Exception:
-            traceback.print_exc()
-        else:
-            for guild_id, guildbotsdata in guild_bots.items():
-                for n, guildbottoken in enumerate(guildbotsdata):
-                    load_bot(f"{guild_id}_{n}", guildbottoken, guild_id, load_modules_log=load_modules_log)
-                    load_modules_log = False
+        executor.shutdown(wait=False)
+
+        if self.worker_id is None and self.config["POOL_WORKERS"] > 1 and len(all_tokens) > 1:
+            self.run_supervisor(workers=min(self.config["POOL_WORKERS"], len(all_tokens)), start_local=start_local)
+            return
+
+        if self.worker_id is not None:
+            self.ipc = PoolIPCClient(self, worker_id=self.worker_id, port=int(os.environ["POOL_IPC_PORT"]))
+            self.loop.create_task(self.ipc.run())
+
+        with self.startup.phase("load_bots"):
+
+            for k, v in all_tokens.items():
+                load_bot(k, v, load_modules_log=load_modules_log)
+                load_modules_log = False
+
+            try:
+                with open("guild_bots.json") as f:
+                    guild_bots = json.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                traceback.print_exc()
+            else:
+                for guild_id, guildbotsdata in guild_bots.items():
+                    for n, guildbottoken in enumerate(guildbotsdata):
+                        load_bot(f"{guild_id}_{n}", guildbottoken, guild_id, load_modules_log=load_modules_log)
+                        load_modules_log = False
 
         message = ""
 
         self.loop.create_task(self.setup_pool_extras())
 
+        self.loop.create_task(metrics.loop_lag_sampler(self.config["METRICS_LOOP_LAG_INTERVAL"] / 1000))
+
+        self.loop.create_task(self.recommendation_cache.save_task())
+        self.loop.create_task(self.scrobble_metadata_cache.save_task())
+
+        if self.scrobble_dispatcher:
+            self.loop.create_task(self.scrobble_dispatcher.run())
+
+        if self.config["NODE_AUTO_DRAIN_CPU"] or self.config["NODE_AUTO_DRAIN_FRAME_LOSS"] or self.config["NODE_AUTO_DRAIN_MEMORY"]:
+            self.loop.create_task(self.node_health_monitor())
+
         if not self.bots:
 
             message = "ボットのトークンが正しく設定されていません！"
@@ -950,7 +1262,8 @@ class BotPool:
 
         else:
 
-            if start_local:
+            # no modo multi-processo o lavalink local é iniciado pelo supervisor.
+            if start_local and self.worker_id is None:
                 self.loop.create_task(self.start_lavalink())
 
             if self.spotify and not self.spotify.spotify_cache:
@@ -958,7 +1271,7 @@ class BotPool:
 
             self.node_check(LAVALINK_SERVERS, start_local=start_local)
 
-        if self.config["RUN_RPC_SERVER"]:
+        if self.config["RUN_RPC_SERVER"] and self.worker_id is None:
 
             self.cache_updater_task = self.loop.create_task(self.cache_updater())
 
@@ -976,7 +1289,8 @@ class BotPool:
 
         else:
 
-            self.cache_updater_task = self.loop.create_task(self.cache_updater())
+            if not self.worker_id:
+                self.cache_updater_task = self.loop.create_task(self.cache_updater())
 
             self.loop.create_task(self.connect_rpc_ws())
 
@@ -1008,6 +1322,7 @@ class BotCore(commands.AutoShardedBot):
         self.music: wavelink.Client = music_mode(self)
         self.interaction_id: Optional[int] = None
         self.wavelink_node_reconnect_tasks = {}
+        self.reconnect_manager = ReconnectManager(self)
 
         for i in self.config["OWNER_IDS"].split("||"):
 
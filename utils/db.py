@@ -19,6 +19,8 @@ from tinydb_serialization import Serializer, SerializationMiddleware
 from tinymongo import TinyMongoClient
 from tinymongo.serializers import DateTimeSerializer
 
+from utils import metrics
+
 if TYPE_CHECKING:
     from utils.client import BotCore
 
@@ -174,7 +176,8 @@ class LocalDatabase(BaseDB):
         if (cached_result := self.cache.get(f"{collection}:{db_name}:{id_}")) is not None:
             return cached_result
 
-        data = self._connect[collection][db_name].find_one({"_id": id_})
+        with metrics.db_calls.time(backend="local", op="get_data"):
+            data = self._connect[collection][db_name].find_one({"_id": id_})
 
         if not data:
             data = deepcopy(default_model[db_name])
@@ -196,8 +199,9 @@ class LocalDatabase(BaseDB):
         data["_id"] = id_
 
         try:
-            if not self._connect[collection][db_name].update_one({'_id': id_}, {'$set': data}).raw_result:
-                self._connect[collection][db_name].insert_one(data)
+            with metrics.db_calls.time(backend="local", op="update_data"):
+                if not self._connect[collection][db_name].update_one({'_id': id_}, {'$set': data}).raw_result:
+                    self._connect[collection][db_name].insert_one(data)
         except:
             traceback.print_exc()
 
@@ -282,7 +286,8 @@ class MongoDatabase(BaseDB):
         if (cached_result := self.cache.get(f"{collection}:{db_name}:{id_}")) is not None:
             return cached_result
 
-        data = await self._connect[collection][db_name].find_one({"_id": id_})
+        with metrics.db_calls.time(backend="mongo", op="get_data"):
+            data = await self._connect[collection][db_name].find_one({"_id": id_})
 
         if not data:
             return deepcopy(default_model[db_name])
@@ -304,7 +309,8 @@ class MongoDatabase(BaseDB):
         except KeyError:
             pass
 
-        await self._connect[collection][db_name].update_one({'_id': str(id_)}, {'$set': data}, upsert=True)
+        with metrics.db_calls.time(backend="mongo", op="update_data"):
+            await self._connect[collection][db_name].update_one({'_id': str(id_)}, {'$set': data}, upsert=True)
         return data
 
     async def query_data(self, db_name: str, collection: str, filter: dict = None, limit=100) -> list:
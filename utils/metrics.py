@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import psutil
+
+default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+
+    __slots__ = ("name", "description", "values")
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+
+    __slots__ = ()
+
+    def set(self, value: float, **labels):
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def remove(self, **labels):
+        self.values.pop(tuple(sorted(labels.items())), None)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+
+    __slots__ = ("name", "description", "buckets", "values")
+
+    def __init__(self, name: str, description: str = "", buckets: tuple = default_buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Tuple[Tuple[str, str], ...], list] = {}
+
+    def observe(self, value: float, **labels):
+
+        key = tuple(sorted(labels.items()))
+
+        try:
+            data = self.values[key]
+        except KeyError:
+            # [contagem por bucket..., +Inf, soma]
+            data = self.values[key] = [0] * (len(self.buckets) + 2)
+
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> Optional[dict]:
+
+        try:
+            data = self.values[tuple(sorted(labels.items()))]
+        except KeyError:
+            return
+
+        count = sum(data[:-1])
+
+        return {"count": count, "sum": data[-1], "avg": data[-1] / count if count else 0}
+
+    def render(self):
+
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+
+        for key, data in self.values.items():
+            cumulative = 0
+            for n, bucket in enumerate(self.buckets):
+                cumulative += data[n]
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', str(bucket)),))} {cumulative}")
+            cumulative += data[-2]
+            lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {data[-1]}")
+            lines.append(f"{self.name}_count{format_labels(key)} {cumulative}")
+
+        return lines
+
+
+# valores com aspas/barra/quebra de linha (ex: nomes de servidores) quebrariam o formato de exposição.
+label_escapes = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def format_labels(key: tuple):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v).translate(label_escapes)}"' for k, v in key) + "}"
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str = ""):
+        try:
+            return self.metrics[name]
+        except KeyError:
+            return self.register(Counter(name, description))
+
+    def gauge(self, name: str, description: str = ""):
+        try:
+            return self.metrics[name]
+        except KeyError:
+            return self.register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str = "", buckets: tuple = default_buckets):
+        try:
+            return self.metrics[name]
+        except KeyError:
+            return self.register(Histogram(name, description, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+loop_lag = registry.histogram(
+    "musicbot_event_loop_lag_seconds", "Atraso do event loop medido pelo sampler.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+lavalink_loadtracks = registry.histogram(
+    "musicbot_lavalink_loadtracks_seconds", "Tempo das requisições /loadtracks no lavalink."
+)
+lavalink_update_player = registry.histogram(
+    "musicbot_lavalink_update_player_seconds", "Tempo das requisições REST de update_player no lavalink."
+)
+lavalink_errors = registry.counter(
+    "musicbot_lavalink_request_errors_total", "Requisições REST ao lavalink que falharam."
+)
+db_calls = registry.histogram(
+    "musicbot_database_call_seconds", "Tempo das chamadas ao banco de dados."
+)
+controller_edit = registry.histogram(
+    "musicbot_controller_update_seconds", "Tempo para enviar/editar o player-controller (invoke_np)."
+)
+lavalink_node_health = registry.gauge(
+    "musicbot_lavalink_node_health", "Saúde do servidor lavalink (0: normal, 1: piorando, 2: sobrecarregado)."
+)
+lavalink_node_stats = registry.gauge(
+    "musicbot_lavalink_node_stats_percent", "Média recente de perda de frames, cpu e memória do servidor lavalink (%)."
+)
+lavalink_node_trend = registry.gauge(
+    "musicbot_lavalink_node_stats_trend", "Tendência (pontos percentuais por minuto) das estatísticas do servidor lavalink."
+)
+resolve_track = registry.histogram(
+    "musicbot_resolve_track_seconds", "Tempo para converter uma PartialTrack em faixa do lavalink."
+)
+startup_phase = registry.gauge(
+    "musicbot_startup_phase_seconds", "Duração de cada etapa da inicialização."
+)
+time_to_first_command = registry.gauge(
+    "musicbot_time_to_first_command_seconds", "Tempo desde o início do processo até o primeiro bot aceitar comandos."
+)
+
+
+class StartupTimer:
+    """
+    Tempo de cada etapa da inicialização (etapas executadas em paralelo são medidas separadamente) e tempo
+    desde o início do processo até o primeiro bot ficar pronto para receber comandos.
+    """
+
+    def __init__(self):
+        try:
+            self.start = psutil.Process().create_time()
+        except Exception:
+            self.start = time.time()
+        self.phases: Dict[str, float] = {}
+        self.first_command: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def run(self, name: str, func, *args):
+        with self.phase(name):
+            return func(*args)
+
+    def record(self, name: str, duration: float):
+        duration = self.phases[name] = self.phases.get(name, 0) + duration
+        startup_phase.set(duration, phase=name)
+
+    def ready(self) -> bool:
+
+        if self.first_command is not None:
+            return False
+
+        self.first_command = time.time() - self.start
+        time_to_first_command.set(self.first_command)
+        return True
+
+    def report(self) -> str:
+
+        lines = [f"⏱️ - 起動時間: {self.first_command:.2f}秒（最初のコマンド受付まで）"]
+
+        for name, duration in sorted(self.phases.items(), key=lambda i: i[1], reverse=True):
+            lines.append(f"   - {name}: {duration:.2f}秒")
+
+        return "\n".join(lines)
+
+
+async def loop_lag_sampler(interval: float = 0.5):
+
+    loop = asyncio.get_running_loop()
+
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        loop_lag.observe(max(loop.time() - start - interval, 0))
@@ -7,12 +7,12 @@ from urllib.parse import quote
 
 from aiohttp import ClientSession
 from cachetools import TTLCache
-from rapidfuzz import fuzz
 
 from utils.music.converters import fix_characters, URL_REG
 from utils.music.errors import GenericError
+from utils.music.matching import filter_by_title
 from utils.music.models import LavalinkTrack, LavalinkPlaylist
-from utils.music.track_encoder import encode_track
+from utils.music.track_encoder import encode_track, encode_tracks
 
 deezer_regex = re.compile(r"(https?://)?(www\.)?deezer\.com/(?P<countrycode>[a-zA-Z]{2}/)?(?P<type>track|album|playlist|artist|profile)/(?P<identifier>[0-9]+)")
 
@@ -73,9 +73,8 @@ class DeezerClient:
             else:
                 tracks = []
 
-                for result in tracks_result:
-
-                    trackinfo = {
+                trackinfos = [
+                    {
                         'title': result['title'],
                         'author': result['artist']['name'],
                         'length': int(result['duration'] * 1000),
@@ -86,17 +85,17 @@ class DeezerClient:
                         'position': 0,
                         'artworkUrl': result['album']['cover_big'],
                         'isrc': result.get('isrc'),
-                    }
+                    } for result in tracks_result
+                ]
 
-                    t = LavalinkTrack(id_=encode_track(trackinfo)[1], info=trackinfo, requester=requester)
+                for result, trackinfo, track_id in zip(tracks_result, trackinfos, encode_tracks(trackinfos)):
+
+                    t = LavalinkTrack(id_=track_id, info=trackinfo, requester=requester)
 
                     artists = result.get('contributors') or [result['artist']]
 
                     t.info["extra"]["authors"] = [a['name'] for a in artists]
 
-                    if check_title and fuzz.token_sort_ratio(url.lower(), f"{t.authors_string} - {t.single_title}".lower()) < check_title:
-                        continue
-
                     t.info["extra"]["authors_md"] = ", ".join(
                         f"[`{fix_characters(a['name'])}`](https://www.deezer.com/artist/{a['id']})" for a in
                         artists)
@@ -110,6 +109,9 @@ class DeezerClient:
 
                     tracks.append(t)
 
+                if check_title:
+                    tracks = filter_by_title(url.lower(), tracks, [f"{t.authors_string} - {t.single_title}".lower() for t in tracks], check_title)
+
                 return tracks
 
         if url.startswith("https://deezer.page.link/"):
@@ -266,22 +268,24 @@ class DeezerClient:
 
         playlist_info = playlist if url_type != "album" else None
 
-        for t in tracks_data:
-
-            trackinfo = {
-                'title': result['title'],
-                'author': result['artist']['name'],
-                'length': int(result['duration'] * 1000),
-                'identifier': str(result['id']),
+        trackinfos = [
+            {
+                'title': t['title'],
+                'author': t['artist']['name'],
+                'length': int(t['duration'] * 1000),
+                'identifier': str(t['id']),
                 'isStream': False,
-                'uri': result['link'],
+                'uri': t['link'],
                 'sourceName': 'deezer',
                 'position': 0,
-                'artworkUrl': result['album']['cover_big'],
-                'isrc': result.get('isrc'),
-            }
+                'artworkUrl': t['album']['cover_big'],
+                'isrc': t.get('isrc'),
+            } for t in tracks_data
+        ]
+
+        for t, trackinfo, track_id in zip(tracks_data, trackinfos, encode_tracks(trackinfos)):
 
-            track = LavalinkTrack(id_=encode_track(trackinfo)[1], info=trackinfo, requester=requester, playlist=playlist_info)
+            track = LavalinkTrack(id_=track_id, info=trackinfo, requester=requester, playlist=playlist_info)
 
             artists = t.get('contributors') or [t['artist']]
 
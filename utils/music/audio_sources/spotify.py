@@ -14,12 +14,13 @@ from urllib.parse import quote
 
 import aiofiles
 from aiohttp import ClientSession
-from rapidfuzz import fuzz
 
 from utils.music.converters import fix_characters, URL_REG
 from utils.music.errors import GenericError
+from utils.music.matching import filter_by_title
 from utils.music.models import LavalinkTrack, LavalinkPlaylist
-from utils.music.track_encoder import encode_track
+from utils.music.ratelimit import RateLimiter, priority_interactive, priority_background
+from utils.music.track_encoder import encode_track, encode_tracks
 
 if TYPE_CHECKING:
     from utils.client import BotCore
@@ -30,7 +31,6 @@ spotify_regex_w_user = re.compile("https://open.spotify.com?.+(album|playlist|ar
 
 spotify_cache_file = os.path.join(gettempdir(), ".spotify_cache.json")
 
-
 class SpotifyClient:
 
     def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None, playlist_extra_page_limit: int = 0):
@@ -49,10 +49,13 @@ class SpotifyClient:
         self.client_secret = client_secret
         self.base_url = "https://api.spotify.com/v1"
         self.spotify_cache = {}
-        self.disabled = False
+        self.disabled_until = 0.0
         self.type = "api"
-        self.token_refresh = False
+        self.token_refresh_task: Optional[asyncio.Task] = None
         self.playlist_extra_page_limit = playlist_extra_page_limit
+        self.page_concurrency = 5
+        self.ratelimiter = RateLimiter(requests=100, window=30)
+        self.max_retry_after = 60
 
         try:
             with open(spotify_cache_file) as f:
@@ -60,29 +63,44 @@ class SpotifyClient:
         except FileNotFoundError:
             pass
 
-    async def request(self, path: str, params: dict = None):
+    @property
+    def disabled(self):
+        return time.time() < self.disabled_until
 
-        if self.disabled:
-            return
+    async def request(self, path: str, params: dict = None, priority: int = priority_interactive):
 
-        headers = {'Authorization': f'Bearer {await self.get_valid_access_token()}'}
+        for attempt in range(3):
 
-        async with ClientSession() as session:
-            async with session.get(f"{self.base_url}/{path}", headers=headers, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 401:
-                    await self.get_access_token()
-                    return await self.request(path=path, params=params)
-                elif response.status == 404:
-                    raise GenericError("**Não houve resultado para o link informado (confira se o link está correto ou se o conteúdo dele está privado ou se foi deletado).**\n\n"
-                                       f"{str(response.url).replace('api.', 'open.').replace('/v1/', '/').replace('s/', '/')}")
-                elif response.status == 429:
-                    self.disabled = True
-                    print(f"⚠️ - Spotify: Suporte interno desativado devido a ratelimit (429).")
-                    return
-                else:
-                    response.raise_for_status()
+            if self.disabled:
+                return
+
+            await self.ratelimiter.acquire(priority)
+
+            headers = {'Authorization': f'Bearer {await self.get_valid_access_token()}'}
+
+            async with ClientSession() as session:
+                async with session.get(f"{self.base_url}/{path}", headers=headers, params=params) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    elif response.status == 401:
+                        await self.get_access_token()
+                        continue
+                    elif response.status == 404:
+                        raise GenericError("**Não houve resultado para o link informado (confira se o link está correto ou se o conteúdo dele está privado ou se foi deletado).**\n\n"
+                                           f"{str(response.url).replace('api.', 'open.').replace('/v1/', '/').replace('s/', '/')}")
+                    elif response.status == 429:
+                        try:
+                            retry_after = int(response.headers["Retry-After"])
+                        except (KeyError, ValueError):
+                            retry_after = 5
+                        self.ratelimiter.block(retry_after)
+                        if retry_after > self.max_retry_after:
+                            self.disabled_until = time.time() + retry_after
+                            print(f"⚠️ - Spotify: Suporte interno desativado por {retry_after}s devido a ratelimit (429).")
+                            return
+                        continue
+                    else:
+                        response.raise_for_status()
 
     async def get_track_info(self, track_id: str):
         return await self.request(path=f'tracks/{track_id}')
@@ -97,26 +115,43 @@ class SpotifyClient:
 
         result = await self.request(path=f"playlists/{playlist_id}")
 
-        if len(result["tracks"]["items"]) == 100 and self.playlist_extra_page_limit > 0:
+        if result["tracks"]["next"] and self.playlist_extra_page_limit > 0:
+            async for items in self.iter_playlist_pages(playlist_id, total=result["tracks"]["total"]):
+                result["tracks"]["items"].extend(items)
 
-            offset = 101
-            page_count = 0
+        return result
+
+    async def iter_playlist_pages(self, playlist_id: str, total: int, offset: int = 100):
 
-            while True:
+        # todas as páginas restantes são requisitadas ao mesmo tempo (limitado por page_concurrency)
+        # mas entregues na ordem da playlist, permitindo adicionar cada página na fila assim que chegar.
+        offsets = list(range(offset, total, 100))[:self.playlist_extra_page_limit + 1]
+
+        if not offsets:
+            return
+
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch_page(page_offset: int):
+            async with semaphore:
+                return await self.request(path=f"playlists/{playlist_id}/tracks", params={"offset": page_offset, "limit": 100})
+
+        tasks = [asyncio.create_task(fetch_page(o)) for o in offsets]
+
+        try:
+            for task in tasks:
                 try:
-                    result_extra = await self.request(path=f"playlists/{playlist_id}/tracks?offset={offset}&limit=100")
+                    page = await task
                 except:
                     traceback.print_exc()
                     break
-                else:
-                    result["tracks"]["items"].extend(result_extra["items"])
-                    if result_extra["next"] and page_count <= self.playlist_extra_page_limit:
-                        offset += 100
-                        page_count += 1
-                        continue
+                if not page:
                     break
-
-        return result
+                yield page["items"]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
     async def get_user_info(self, user_id: str):
         return await self.request(path=f"users/{user_id}")
@@ -124,7 +159,7 @@ class SpotifyClient:
     async def get_user_playlists(self, user_id: str):
         return await self.request(path=f"users/{user_id}/playlists")
 
-    async def get_recommendations(self, seed_tracks: Union[list, str], limit=10):
+    async def get_recommendations(self, seed_tracks: Union[list, str], limit=10, priority: int = priority_background):
         if isinstance(seed_tracks, str):
             track_ids = seed_tracks
         else:
@@ -132,59 +167,50 @@ class SpotifyClient:
 
         return await self.request(path='recommendations', params={
             'seed_tracks': track_ids, 'limit': limit
-        })
+        }, priority=priority)
 
-    async def track_search(self, query: str):
+    async def track_search(self, query: str, limit: int = 10, priority: int = priority_interactive):
         return await self.request(path='search', params = {
-        'q': quote(query), 'type': 'track', 'limit': 10
-        })
+        'q': quote(query), 'type': 'track', 'limit': limit
+        }, priority=priority)
 
     async def get_access_token(self):
 
-        if self.token_refresh:
-            while self.token_refresh:
-                await asyncio.sleep(1)
-            return
+        if not self.token_refresh_task or self.token_refresh_task.done():
+            self.token_refresh_task = asyncio.create_task(self.refresh_access_token())
 
-        self.token_refresh = True
+        await asyncio.shield(self.token_refresh_task)
 
-        try:
-            token_url = 'https://accounts.spotify.com/api/token'
+    async def refresh_access_token(self):
 
-            headers = {
-                'Authorization': 'Basic ' + base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
-            }
+        token_url = 'https://accounts.spotify.com/api/token'
 
-            data = {
-                'grant_type': 'client_credentials'
-            }
-
-            async with ClientSession() as session:
-                async with session.post(token_url, headers=headers, data=data) as response:
-                    data = await response.json()
+        headers = {
+            'Authorization': 'Basic ' + base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+        }
 
-                if data.get("error"):
-                    print(f"⚠️ - Spotify: Ocorreu um erro ao obter token: {data['error_description']}")
-                    self.client_id = None
-                    self.client_secret = None
-                    await self.get_access_token()
-                    return
+        data = {
+            'grant_type': 'client_credentials'
+        }
 
-                self.spotify_cache = data
+        async with ClientSession() as session:
+            async with session.post(token_url, headers=headers, data=data) as response:
+                data = await response.json()
 
-                self.type = "api"
+        if data.get("error"):
+            print(f"⚠️ - Spotify: Ocorreu um erro ao obter token: {data['error_description']}")
+            self.disabled_until = float("inf")
+            raise GenericError(f"**Falha ao obter token do spotify:** `{data['error_description']}`")
 
-                self.spotify_cache["tyoe"] = "api"
+        self.spotify_cache = data
 
-                self.spotify_cache["expires_at"] = time.time() + self.spotify_cache["expires_in"]
+        self.type = "api"
 
-                print("🎶 - Access token do spotify obtido com sucesso via API Oficial.")
+        self.spotify_cache["tyoe"] = "api"
 
-        except Exception as e:
-            self.token_refresh = False
-            raise e
+        self.spotify_cache["expires_at"] = time.time() + self.spotify_cache["expires_in"]
 
-        self.token_refresh = False
+        print("🎶 - Access token do spotify obtido com sucesso via API Oficial.")
 
         async with aiofiles.open(spotify_cache_file, "w") as f:
             await f.write(json.dumps(self.spotify_cache))
@@ -194,7 +220,8 @@ class SpotifyClient:
             await self.get_access_token()
         return self.spotify_cache["access_token"]
 
-    async def get_tracks(self, bot: BotCore, requester: int, query: str, search: bool = True, check_title: float = None):
+    async def get_tracks(self, bot: BotCore, requester: int, query: str, search: bool = True, check_title: float = None,
+                         priority: int = priority_interactive, stream: bool = False):
 
         if spotify_link_regex.match(query):
             async with bot.session.get(query, allow_redirects=False) as r:
@@ -207,7 +234,7 @@ class SpotifyClient:
             if URL_REG.match(query) or not search:
                 return
 
-            r = await self.track_search(query=query)
+            r = await self.track_search(query=query, priority=priority)
 
             tracks = []
 
@@ -240,9 +267,6 @@ class SpotifyClient:
                     t.info["extra"]["authors"] = [fix_characters(i['name']) for i in result['artists'] if f"feat. {i['name'].lower()}"
                                                   not in result['name'].lower()]
 
-                    if check_title and fuzz.token_sort_ratio(query.lower(), f"{t.authors_string} - {t.single_title}".lower()) < check_title:
-                        continue
-
                     try:
                         t.info["isrc"] = result["external_ids"]["isrc"]
                     except KeyError:
@@ -261,6 +285,9 @@ class SpotifyClient:
 
                     tracks.append(t)
 
+                if check_title:
+                    tracks = filter_by_title(query.lower(), tracks, [f"{t.authors_string} - {t.single_title}".lower() for t in tracks], check_title)
+
                 return tracks
 
             return
@@ -407,8 +434,19 @@ class SpotifyClient:
             cache_key = f"partial:spotify:{url_type}:{url_id}"
 
             if not (result := bot.pool.playlist_cache.get(cache_key)):
-                result = await self.get_playlist_info(url_id)
-                bot.pool.playlist_cache[cache_key] = result
+
+                if stream:
+                    # apenas a primeira página é aguardada, as demais são carregadas pelo player enquanto toca.
+                    result = await self.request(path=f"playlists/{url_id}")
+                    stream = bool(result["tracks"]["next"] and self.playlist_extra_page_limit > 0)
+                    if not stream:
+                        bot.pool.playlist_cache[cache_key] = result
+                else:
+                    result = await self.get_playlist_info(url_id)
+                    bot.pool.playlist_cache[cache_key] = result
+
+            else:
+                stream = False
 
             data["playlistInfo"]["name"] = result["name"]
             data["playlistInfo"]["thumb"] = result["images"][0]["url"]
@@ -431,10 +469,37 @@ class SpotifyClient:
 
         playlist_info = playlist if url_type != "album" else None
 
-        for t in tracks_data:
+        playlist.tracks = self.build_playlist_tracks(tracks_data, requester, playlist_info)
+
+        if url_type == "playlist" and stream:
+            playlist.expected_count = min(result["tracks"]["total"], 100 * (self.playlist_extra_page_limit + 2))
+            playlist.pending_pages = self.stream_playlist_pages(bot, cache_key, url_id, result, requester, playlist_info)
 
-            if not t:
-                continue
+        return playlist
+
+    async def stream_playlist_pages(self, bot: BotCore, cache_key: str, playlist_id: str, result: dict, requester: int,
+                                    playlist_info: LavalinkPlaylist):
+
+        pages = self.iter_playlist_pages(playlist_id, total=result["tracks"]["total"])
+
+        try:
+            async for items in pages:
+                result["tracks"]["items"].extend(items)
+                yield self.build_playlist_tracks([t["track"] for t in items], requester, playlist_info)
+        finally:
+            await pages.aclose()
+
+        bot.pool.playlist_cache[cache_key] = result
+
+    def build_playlist_tracks(self, tracks_data: list, requester: int, playlist_info: Optional[LavalinkPlaylist]):
+
+        tracks = []
+
+        tracks_data = [t for t in tracks_data if t]
+
+        trackinfos = []
+
+        for t in tracks_data:
 
             try:
                 thumb = t["album"]["images"][0]["url"]
@@ -458,7 +523,11 @@ class SpotifyClient:
             except KeyError:
                 pass
 
-            track = LavalinkTrack(id_=encode_track(trackinfo)[1], info=trackinfo, requester=requester, playlist=playlist_info)
+            trackinfos.append(trackinfo)
+
+        for t, trackinfo, track_id in zip(tracks_data, trackinfos, encode_tracks(trackinfos)):
+
+            track = LavalinkTrack(id_=track_id, info=trackinfo, requester=requester, playlist=playlist_info)
 
             try:
                 if t["album"]["name"] != t["name"] or t["album"]["total_tracks"] > 1:
@@ -476,6 +545,6 @@ class SpotifyClient:
                 track.info["extra"]["authors"] = ["Unknown Artist"]
                 track.info["extra"]["authors_md"] = "`Unknown Artist`"
 
-            playlist.tracks.append(track)
+            tracks.append(track)
 
-        return playlist
+        return tracks
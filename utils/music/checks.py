@@ -146,27 +146,75 @@ async def check_pool_bots(inter, only_voiced: bool = False, check_player: bool =
             msg_id = f"{inter.guild_id}-{inter.channel.id}-{inter.message.id}"
 
             try:
-                inter.bot.pool.message_ids[msg_id]
+                voice_channel_id = inter.author.voice.channel.id
+            except AttributeError:
+                voice_channel_id = None
+
+            def check_payload(ctx):
+                try:
+                    return f"{ctx.guild_id}-{ctx.channel.id}-{ctx.message.id}" == msg_id
+                except AttributeError:
+                    return
+
+            try:
+                target_id = inter.bot.pool.message_ids[msg_id]
             except KeyError:
-                inter.bot.pool.message_ids[msg_id] = None
-            else:
-                def check(ctx, b_id):
+                # o primeiro bot que recebe a mensagem escolhe o destino pelo índice da pool e os demais reaproveitam a
+                # escolha (o estado de cada bot pode mudar entre o recebimento da mensagem por um e por outro).
+                target = inter.bot.pool.router.route_message(inter)
+                target_id = inter.bot.pool.message_ids[msg_id] = target.user.id if target else None
+
+                if target and target is not inter.bot:
                     try:
-                        return f"{ctx.guild_id}-{ctx.channel.id}-{ctx.message.id}" == msg_id
-                    except AttributeError:
-                        return
+                        await target.wait_for("pool_payload_ready", check=check_payload, timeout=10)
+                    except asyncio.TimeoutError:
+                        # o bot escolhido não recebeu a mensagem: segue com a escolha entre os bots abaixo.
+                        inter.bot.pool.message_ids[msg_id] = target_id = None
+                    else:
+                        raise PoolException()
 
-                inter.bot.dispatch("pool_payload_ready", inter)
+                first_bot = True
 
-                try:
-                    ctx, bot_id = await inter.bot.wait_for("pool_dispatch", check=check, timeout=10)
-                except asyncio.TimeoutError:
+            else:
+                first_bot = False
+
+            if target_id:
+
+                if target_id != inter.bot.user.id:
                     raise PoolException()
 
-                if not bot_id or bot_id != inter.bot.user.id:
+                if not first_bot:
+                    inter.bot.dispatch("pool_payload_ready", inter)
+
+                if not await inter.bot.pool.claim_message(msg_id, inter.guild_id, voice_channel_id):
                     raise PoolException()
 
-                return update_attr(inter, inter.bot, inter.guild)
+                guild_bots = [inter.bot]
+
+            else:
+                if first_bot:
+                    # modo multi-processo: a mensagem ficou com um bot de outro processo da pool.
+                    if not await inter.bot.pool.claim_message(msg_id, inter.guild_id, voice_channel_id):
+                        inter.bot.dispatch("pool_dispatch", inter, None)
+                        raise PoolException()
+                else:
+                    def check(ctx, b_id):
+                        try:
+                            return f"{ctx.guild_id}-{ctx.channel.id}-{ctx.message.id}" == msg_id
+                        except AttributeError:
+                            return
+
+                    inter.bot.dispatch("pool_payload_ready", inter)
+
+                    try:
+                        ctx, bot_id = await inter.bot.wait_for("pool_dispatch", check=check, timeout=10)
+                    except asyncio.TimeoutError:
+                        raise PoolException()
+
+                    if not bot_id or bot_id != inter.bot.user.id:
+                        raise PoolException()
+
+                    return update_attr(inter, inter.bot, inter.guild)
 
         else:
 
@@ -195,6 +243,18 @@ async def check_pool_bots(inter, only_voiced: bool = False, check_player: bool =
             elif not inter.guild.me.voice:
                 return update_attr(inter, inter.bot, inter.guild)
 
+    if not isinstance(inter, CustomContext):
+
+        try:
+            voice_channel_id = inter.author.voice.channel.id
+        except AttributeError:
+            voice_channel_id = None
+
+        if voice_channel_id and (bot := inter.bot.pool.router.voice_bot(inter.guild_id, voice_channel_id)) and \
+                bot.bot_ready and (guild := bot.get_guild(inter.guild_id)) and (author := guild.get_member(inter.author.id)):
+            inter.author = author
+            return update_attr(inter, bot, guild)
+
     free_bot = []
 
     bot_missing_perms = []
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import registry
+
+search_provider_latency = registry.histogram(
+    "musicbot_search_provider_seconds", "Tempo de resposta de cada provedor de busca."
+)
+search_provider_results = registry.counter(
+    "musicbot_search_provider_results_total", "Resultado das buscas por provedor (win/miss/error/cancelled)."
+)
+
+
+class ProviderStats:
+
+    __slots__ = ("latency", "attempts", "wins", "errors")
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.attempts = 0
+        self.wins = 0
+        self.errors = 0
+
+    @property
+    def win_rate(self):
+        # suavizado para que provedores com poucas amostras não fiquem no topo/fim da lista por acaso.
+        return (self.wins + 1) / (self.attempts + 2)
+
+    def score(self, default_latency: float):
+        return (self.latency if self.latency is not None else default_latency) / self.win_rate
+
+
+class SearchProviderStats:
+
+    def __init__(self, alpha: float = 0.2, default_latency: float = 1.0):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.providers: Dict[str, ProviderStats] = {}
+
+    def get(self, provider: str) -> ProviderStats:
+        try:
+            return self.providers[provider]
+        except KeyError:
+            stats = self.providers[provider] = ProviderStats()
+            return stats
+
+    def record(self, provider: str, elapsed: Optional[float], result: str):
+
+        stats = self.get(provider)
+        stats.attempts += 1
+
+        if result == "win":
+            stats.wins += 1
+        elif result == "error":
+            stats.errors += 1
+
+        if elapsed is not None:
+            stats.latency = elapsed if stats.latency is None else stats.latency + self.alpha * (elapsed - stats.latency)
+            search_provider_latency.observe(elapsed, provider=provider)
+
+        search_provider_results.inc(provider=provider, result=result)
+
+    def sort(self, providers: List[str]) -> List[str]:
+        return sorted(providers, key=lambda p: self.get(p).score(self.default_latency))
+
+    def summary(self):
+        return {
+            p: {"latency": s.latency, "attempts": s.attempts, "wins": s.wins, "errors": s.errors,
+                "win_rate": s.win_rate}
+            for p, s in self.providers.items()
+        }
+
+
+async def hedged_search(
+        candidates: List[Tuple[str, Callable[[], Awaitable]]],
+        stats: SearchProviderStats,
+        delay: float = 0.25,
+        is_good: Callable = bool,
+):
+    """
+    Inicia o primeiro provedor e, a cada `delay` segundos sem uma resposta aceitável (ou imediatamente quando
+    um provedor falha/retorna vazio), inicia o próximo da lista. O primeiro resultado que passar em `is_good`
+    é retornado e as buscas restantes são canceladas.
+
+    Retorna (provedor, resultado, [(provedor, exceção), ...]).
+    """
+
+    remaining = list(candidates)
+    pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+    errors = []
+
+    def launch():
+        provider, factory = remaining.pop(0)
+        pending[asyncio.create_task(factory())] = (provider, time.perf_counter())
+
+    launch()
+
+    try:
+        while pending:
+
+            done, _ = await asyncio.wait(
+                pending, timeout=delay if remaining else None, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                launch()
+                continue
+
+            now = time.perf_counter()
+            winner = None
+
+            # todas as buscas que terminaram são contabilizadas pelo resultado real (o vencedor é a que foi
+            # iniciada primeiro entre as que retornaram um resultado aceitável).
+            for task in sorted(done, key=lambda t: pending[t][1]):
+
+                provider, started = pending.pop(task)
+                elapsed = now - started
+
+                try:
+                    result = task.result()
+                except Exception as e:
+                    stats.record(provider, elapsed, "error")
+                    errors.append((provider, e))
+                    continue
+
+                if is_good(result):
+                    stats.record(provider, elapsed, "win")
+                    if winner is None:
+                        winner = (provider, result)
+                else:
+                    stats.record(provider, elapsed, "miss")
+
+            if winner:
+                return winner[0], winner[1], errors
+
+            if remaining:
+                launch()
+
+        return None, None, errors
+
+    finally:
+        for task, (provider, started) in pending.items():
+            if task.done():
+                if not task.cancelled():
+                    task.exception()
+                continue
+            task.cancel()
+            stats.record(provider, None, "cancelled")
@@ -1,12 +1,7 @@
 import hashlib
-import os
-import pickle
 import time
 
 from aiohttp import ClientSession
-from cachetools import TTLCache
-
-cache_file = "./.lastfm_cache"
 
 class LastFmException(Exception):
     def __init__(self, data: dict):
@@ -18,24 +13,7 @@ class LastFM:
     def __init__(self, api_key: str, api_secret: str):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.cache: TTLCache = self.scrobble_load_cache()
-
-    def scrobble_load_cache(self):
-
-        cache = TTLCache(maxsize=10000, ttl=600)
-
-        if os.path.exists(cache_file):
-            with open(cache_file, 'rb') as f:
-                try:
-                    cache.update(pickle.load(f))
-                except EOFError:
-                    pass
-
-        return cache
-
-    def scrobble_save_cache(self):
-        with open(cache_file, 'wb') as f:
-            pickle.dump(self.cache, f)
+        self.recommendation_cache = None
 
     def generate_api_sig(self, params: dict):
         sig = ''.join(f"{key}{params[key]}" for key in sorted(params))
@@ -50,6 +28,11 @@ class LastFM:
                     raise LastFmException(data)
                 return data
     
+    async def cached_request(self, key: str, params: dict):
+        if not self.recommendation_cache:
+            return await self.request_lastfm(params)
+        return await self.recommendation_cache.get(f"lastfm:{key}", lambda: self.request_lastfm(params))
+
     async def post_lastfm(self, params: dict):
         params["format"] = "json"
         async with ClientSession() as session:
@@ -78,24 +61,34 @@ class LastFM:
         return await self.request_lastfm(params=params)
     
     async def track_scrobble(self, artist: str, track: str, album: str, duration: int, session_key: str, chosen_by_user: bool = True):
+        return await self.track_scrobble_batch(
+            session_key,
+            [{"artist": artist, "track": track, "album": album, "duration": duration, "chosen_by_user": chosen_by_user,
+              "timestamp": int(time.time() - 30)}]
+        )
+
+    async def track_scrobble_batch(self, session_key: str, scrobbles: list):
 
         params = {
             "method": "track.scrobble",
-            "artist[0]": artist,
-            "timestamp[0]": str(int(time.time() - 30)),
-            "track[0]": track,
             "api_key": self.api_key,
             "sk": session_key,
         }
 
-        if chosen_by_user is False:
-            params["chosenByUser[0]"] = "0"
+        for n, s in enumerate(scrobbles[:50]):
 
-        if album:
-            params["album"] = album
+            params[f"artist[{n}]"] = s["artist"]
+            params[f"track[{n}]"] = s["track"]
+            params[f"timestamp[{n}]"] = str(s["timestamp"])
 
-        if duration:
-            params["duration"] = str(duration)
+            if s.get("album"):
+                params[f"album[{n}]"] = s["album"]
+
+            if s.get("duration"):
+                params[f"duration[{n}]"] = str(s["duration"])
+
+            if s.get("chosen_by_user") is False:
+                params[f"chosenByUser[{n}]"] = "0"
 
         params['api_sig'] = self.generate_api_sig(params)
 
@@ -184,11 +177,14 @@ class LastFM:
             params['track'] = track
             if artist:
                 params['artist'] = artist
-    
-        return (await self.request_lastfm(params))['similartracks']['track']
+
+        key = f"similar_tracks:{mbid or f'{artist}:{track}'.lower()}"
+
+        return (await self.cached_request(key, params))['similartracks']['track']
 
     async def get_artist_toptracks(self, artist: str, limit=20):
-        return (await self.request_lastfm(
+        return (await self.cached_request(
+            f"artist_toptracks:{artist.lower()}:{limit}",
             {
                 'method': 'artist.gettoptracks',
                 'api_key': self.api_key,
@@ -207,8 +203,8 @@ class LastFM:
             params['mbid'] = mbid
         else:
             params['artist'] = artist
-    
-        return (await self.request_lastfm(params))['similarartists']['artist']
+
+        return (await self.cached_request(f"similar_artists:{mbid or artist.lower()}", params))['similarartists']['artist']
     
     async def user_info(self, session_key: str):
         return (await self.request_lastfm(
@@ -1,13 +1,19 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import os
 import platform
+import random
 import shutil
 import subprocess
 import tempfile
 import time
+import traceback
 import zipfile
 from contextlib import suppress
+from typing import Dict, List, Optional
 
+import aiohttp
+import psutil
 import requests
 
 
@@ -67,14 +73,9 @@ def validate_java(cmd: str, debug: bool = False):
             print(f"\nFalha ao obter versão do java...\n"
                   f"Path: {cmd} | Erro: {repr(e)}\n")
 
-def run_lavalink(
-        lavalink_file_url: str = None,
-        lavalink_initial_ram: int = 30,
-        lavalink_ram_limit: int = 100,
-        lavalink_additional_sleep: int = 0,
-        lavalink_cpu_cores: int = 1,
-        use_jabba: bool = False
-):
+def prepare_lavalink(lavalink_file_url: str = None, use_jabba: bool = False) -> str:
+    """Baixa/localiza o java e os arquivos do lavalink e retorna o comando do java."""
+
     arch, osname = platform.architecture()
     jdk_platform = f"{platform.system()}-{arch}-{osname}"
 
@@ -232,36 +233,95 @@ def run_lavalink(
         if download_file(url, filename):
             clear_plugins = True
 
+    if clear_plugins:
+        try:
+            shutil.rmtree("./plugins")
+        except:
+            pass
+
+    return java_cmd
+
+
+def jvm_options(
+        lavalink_initial_ram: int = 30,
+        lavalink_ram_limit: int = 100,
+        lavalink_cpu_cores: int = 1,
+        auto_tune: bool = False,
+        instances: int = 1,
+) -> list:
+
+    options = []
+
+    if auto_tune:
+        # divide a memória disponível e os cpu cores entre as instâncias do lavalink.
+        cpu_cores = max((os.cpu_count() or 1) // instances, 1)
+        available_ram = psutil.virtual_memory().available // (1024 * 1024)
+        lavalink_ram_limit = min(max(int(available_ram * 0.6 / instances), 128), 4096)
+        lavalink_initial_ram = lavalink_ram_limit // 2
+        lavalink_cpu_cores = cpu_cores
+
+        if cpu_cores < 2 or lavalink_ram_limit < 512:
+            options.append("-XX:+UseSerialGC")
+        else:
+            # pausas curtas do gc evitam cortes no áudio.
+            options.extend(["-XX:+UseG1GC", "-XX:MaxGCPauseMillis=20", f"-XX:ParallelGCThreads={cpu_cores}"])
+
+        # o supervisor reinicia o processo caso falte memória (em vez de continuar travado).
+        options.append("-XX:+ExitOnOutOfMemoryError")
+
     if lavalink_cpu_cores >= 1:
-        java_cmd += f" -XX:ActiveProcessorCount={lavalink_cpu_cores}"
+        options.append(f"-XX:ActiveProcessorCount={lavalink_cpu_cores}")
 
     if lavalink_ram_limit > 10:
-        java_cmd += f" -Xmx{lavalink_ram_limit}m"
+        options.append(f"-Xmx{lavalink_ram_limit}m")
 
     if 0 < lavalink_initial_ram < lavalink_ram_limit:
-        java_cmd += f" -Xms{lavalink_ram_limit}m"
+        options.append(f"-Xms{lavalink_initial_ram}m")
+
+    return options
+
+
+def start_lavalink_process(java_cmd: str, options: list = None, port: int = None, instance: int = 0):
+
+    cmd = java_cmd.split() + (options or [])
+
+    if port:
+        cmd.append(f"-Dserver.port={port}")
 
     if os.name != "nt":
 
-        if os.path.isdir("./.tempjar"):
-            shutil.rmtree("./.tempjar")
+        tmp_dir = "./.tempjar" if not instance else f"./.tempjar_{instance}"
 
-        os.makedirs("./.tempjar/undertow-docbase.80.2258596138812103750")
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir)
 
-        java_cmd += f" -Djava.io.tmpdir={os.getcwd()}/.tempjar"
+        os.makedirs(f"{tmp_dir}/undertow-docbase.80.2258596138812103750")
 
-    if clear_plugins:
-        try:
-            shutil.rmtree("./plugins")
-        except:
-            pass
+        cmd.append(f"-Djava.io.tmpdir={os.path.realpath(tmp_dir)}")
+
+    cmd.extend(["-jar", "Lavalink.jar"])
+
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+
+def run_lavalink(
+        lavalink_file_url: str = None,
+        lavalink_initial_ram: int = 30,
+        lavalink_ram_limit: int = 100,
+        lavalink_additional_sleep: int = 0,
+        lavalink_cpu_cores: int = 1,
+        use_jabba: bool = False
+):
 
-    java_cmd += " -jar Lavalink.jar"
+    java_cmd = prepare_lavalink(lavalink_file_url=lavalink_file_url, use_jabba=use_jabba)
 
     print("🌋 - Iniciando o servidor Lavalink (dependendo da hospedagem o lavalink pode demorar iniciar, "
           "o que pode ocorrer falhas em algumas tentativas de conexão até ele iniciar totalmente).")
 
-    lavalink_process = subprocess.Popen(java_cmd.split(), stdout=subprocess.DEVNULL)
+    lavalink_process = start_lavalink_process(
+        java_cmd, jvm_options(lavalink_initial_ram=lavalink_initial_ram, lavalink_ram_limit=lavalink_ram_limit,
+                              lavalink_cpu_cores=lavalink_cpu_cores)
+    )
 
     if lavalink_additional_sleep:
         print(f"🕙 - Aguarde {lavalink_additional_sleep} segundos...")
@@ -269,6 +329,227 @@ def run_lavalink(
 
     return lavalink_process
 
+class LocalLavalinkSupervisor:
+    """
+    Inicia e monitora as instâncias do lavalink local (uma por porta, a partir de base_port): verifica o processo,
+    o /v4/info e as estatísticas recebidas pelos bots e reinicia com espera crescente as instâncias que falharem.
+
+    No modo multi-processo (POOL_WORKERS) ele roda no processo principal, que não tem bots: somente o processo e o
+    /v4/info são verificados (as estatísticas ficam nos processos dos bots) e os players não são movidos para outros
+    servidores antes de reiniciar uma instância.
+    """
+
+    def __init__(self, pool, instances: int = 1, base_port: int = 8090, password: str = "youshallnotpass",
+                 health_interval: int = 30, failure_threshold: int = 3, startup_grace: int = 180):
+        self.pool = pool
+        self.instances = max(instances, 1)
+        self.base_port = base_port
+        self.password = password
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.startup_grace = startup_grace
+        self.java_cmd: Optional[str] = None
+        self.options: list = []
+        self.processes: Dict[int, subprocess.Popen] = {}
+        self.started: Dict[int, float] = {}
+        self.failures: Dict[int, int] = {}
+        self.restarts: Dict[int, int] = {}
+        self.restart_tasks: Dict[int, asyncio.Task] = {}
+        self.starting = False
+        self.monitor_task: Optional[asyncio.Task] = None
+
+    def identifier(self, instance: int) -> str:
+        return "LOCAL" if not instance else f"LOCAL_{instance + 1}"
+
+    def port(self, instance: int) -> int:
+        return self.base_port + instance
+
+    def node_data(self, instance: int) -> dict:
+        return {
+            'host': '127.0.0.1',
+            'port': self.port(instance),
+            'password': self.password,
+            'identifier': self.identifier(instance),
+            'region': 'us_central',
+            'retries': 120,
+        }
+
+    async def start(self):
+
+        config = self.pool.config
+        loop = asyncio.get_running_loop()
+
+        self.stop()
+
+        self.starting = True
+
+        try:
+            await self.start_all(config)
+        finally:
+            self.starting = False
+
+        if not self.monitor_task or self.monitor_task.done():
+            self.monitor_task = loop.create_task(self.monitor())
+
+    async def start_all(self, config: dict):
+
+        loop = asyncio.get_running_loop()
+
+        self.java_cmd = await loop.run_in_executor(
+            None, lambda: prepare_lavalink(lavalink_file_url=config['LAVALINK_FILE_URL'], use_jabba=config["USE_JABBA"])
+        )
+
+        self.options = jvm_options(
+            lavalink_initial_ram=config['LAVALINK_INITIAL_RAM'],
+            lavalink_ram_limit=config['LAVALINK_RAM_LIMIT'],
+            lavalink_cpu_cores=config['LAVALINK_CPU_CORES'],
+            auto_tune=config['LAVALINK_AUTO_TUNE'],
+            instances=self.instances,
+        )
+
+        print("🌋 - Iniciando o servidor Lavalink (dependendo da hospedagem o lavalink pode demorar iniciar, "
+              "o que pode ocorrer falhas em algumas tentativas de conexão até ele iniciar totalmente).")
+
+        if config['LAVALINK_AUTO_TUNE'] or self.instances > 1:
+            print(f"🌋 - ローカルLavalink: {self.instances}個のインスタンス | {' '.join(self.options)}")
+
+        for instance in range(self.instances):
+            await self.start_instance(instance)
+
+        if config['LAVALINK_ADDITIONAL_SLEEP']:
+            print(f"🕙 - Aguarde {config['LAVALINK_ADDITIONAL_SLEEP']} segundos...")
+            await asyncio.sleep(config['LAVALINK_ADDITIONAL_SLEEP'])
+
+    async def start_instance(self, instance: int):
+
+        self.kill(instance)
+
+        self.processes[instance] = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: start_lavalink_process(self.java_cmd, self.options, port=self.port(instance), instance=instance)
+        )
+        self.started[instance] = time.monotonic()
+        self.failures[instance] = 0
+
+    @property
+    def node_identifiers(self) -> List[str]:
+        return [self.identifier(instance) for instance in range(self.instances)]
+
+    def memory_usage(self) -> int:
+
+        total = 0
+
+        for process in self.processes.values():
+            try:
+                total += psutil.Process(process.pid).memory_info().rss
+            except (psutil.Error, ProcessLookupError):
+                continue
+
+        return total
+
+    def kill(self, instance: int):
+        try:
+            self.processes.pop(instance).kill()
+        except (KeyError, ProcessLookupError):
+            pass
+        except Exception:
+            traceback.print_exc()
+
+    def stop(self):
+
+        for task in self.restart_tasks.values():
+            task.cancel()
+
+        self.restart_tasks.clear()
+
+        for instance in list(self.processes):
+            self.kill(instance)
+
+    async def monitor(self):
+
+        while True:
+
+            await asyncio.sleep(self.health_interval)
+
+            if self.starting:
+                continue
+
+            for instance in list(self.processes):
+
+                if instance in self.restart_tasks:
+                    continue
+
+                try:
+                    if reason := await self.check_instance(instance):
+                        self.restart_tasks[instance] = asyncio.create_task(self.restart(instance, reason))
+                except Exception:
+                    traceback.print_exc()
+
+    async def check_instance(self, instance: int) -> Optional[str]:
+
+        process = self.processes[instance]
+
+        if process.poll() is not None:
+            return f"プロセスが終了しました（コード: {process.returncode}）"
+
+        if time.monotonic() - self.started[instance] < self.startup_grace:
+            return
+
+        try:
+            async with self.pool.get_lavalink_session().get(
+                    f"http://127.0.0.1:{self.port(instance)}/v4/info", headers={"Authorization": self.password},
+                    timeout=aiohttp.ClientTimeout(total=10)
+            ) as r:
+                # 404: lavalink v3 (sem /v4/info), o servidor está respondendo normalmente (igual ao check_node).
+                if r.status >= 500:
+                    raise Exception(f"status: {r.status}")
+        except Exception as e:
+            self.failures[instance] += 1
+            if self.failures[instance] >= self.failure_threshold:
+                return f"/v4/info が{self.failures[instance]}回連続で失敗しました（{repr(e)}）"
+            return
+
+        self.failures[instance] = 0
+
+        # memória da jvm esgotada (média recente das estatísticas recebidas pelos bots).
+        try:
+            history = self.pool.lavalink_stats_history[f"http://127.0.0.1:{self.port(instance)}"]
+        except KeyError:
+            return
+
+        if (memory := history.mean("memory")) is not None and memory >= 98:
+            return f"JVMのメモリが不足しています（{memory:.0f}%）"
+
+    async def restart(self, instance: int, reason: str):
+
+        identifier = self.identifier(instance)
+
+        try:
+            print(f"⚠️ - [{identifier}] ローカルLavalinkを再起動します: {reason}")
+
+            if self.processes[instance].poll() is None:
+                # move os players para outros servidores antes de reiniciar (quando houver).
+                await self.pool.drain_node(identifier, block_new=True)
+
+            # reinícios seguidos aguardam cada vez mais (o contador é zerado após 10 minutos funcionando normalmente).
+            if time.monotonic() - self.started[instance] > 600:
+                self.restarts[instance] = 0
+
+            restarts = self.restarts[instance] = self.restarts.get(instance, 0) + 1
+
+            self.kill(instance)
+
+            await asyncio.sleep(min(5 * 2 ** (restarts - 1), 300) * random.uniform(0.8, 1.2))
+
+            await self.start_instance(instance)
+
+        except Exception:
+            traceback.print_exc()
+
+        finally:
+            self.pool.undrain_node(identifier)
+            self.restart_tasks.pop(instance, None)
+
+
 if __name__ == "__main__":
     run_lavalink()
     time.sleep(1200)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import re
+from functools import lru_cache
+from typing import Iterable, List, Sequence, TypeVar
+
+from rapidfuzz import fuzz, process
+
+T = TypeVar("T")
+
+exclude_tags = ["remix", "edit", "extend", "compilation", "mashup", "mixed"]
+exclude_tags_2 = ["extend", "compilation", "mashup", "nightcore", "8d", "mixed"]
+
+
+@lru_cache(maxsize=4096)
+def lower_title(title: str) -> str:
+    # os mesmos títulos são verificados várias vezes seguidas (fila, autoplay, scrobble, etc).
+    return title.lower()
+
+
+class TagMatcher:
+    """
+    Verifica várias tags de uma só vez num texto usando um único regex compilado (as tags são tratadas
+    como texto literal, equivalente a "any(tag in texto.lower() for tag in tags)").
+    """
+
+    __slots__ = ("tags", "regex")
+
+    def __init__(self, tags: Iterable[str]):
+        self.tags = tuple(sorted({t.lower() for t in tags}, key=len, reverse=True))
+        self.regex = re.compile("|".join(re.escape(t) for t in self.tags))
+
+    def search(self, text: str) -> bool:
+        return self.regex.search(lower_title(text)) is not None
+
+
+exclude_tags_matcher = TagMatcher(exclude_tags)
+exclude_tags_2_matcher = TagMatcher(exclude_tags_2)
+
+
+def has_exclude_tags(text: str, matcher: TagMatcher = exclude_tags_matcher) -> bool:
+    return matcher.search(text)
+
+
+def title_scores(query: str, choices: Sequence[str], score_cutoff: float = 0) -> List[float]:
+    """
+    Retorna o fuzz.token_sort_ratio de `query` com cada item de `choices` (mesma ordem) numa única chamada ao
+    rapidfuzz. Os textos já devem estar normalizados (ex: lower()) e itens abaixo de `score_cutoff` ficam com 0.
+    """
+
+    scores = [0.0] * len(choices)
+
+    if not choices:
+        return scores
+
+    for choice, score, index in process.extract(
+            query, choices, scorer=fuzz.token_sort_ratio, processor=None, score_cutoff=score_cutoff, limit=None
+    ):
+        scores[index] = score
+
+    return scores
+
+
+def filter_by_title(query: str, items: Sequence[T], labels: Sequence[str], score_cutoff: float) -> List[T]:
+    """Mantém (na ordem original) os itens cujo label tem token_sort_ratio >= score_cutoff com `query`."""
+    return [i for i, score in zip(items, title_scores(query, labels, score_cutoff)) if score >= score_cutoff]
@@ -10,23 +10,27 @@ import re
 import traceback
 import uuid
 from collections import deque
+from copy import deepcopy
 from itertools import cycle
 from time import time
-from typing import Optional, Union, TYPE_CHECKING, List
+from typing import Optional, Union, TYPE_CHECKING, List, AsyncIterator, Awaitable, Callable
 from urllib import parse
 from urllib.parse import quote, quote_plus
 
 import disnake
-from rapidfuzz import fuzz
 from yt_dlp import YoutubeDL
 
 import wavelink
+from utils import metrics
 from utils.db import DBModel
 from utils.music.checks import can_connect
 from utils.music.converters import fix_characters, time_format, get_button_style
 from utils.music.errors import GenericError, PoolException
 from utils.music.filters import AudioFilter
 from utils.music.lastfm_tools import LastFmException
+from utils.music.matching import title_scores, has_exclude_tags, exclude_tags_2_matcher
+from utils.music.ratelimit import priority_background
+from utils.music.reconnect import jitter
 from utils.music.skin_utils import skin_converter
 from utils.music.track_encoder import encode_track, DataWriter
 from utils.others import music_source_emoji, send_idle_embed, PlayerControls, string_to_file
@@ -35,8 +39,6 @@ from wavelink import TrackStart, TrackEnd
 if TYPE_CHECKING:
     from utils.client import BotCore
 
-exclude_tags = ["remix", "edit", "extend", "compilation", "mashup", "mixed"]
-exclude_tags_2 = ["extend", "compilation", "mashup", "nightcore", "8d", "mixed"]
 emoji_pattern = re.compile(r'<a?:.+?:\d+?>')
 
 thread_archive_time = {
@@ -55,6 +57,48 @@ providers_dict = {
     "tidal": "tdsearch",
 }
 
+playlist_stream_chunk_size = 100
+
+autoqueue_refill_threshold = 3
+
+track_name_brackets = re.compile(r"[(\[][^)\]]*[)\]]")
+track_name_feat = re.compile(r"\s(feat|ft)\.?\s.*$")
+track_name_symbols = re.compile(r"[\W_]+")
+
+
+def normalize_track_name(text: str):
+    text = track_name_brackets.sub(" ", text.lower())
+    text = track_name_feat.sub("", text)
+    return track_name_symbols.sub(" ", text).strip()
+
+
+def track_identity_keys(track: Union[LavalinkTrack, PartialTrack]) -> set:
+
+    keys = set()
+
+    if isrc := track.info.get("isrc"):
+        keys.add(f"isrc:{isrc}")
+
+    if track.ytid:
+        keys.add(f"yt:{track.ytid}")
+
+    if track.info.get("uri"):
+        keys.add(f"uri:{track.info['uri']}")
+
+    title = track.single_title
+    author = track.author
+
+    if author.lower().endswith(" - topic"):
+        author = author[:-8]
+
+    if track.ytid and " - " in title:
+        # vídeos no formato "artista - música"
+        author, title = title.split(" - ", 1)
+
+    keys.add(f"name:{normalize_track_name(author)}:{normalize_track_name(title)}")
+
+    return keys
+
 native_sources = {"http", "youtube", "soundcloud", "tts", "reddit", "ocremix", "tiktok", "mixcloud", "soundgasm", "flowerytts", "vimeo", "twitch", "bandcamp", "local"}
 
 
@@ -274,11 +318,13 @@ class PartialTrack:
 
 
 class LavalinkPlaylist:
-    __slots__ = ('data', 'url', 'tracks')
+    __slots__ = ('data', 'url', '_tracks', '_track_kwargs', 'pending_pages', 'expected_count')
 
     def __init__(self, data: dict, **kwargs):
         self.data = data
         self.url = kwargs.pop("url")
+        self.pending_pages: Optional[AsyncIterator[List[LavalinkTrack]]] = None
+        self.expected_count: Optional[int] = None
 
         try:
             self.data["playlistInfo"]["thumb"] = kwargs["pluginInfo"]["artworkUrl"]
@@ -306,11 +352,96 @@ class LavalinkPlaylist:
         try:
             playlist = self if pluginInfo["type"] == "playlist" else None
             if pluginInfo["type"] == "album":
-                thumb = self.thumb
+                thumb = self.data["playlistInfo"].get("thumb", "")
         except KeyError:
             playlist = self
-        self.tracks = [LavalinkTrack(
-            id_=track[encoded_name], info=track['info'], pluginInfo=track.get("pluginInfo") or pluginInfo, thumb=thumb, playlist=playlist, **kwargs) for track in data.get('tracks', [])]
+
+        # as faixas só são criadas quando a lista for acessada (ex: playlists que ficam apenas no cache
+        # ou que serão cortadas pelo limite da fila não precisam gerar milhares de objetos).
+        self._tracks: Optional[List[LavalinkTrack]] = None
+        self._track_kwargs = {"encoded_name": encoded_name, "pluginInfo": pluginInfo, "thumb": thumb,
+                              "playlist": playlist, "kwargs": kwargs}
+
+    @property
+    def tracks(self) -> List[LavalinkTrack]:
+
+        if self._tracks is None:
+            self._tracks = self.build_tracks(0, None)
+            self._track_kwargs = None
+
+        return self._tracks
+
+    @tracks.setter
+    def tracks(self, value: list):
+        self._tracks = value
+        self._track_kwargs = None
+
+    @property
+    def track_count(self) -> int:
+        if self.expected_count is not None:
+            return self.expected_count
+        if self._tracks is None:
+            return len(self.data.get('tracks', []))
+        return len(self._tracks)
+
+    def truncate(self, limit: int):
+        if self.expected_count is not None:
+            self.expected_count = min(self.expected_count, limit)
+        if self._tracks is None:
+            self.data = dict(self.data)
+            self.data['tracks'] = self.data.get('tracks', [])[:limit]
+        else:
+            self._tracks = self._tracks[:limit]
+
+    def build_tracks(self, start: int, end: Optional[int]) -> List[LavalinkTrack]:
+
+        if self._tracks is not None:
+            return self._tracks[start:end]
+
+        kw = self._track_kwargs
+
+        return [LavalinkTrack(
+            id_=track[kw["encoded_name"]], info=track['info'], pluginInfo=track.get("pluginInfo") or kw["pluginInfo"],
+            thumb=kw["thumb"], playlist=kw["playlist"], **kw["kwargs"]) for track in self.data.get('tracks', [])[start:end]]
+
+    @property
+    def is_streamable(self) -> bool:
+        return bool(self.pending_pages) or self.track_count > playlist_stream_chunk_size
+
+    async def iter_chunks(self, start: int, chunk_size: int = playlist_stream_chunk_size):
+
+        for i in range(start, len(self._tracks if self._tracks is not None else self.data.get('tracks', [])), chunk_size):
+            yield self.build_tracks(i, i + chunk_size)
+            await asyncio.sleep(0)
+
+        if self.pending_pages:
+            try:
+                async for chunk in self.pending_pages:
+                    yield chunk
+            finally:
+                await self.pending_pages.aclose()
+
+    async def load_pending_pages(self):
+
+        # usado quando a playlist vai ser adicionada de uma vez (ex: o player já está carregando outra playlist).
+        if not self.pending_pages:
+            return
+
+        tracks = self.tracks
+        limit = self.expected_count
+
+        try:
+            async for chunk in self.pending_pages:
+                tracks.extend(chunk)
+                if limit is not None and len(tracks) >= limit:
+                    break
+        finally:
+            await self.pending_pages.aclose()
+            self.pending_pages = None
+            self.expected_count = None
+
+        if limit is not None:
+            del tracks[limit:]
 
     @property
     def uri(self):
@@ -327,7 +458,7 @@ class LavalinkPlaylist:
         except KeyError:
             pass
         try:
-            return self.tracks[0].thumb
+            return self.build_tracks(0, 1)[0].thumb
         except:
             return ""
 
@@ -569,6 +700,8 @@ class LavalinkPlayer(wavelink.Player):
         self._queue_updater_task: Optional[asyncio.Task] = None
         self.auto_skip_track_task: Optional[asyncio.Task] = None
         self.track_load_task: Optional[asyncio.Task] = None
+        self.playlist_stream_task: Optional[asyncio.Task] = None
+        self.autoqueue_refill_task: Optional[asyncio.Task] = None
         self.native_yt: bool = True
         self.stage_title_event = False
         self.stage_title_template: str = kwargs.pop("stage_title_template", None) or "再生中: {track.title} | {track.author}"
@@ -583,6 +716,7 @@ class LavalinkPlayer(wavelink.Player):
         self.start_timestamp = self.start_time.timestamp()
 
         self.lastfm_artists = []
+        self.lastfm_artists_lock = asyncio.Lock()
 
         self.event_queue = asyncio.Queue()
 
@@ -814,7 +948,7 @@ class LavalinkPlayer(wavelink.Player):
                         return
 
                     try:
-                        await self.connect(vc.id)
+                        await self.bot.reconnect_manager.reconnect_voice(self, vc.id)
                         self.set_command_log(
                             text=f"{voice_msg}\n本当に切断したい場合は、コマンド/ボタン: **stop** を使用してください。",
                             emoji="⚠️", controller=True)
@@ -882,12 +1016,12 @@ class LavalinkPlayer(wavelink.Player):
                 except AttributeError:
                     vc_id = self.last_channel.id
 
-                await asyncio.sleep(3)
+                await asyncio.sleep(jitter(3))
 
                 if self.is_closing:
                     return
 
-                await self.connect(vc_id)
+                await self.bot.reconnect_manager.reconnect_voice(self, vc_id)
                 return
 
             if event.code in (
@@ -895,7 +1029,7 @@ class LavalinkPlayer(wavelink.Player):
                     4006,  # Session is no longer valid.
             ):
 
-                await asyncio.sleep(5)
+                await asyncio.sleep(jitter(5))
 
                 try:
                     self.bot.music.players[self.guild_id]
@@ -910,7 +1044,7 @@ class LavalinkPlayer(wavelink.Player):
                 except AttributeError:
                     vc_id = self.last_channel.id
 
-                await self.connect(vc_id)
+                await self.bot.reconnect_manager.reconnect_voice(self, vc_id)
                 return
 
         else:
@@ -1070,12 +1204,7 @@ class LavalinkPlayer(wavelink.Player):
                                 disnake.utils.utcnow() - self.retries_general_errors[
                             "last_time"]).total_seconds() < 180:
 
-                            try:
-                                self._new_node_task.cancel()
-                            except:
-                                pass
-                            self._new_node_task = self.bot.loop.create_task(
-                                self._wait_for_new_node(ignore_node=self.node))
+                            self.bot.reconnect_manager.migrate(self, ignore_node=self.node)
                             continue
 
                         self.retries_general_errors["last_time"] = disnake.utils.utcnow()
@@ -1092,11 +1221,7 @@ class LavalinkPlayer(wavelink.Player):
 
                     elif event.cause == "java.lang.InterruptedException":
                         self.queue.appendleft(track)
-                        try:
-                            self._new_node_task.cancel()
-                        except:
-                            pass
-                        self._new_node_task = self.bot.loop.create_task(self._wait_for_new_node())
+                        self.bot.reconnect_manager.migrate(self)
                         await send_report()
                         continue
 
@@ -1466,13 +1591,108 @@ class LavalinkPlayer(wavelink.Player):
     async def get_autoqueue_tracks(self):
 
         try:
-            return self.queue_autoplay.popleft()
-        except:
+            track = self.queue_autoplay.popleft()
+        except IndexError:
             pass
+        else:
+            self.schedule_autoqueue_refill(track)
+            return track
 
         if self.locked:
             return
 
+        if self.autoqueue_refill_task:
+            # já existe uma busca em andamento em segundo plano, aguardar ela ao invés de iniciar outra.
+            try:
+                await asyncio.shield(self.autoqueue_refill_task)
+            except Exception:
+                pass
+
+            try:
+                track = self.queue_autoplay.popleft()
+            except IndexError:
+                pass
+            else:
+                self.schedule_autoqueue_refill(track)
+                return track
+
+        self.locked = True
+
+        try:
+            searched, exception = await self.fill_autoqueue()
+        finally:
+            self.locked = False
+
+        if searched and not self.queue_autoplay:
+
+            if exception:
+                if isinstance(exception, wavelink.TrackLoadError):
+                    error_msg = f"**原因:** ```java\n{exception.cause}```\n" \
+                                f"**メッセージ:** `\n{exception.message}`\n" \
+                                f"**レベル:** `{exception.severity}`\n" \
+                                f"**音楽サーバー:** `{self.node.identifier}`"
+                else:
+                    error_msg = f"**詳細:** ```py\n{repr(exception)}```"
+            else:
+                error_msg = "再生した曲に関連する結果が見つかりませんでした..."
+
+            try:
+                embed = disnake.Embed(
+                    description=f"**オートプレイデータの取得に失敗しました:**\n"
+                                f"{error_msg}",
+                    color=disnake.Colour.red())
+                await self.text_channel.send(embed=embed, delete_after=10)
+            except:
+                traceback.print_exc()
+            await asyncio.sleep(7)
+            return
+
+        try:
+            track = self.queue_autoplay.popleft()
+        except IndexError:
+            try:
+                return self.played.popleft()
+            except:
+                return None
+
+        self.schedule_autoqueue_refill(track)
+        return track
+
+    def schedule_autoqueue_refill(self, seed: Union[LavalinkTrack, PartialTrack] = None):
+
+        if self.autoqueue_refill_task or self.is_closing or len(self.queue_autoplay) > autoqueue_refill_threshold \
+                or not (self.autoplay or self.keep_connected):
+            return
+
+        self.autoqueue_refill_task = self.bot.loop.create_task(self.refill_autoqueue(seed))
+
+    async def refill_autoqueue(self, seed: Union[LavalinkTrack, PartialTrack] = None):
+
+        # reabastece a fila do autoplay antes dela esvaziar e já converte a próxima faixa, assim a troca de música
+        # no modo autoplay não precisa aguardar requisições.
+        try:
+            await self.fill_autoqueue(seed)
+
+            try:
+                track = self.queue_autoplay[0]
+            except IndexError:
+                return
+
+            if isinstance(track, PartialTrack) and not track.id and track.info["sourceName"] != "youtube":
+                try:
+                    await self.resolve_track(track)
+                except Exception:
+                    traceback.print_exc()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self.autoqueue_refill_task = None
+
+    async def fill_autoqueue(self, seed: Union[LavalinkTrack, PartialTrack] = None):
+
         tracks_search = []
 
         for t in reversed(self.failed_tracks + self.played):
@@ -1485,318 +1705,389 @@ class LavalinkPlayer(wavelink.Player):
         if current_track := self.current or self.last_track:
             tracks_search.insert(0, current_track)
 
-        track = None
-        tracks = []
-        tracks_ytsearch = []
+        if seed and seed not in tracks_search:
+            tracks_search.insert(0, seed)
+
+        if not tracks_search:
+            return False, None
+
+        results = await asyncio.gather(
+            *[self.autoqueue_seed(t, tracks_search) for t in tracks_search], return_exceptions=True
+        )
 
         exception = None
 
-        if tracks_search:
+        seen = set()
 
-            self.locked = True
+        for t in itertools.chain(tracks_search, self.queue_autoplay):
+            seen.update(track_identity_keys(t))
 
-            for track_data in tracks_search:
+        candidates = []
+        candidate_keys = {}
 
-                if track_data.info["sourceName"] == "spotify" and "spotify" not in self.node.info["sourceManagers"] and self.bot.spotify:
+        for seed_index, (track_data, result) in enumerate(zip(tracks_search, results)):
 
-                    result = None
+            if isinstance(result, BaseException):
+                exception = result
+                continue
 
-                    for i in range(3):
-                        try:
-                            result = await self.bot.spotify.track_search(tracks_search[0].author, limit=100)
-                            break
-                        except Exception as e:
-                            self.set_command_log(emoji="⚠️", text=f"Spotifyからのおすすめ曲の取得に失敗しました。{i+1}回目/3回。", controller=True)
-                            self.update = True
-                            traceback.print_exc()
-                            exception = e
-                            await asyncio.sleep(5)
+            info = {
+                "title": track_data.title,
+                "uri": track_data.uri
+            }
 
-                    if result:
+            for rank, t in enumerate(result):
 
-                        tracks = []
+                if t.is_stream:
+                    continue
 
-                        for t in result["tracks"]:
+                keys = track_identity_keys(t)
 
-                            try:
-                                thumb = t["album"]["images"][0]["url"]
-                            except (IndexError,KeyError):
-                                thumb = ""
-
-                            partial_track = PartialTrack(
-                                    uri=t["external_urls"]["spotify"],
-                                    author=t["artists"][0]["name"] or "Unknown Artist",
-                                    title=t["name"],
-                                    thumb=thumb,
-                                    duration=t["duration_ms"],
-                                    source_name="spotify",
-                                    identifier=t["id"],
-                                    requester=self.bot.user.id,
-                                    autoplay=True,
-                                )
+                if not seen.isdisjoint(keys):
+                    continue
 
-                            partial_track.info["extra"]["authors"] = [fix_characters(i['name']) for i in t['artists'] if
-                                                          f"feat. {i['name'].lower()}"
-                                                          not in t['name'].lower()]
+                # faixas recomendadas por mais de uma seed ganham prioridade, o restante é intercalado entre as seeds.
+                if entry := next((candidate_keys[k] for k in keys if k in candidate_keys), None):
+                    entry[0] += 1
+                    continue
 
-                            partial_track.info["extra"]["authors_md"] = ", ".join(
-                                f"[`{a['name']}`]({a['external_urls']['spotify']})" for a in t["artists"])
+                entry = [1, rank, seed_index, t, info]
+                candidates.append(entry)
 
-                            try:
-                                if t["album"]["name"] != t["name"]:
-                                    partial_track.info["extra"]["album"] = {
-                                        "name": t["album"]["name"],
-                                        "url": t["album"]["external_urls"]["spotify"]
-                                    }
-                            except (AttributeError, KeyError):
-                                pass
+                for k in keys:
+                    candidate_keys[k] = entry
 
-                            tracks.append(partial_track)
+        candidates.sort(key=lambda e: (-e[0], e[1], e[2]))
 
-                elif track_data.info["sourceName"] == "deezer" and (self.bot.pool.config["FORCE_USE_DEEZER_CLIENT"] or "deezer" not in self.node.info["sourceManagers"]) and (artist_id:=track_data.info["extra"].get("artist_id")):
+        for score, rank, seed_index, t, info in candidates[:self.queue_autoplay.maxlen - len(self.queue_autoplay)]:
 
-                    try:
-                        try:
-                            result = await self.bot.deezer.get_artist_radio_info(artist_id)
-                        except Exception:
-                            traceback.print_exc()
-                            result = None
+            if not isinstance(t, PartialTrack):
+                t.info["extra"].update({"autoplay": True, "requester": self.bot.user.id})
+                t.playlist = None
 
-                        if result:
+            t.info["extra"]["related"] = info
+            self.queue_autoplay.append(t)
 
-                            tracks = []
+        return True, exception
 
-                            for n, t in enumerate(result):
-
-                                partial_track = PartialTrack(
-                                    uri=f"https://www.deezer.com/track/{t['id']}",
-                                    author=t['artist']['name'],
-                                    title=t['title'],
-                                    thumb=t['album']['cover_big'],
-                                    duration=t['duration'] * 1000,
-                                    source_name="deezer",
-                                    identifier=t['id'],
-                                    requester=self.bot.user.id,
-                                    autoplay=True,
-                                )
+    async def autoqueue_seed(self, track_data: Union[LavalinkTrack, PartialTrack], tracks_search: list):
 
-                                partial_track.info["isrc"] = t.get('isrc')
-                                artists = t.get('contributors') or [t['artist']]
+        tracks, exception = await self.fetch_autoqueue_seed(track_data, tracks_search)
 
-                                partial_track.info["extra"]["authors"] = [a['name'] for a in artists]
-                                partial_track.info["extra"]["authors_md"] = ", ".join(f"[`{fix_characters(a['name'])}`](https://www.deezer.com/artist/{a['id']})" for a in artists)
-                                partial_track.info["extra"]["artist_id"] = t['artist']['id']
+        if not tracks and exception:
+            raise exception
 
-                                if t['title'] != t['album']['title']:
-                                    partial_track.info["extra"]["album"] = {
-                                        "name": t['album']['title'],
-                                        "url": t['album']['tracklist']
-                                    }
+        return tracks
 
-                                tracks.append(partial_track)
-                    except Exception:
-                        traceback.print_exc()
+    async def cached_recommendations(self, key: str, fetch: Callable[[], Awaitable[tuple]]):
 
-                elif track_data.info["sourceName"] == "soundcloud":
-                    try:
-                        info = await self.bot.loop.run_in_executor(None, lambda: self.bot.pool.ytdl.extract_info(f"{track_data.uri}/recommended",
-                                                                                                            download=False))
-                    except AttributeError:
-                        pass
+        # as recomendações são compartilhadas entre todos os players da pool, cada player recebe uma cópia das
+        # faixas já que elas são modificadas ao entrar na fila.
+        async def factory():
 
-                    else:
-                        tracks = [PartialTrack(
-                            uri=i["url"],
-                            title=i["title"],
-                            requester=self.bot.user.id,
-                            source_name="soundcloud",
-                            identifier=i["id"],
-                            autoplay=True,
-                        ) for i in info.get('entries', [])]
+            tracks, exception = await fetch()
 
-                if not tracks:
+            if not tracks and exception:
+                raise exception
 
-                    if self.bot.last_fm and not self.lastfm_artists:
+            data = []
 
-                        if track_data.ytid:
-                            if track_data.author.endswith(" - topic") and not track_data.author.endswith(
-                                    "Release - topic") and not track_data.title.startswith(track_data.author[:-8]):
-                                artist = track_data.author[:-8]
-                            else:
-                                try:
-                                    artist = track_data.title.split(" - ", maxsplit=1)[0]
-                                except ValueError:
-                                    artist = track_data.author
-                        else:
-                            artist = track_data.author
+            for t in tracks:
+                info = deepcopy(t.info)
+                info["id"] = t.id
+                info.pop("playlist", None)
+                data.append(info)
+
+            return data
 
+        try:
+            data = await self.bot.pool.recommendation_cache.get(key, factory)
+        except Exception as e:
+            return [], e
+
+        return self.bot.pool.process_track_cls(deepcopy(data or []), keep_ids=True)[0], None
+
+    async def next_lastfm_artist(self, track_data: Union[LavalinkTrack, PartialTrack]) -> str:
+
+        # as seeds são buscadas ao mesmo tempo: a lista é recarregada e consumida por uma seed de cada vez.
+        async with self.lastfm_artists_lock:
+
+            if self.bot.last_fm and not self.lastfm_artists:
+
+                if track_data.ytid:
+                    if track_data.author.endswith(" - topic") and not track_data.author.endswith(
+                            "Release - topic") and not track_data.title.startswith(track_data.author[:-8]):
+                        artist = track_data.author[:-8]
+                    else:
                         try:
-                            self.lastfm_artists = [a['name'] for a in
-                                                   await self.bot.last_fm.get_similar_artists(artist) if a['name'].lower() not in track_data.author.lower()]
-                            self.lastfm_artists.insert(0, track_data.author)
-                        except LastFmException as e:
-                            print(f"Last.FM recommendations error: {repr(e)}")
-                        except:
-                            traceback.print_exc()
+                            artist = track_data.title.split(" - ", maxsplit=1)[0]
+                        except ValueError:
+                            artist = track_data.author
+                else:
+                    artist = track_data.author
 
-                    try:
-                        author = self.lastfm_artists.pop(0)
-                    except:
-                        author = track_data.author
-                        
-                    if track_data.info["sourceName"] == "youtube" and self.native_yt:
+                try:
+                    self.lastfm_artists = [a['name'] for a in
+                                           await self.bot.last_fm.get_similar_artists(artist) if a['name'].lower() not in track_data.author.lower()]
+                    self.lastfm_artists.insert(0, track_data.author)
+                except LastFmException as e:
+                    print(f"Last.FM recommendations error: {repr(e)}")
+                except:
+                    traceback.print_exc()
 
-                        queries = [f"https://www.youtube.com/watch?v={track_data.ytid}&list=RD{track_data.ytid}"]
+            try:
+                return self.lastfm_artists.pop(0)
+            except:
+                return track_data.author
 
-                        if p_dict:=providers_dict.get(track_data.info["sourceName"]):
-                            providers = [p_dict] + [p for p in self.node.search_providers if p != p_dict]
-                        else:
-                            providers = self.node.search_providers
+    async def fetch_autoqueue_seed(self, track_data: Union[LavalinkTrack, PartialTrack], tracks_search: list):
 
-                        queries.extend([f"{sp}:{author.split(',')[0]}" for sp in providers])
+        tracks = []
+        exception = None
 
-                    #elif track_data.info["sourceName"] == "spotify" and "spotify" in self.node.info["sourceManagers"] and (spotify_tracks:=[t.identifier for t in tracks_search if t.info["sourceName"] == "spotify"]):
-                    #    queries = ["sprec:seed_tracks=" + ",".join(set(spotify_tracks[:5]))]
+        if source_key := self.source_recommendations_key(track_data):
+            tracks, exception = await self.cached_recommendations(
+                source_key, lambda: self.fetch_source_recommendations(track_data)
+            )
 
-                    elif track_data.info["sourceName"] == "deezer" and "deezer" in self.node.info["sourceManagers"] and (deezer_tracks:=[t.identifier for t in tracks_search if t.info["sourceName"] == "deezer"]):
-                        queries = [f"dzrec:{deezer_tracks[0]}"]
+        if not tracks:
 
-                    else:
-                        if p_dict:=providers_dict.get(track_data.info["sourceName"]):
-                            providers = [p_dict] + [p for p in self.node.search_providers if p != p_dict]
-                        else:
-                            providers = self.node.search_providers
+            author = await self.next_lastfm_artist(track_data)
 
-                        queries = [f"{sp}:{author.split(',')[0]}" for sp in providers]
+            if track_data.info["sourceName"] == "youtube" and self.native_yt:
 
-                    for query in queries:
+                queries = [f"https://www.youtube.com/watch?v={track_data.ytid}&list=RD{track_data.ytid}"]
 
-                        if query.startswith("jssearch"):
-                            continue
+                if p_dict:=providers_dict.get(track_data.info["sourceName"]):
+                    providers = [p_dict] + [p for p in self.node.search_providers if p != p_dict]
+                else:
+                    providers = self.node.search_providers
 
-                        try:
-                            tracks = await self.node.get_tracks(
-                                query, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, autoplay=True,
-                                requester=self.bot.user.id
-                            )
-                        except Exception as e:
-                            if [err for err in ("Could not find tracks from mix", "Could not read mix page") if err in str(e)] and self.native_yt:
-                                try:
-                                    tracks_ytsearch = await self.node.get_tracks(
-                                        f"{query}:\"{track_data.author}\"",
-                                        track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, autoplay=True,
-                                        requester=self.bot.user.id)
-                                    break
-                                except Exception as e:
-                                    exception = e
-                                    continue
-                            else:
-                                print(traceback.format_exc())
-                                exception = e
-                                await asyncio.sleep(1.5)
-                                continue
+                queries.extend([f"{sp}:{author.split(',')[0]}" for sp in providers])
 
-                        try:
-                            tracks = tracks.tracks
-                        except:
-                            pass
+            #elif track_data.info["sourceName"] == "spotify" and "spotify" in self.node.info["sourceManagers"] and (spotify_tracks:=[t.identifier for t in tracks_search if t.info["sourceName"] == "spotify"]):
+            #    queries = ["sprec:seed_tracks=" + ",".join(set(spotify_tracks[:5]))]
 
-                        if not tracks:
-                            continue
+            elif track_data.info["sourceName"] == "deezer" and "deezer" in self.node.info["sourceManagers"] and (deezer_tracks:=[t.identifier for t in tracks_search if t.info["sourceName"] == "deezer"]):
+                queries = [f"dzrec:{deezer_tracks[0]}"]
 
-                        break
+            else:
+                if p_dict:=providers_dict.get(track_data.info["sourceName"]):
+                    providers = [p_dict] + [p for p in self.node.search_providers if p != p_dict]
+                else:
+                    providers = self.node.search_providers
+
+                queries = [f"{sp}:{author.split(',')[0]}" for sp in providers]
 
-                    if not [i in track_data.title.lower() for i in exclude_tags_2]:
-                        final_tracks = []
-                        for t in tracks:
-                            if not any((i in t.title.lower()) for i in exclude_tags_2) and not track_data.uri.startswith(t.uri):
-                                final_tracks.append(t)
-                        tracks = final_tracks or tracks
+            # as faixas já vem com o id gerado pelo servidor lavalink, então só são reutilizadas entre servidores
+            # compatíveis (mesma versão/sources/plugins) e com as mesmas buscas (artista da vez, mix do youtube etc).
+            tracks, search_exception = await self.cached_recommendations(
+                f"autoplay:{self.node.compatibility_key}:{track_data.uri}:{'|'.join(queries)}",
+                lambda: self.search_recommendations(track_data, queries)
+            )
 
-                track = track_data
+            exception = search_exception or exception
 
-            if not tracks:
+        return tracks, exception
+
+    def source_recommendations_key(self, track_data: Union[LavalinkTrack, PartialTrack]) -> Optional[str]:
+
+        if track_data.info["sourceName"] == "spotify" and "spotify" not in self.node.info["sourceManagers"] and self.bot.spotify:
+            return f"autoplay:spotify:{track_data.author}"
+
+        if track_data.info["sourceName"] == "deezer" and (self.bot.pool.config["FORCE_USE_DEEZER_CLIENT"] or "deezer" not in self.node.info["sourceManagers"]) and (artist_id:=track_data.info["extra"].get("artist_id")):
+            return f"autoplay:deezer:{artist_id}"
+
+        if track_data.info["sourceName"] == "soundcloud":
+            return f"autoplay:soundcloud:{track_data.uri}"
+
+    async def fetch_source_recommendations(self, track_data: Union[LavalinkTrack, PartialTrack]):
+
+        tracks = []
+        exception = None
+
+        if track_data.info["sourceName"] == "spotify" and "spotify" not in self.node.info["sourceManagers"] and self.bot.spotify:
+
+            result = None
+
+            for i in range(3):
                 try:
-                    tracks_ytsearch = tracks_ytsearch.tracks
-                except AttributeError:
-                    pass
-                tracks = tracks_ytsearch
-                tracks.reverse()
+                    result = await self.bot.spotify.track_search(track_data.author, limit=50, priority=priority_background)
+                    break
+                except Exception as e:
+                    self.set_command_log(emoji="⚠️", text=f"Spotifyからのおすすめ曲の取得に失敗しました。{i+1}回目/3回。", controller=True)
+                    self.update = True
+                    traceback.print_exc()
+                    exception = e
+                    await asyncio.sleep(5)
 
-            if not tracks:
-                self.locked = False
+            if result:
 
-                if exception:
-                    if isinstance(exception, wavelink.TrackLoadError):
-                        error_msg = f"**原因:** ```java\n{exception.cause}```\n" \
-                                    f"**メッセージ:** `\n{exception.message}`\n" \
-                                    f"**レベル:** `{exception.severity}`\n" \
-                                    f"**音楽サーバー:** `{self.node.identifier}`"
-                    else:
-                        error_msg = f"**詳細:** ```py\n{repr(exception)}```"
-                else:
-                    error_msg = "再生した曲に関連する結果が見つかりませんでした..."
+                tracks = []
+
+                for t in result["tracks"]["items"]:
+
+                    try:
+                        thumb = t["album"]["images"][0]["url"]
+                    except (IndexError,KeyError):
+                        thumb = ""
+
+                    partial_track = PartialTrack(
+                            uri=t["external_urls"]["spotify"],
+                            author=t["artists"][0]["name"] or "Unknown Artist",
+                            title=t["name"],
+                            thumb=thumb,
+                            duration=t["duration_ms"],
+                            source_name="spotify",
+                            identifier=t["id"],
+                            requester=self.bot.user.id,
+                            autoplay=True,
+                        )
+
+                    partial_track.info["extra"]["authors"] = [fix_characters(i['name']) for i in t['artists'] if
+                                                  f"feat. {i['name'].lower()}"
+                                                  not in t['name'].lower()]
 
+                    partial_track.info["extra"]["authors_md"] = ", ".join(
+                        f"[`{a['name']}`]({a['external_urls']['spotify']})" for a in t["artists"])
+
+                    try:
+                        if t["album"]["name"] != t["name"]:
+                            partial_track.info["extra"]["album"] = {
+                                "name": t["album"]["name"],
+                                "url": t["album"]["external_urls"]["spotify"]
+                            }
+                    except (AttributeError, KeyError):
+                        pass
+
+                    tracks.append(partial_track)
+
+        elif track_data.info["sourceName"] == "deezer" and (self.bot.pool.config["FORCE_USE_DEEZER_CLIENT"] or "deezer" not in self.node.info["sourceManagers"]) and (artist_id:=track_data.info["extra"].get("artist_id")):
+
+            try:
                 try:
-                    embed = disnake.Embed(
-                        description=f"**オートプレイデータの取得に失敗しました:**\n"
-                                    f"{error_msg}",
-                        color=disnake.Colour.red())
-                    await self.text_channel.send(embed=embed, delete_after=10)
-                except:
+                    result = await self.bot.deezer.get_artist_radio_info(artist_id)
+                except Exception:
                     traceback.print_exc()
-                await asyncio.sleep(7)
-                return
+                    result = None
 
-        try:
-            tracks = tracks.tracks
-        except AttributeError:
-            pass
+                if result:
 
-        try:
-            tracks = [t for t in tracks if not [u for u in tracks_search if t.uri.startswith(u.uri)]]
-        except:
-            pass
+                    tracks = []
 
-        if track:
+                    for n, t in enumerate(result):
 
-            info = {
-                "title": track.title,
-                "uri": track.uri
-            }
+                        partial_track = PartialTrack(
+                            uri=f"https://www.deezer.com/track/{t['id']}",
+                            author=t['artist']['name'],
+                            title=t['title'],
+                            thumb=t['album']['cover_big'],
+                            duration=t['duration'] * 1000,
+                            source_name="deezer",
+                            identifier=t['id'],
+                            requester=self.bot.user.id,
+                            autoplay=True,
+                        )
 
-            tracks_final = []
+                        partial_track.info["isrc"] = t.get('isrc')
+                        artists = t.get('contributors') or [t['artist']]
 
-            for t in tracks:
+                        partial_track.info["extra"]["authors"] = [a['name'] for a in artists]
+                        partial_track.info["extra"]["authors_md"] = ", ".join(f"[`{fix_characters(a['name'])}`](https://www.deezer.com/artist/{a['id']})" for a in artists)
+                        partial_track.info["extra"]["artist_id"] = t['artist']['id']
 
-                if t.is_stream:
-                    continue
+                        if t['title'] != t['album']['title']:
+                            partial_track.info["extra"]["album"] = {
+                                "name": t['album']['title'],
+                                "url": t['album']['tracklist']
+                            }
 
-                #if t.duration < 90000:
-                #    continue
+                        tracks.append(partial_track)
+            except Exception:
+                traceback.print_exc()
 
-                if track.ytid and track.ytid == t.ytid:
+        elif track_data.info["sourceName"] == "soundcloud":
+            try:
+                info = await self.bot.loop.run_in_executor(None, lambda: self.bot.pool.ytdl.extract_info(f"{track_data.uri}/recommended",
+                                                                                                    download=False))
+            except AttributeError:
+                pass
+
+            else:
+                tracks = [PartialTrack(
+                    uri=i["url"],
+                    title=i["title"],
+                    requester=self.bot.user.id,
+                    source_name="soundcloud",
+                    identifier=i["id"],
+                    autoplay=True,
+                ) for i in info.get('entries', [])]
+
+        return tracks, exception
+
+    async def search_recommendations(self, track_data: Union[LavalinkTrack, PartialTrack], queries: List[str]):
+
+        tracks = []
+        tracks_ytsearch = []
+        exception = None
+
+        for query in queries:
+
+            if query.startswith("jssearch"):
+                continue
+
+            try:
+                tracks = await self.node.get_tracks(
+                    query, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, autoplay=True,
+                    requester=self.bot.user.id
+                )
+            except Exception as e:
+                if [err for err in ("Could not find tracks from mix", "Could not read mix page") if err in str(e)] and self.native_yt:
+                    try:
+                        tracks_ytsearch = await self.node.get_tracks(
+                            f"{query}:\"{track_data.author}\"",
+                            track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, autoplay=True,
+                            requester=self.bot.user.id)
+                        break
+                    except Exception as e:
+                        exception = e
+                        continue
+                else:
+                    print(traceback.format_exc())
+                    exception = e
+                    await asyncio.sleep(1.5)
                     continue
 
-                if not isinstance(t, PartialTrack):
-                    t.info["extra"].update({"autoplay": True, "requester": self.bot.user.id})
-                    t.playlist = None
+            try:
+                tracks = tracks.tracks
+            except:
+                pass
 
-                t.info["extra"]["related"] = info
-                tracks_final.append(t)
+            if not tracks:
+                continue
 
-            tracks.clear()
-            self.queue_autoplay.extend(tracks_final)
+            break
 
-        self.locked = False
+        if not exclude_tags_2_matcher.search(track_data.title):
+            final_tracks = []
+            for t in tracks:
+                if not exclude_tags_2_matcher.search(t.title) and not track_data.uri.startswith(t.uri):
+                    final_tracks.append(t)
+            tracks = final_tracks or tracks
 
         try:
-            return self.queue_autoplay.popleft()
-        except:
+            tracks = tracks.tracks
+        except AttributeError:
+            pass
+
+        if not tracks:
             try:
-                return self.played.popleft()
-            except:
-                return None
+                tracks = tracks_ytsearch.tracks
+            except AttributeError:
+                tracks = tracks_ytsearch
+            tracks = list(reversed(tracks or []))
+
+        return tracks, exception
 
     def start_auto_skip(self):
         try:
@@ -1821,11 +2112,7 @@ class LavalinkPlayer(wavelink.Player):
         self.lyric_embed = None
 
         if not self.node or not self.node.is_available:
-            try:
-                self._new_node_task.cancel()
-            except:
-                pass
-            self._new_node_task = self.bot.loop.create_task(self._wait_for_new_node())
+            self.bot.reconnect_manager.migrate(self)
             return
 
         try:
@@ -2014,21 +2301,15 @@ class LavalinkPlayer(wavelink.Player):
 
                                         self.bot.pool.partial_track_cache[query] = tracks
 
-                                    if not [i in track.title.lower() for i in exclude_tags]:
-                                        final_result = []
-                                        for t in tracks:
-                                            if not any((i in t.title.lower()) for i in exclude_tags):
-                                                final_result.append(t)
-                                                break
-                                        tracks = final_result or tracks
-
                                     min_duration = track.duration - 7000
                                     max_duration = track.duration + 7000
 
                                     final_result = []
 
-                                    for t in tracks:
-                                        if t.is_stream or not min_duration < t.duration < max_duration and fuzz.token_sort_ratio(t.title, track.title) < 75:
+                                    scores = title_scores(track.title, [t.title for t in tracks], 75)
+
+                                    for t, score in zip(tracks, scores):
+                                        if t.is_stream or not min_duration < t.duration < max_duration and score < 75:
                                             continue
                                         final_result.append(t)
 
@@ -2384,6 +2665,46 @@ class LavalinkPlayer(wavelink.Player):
 
         await self.destroy()
 
+    def stream_playlist(self, playlist: LavalinkPlaylist, start: int):
+        self.playlist_stream_task = self.bot.loop.create_task(self._stream_playlist(playlist, start))
+
+    async def _stream_playlist(self, playlist: LavalinkPlaylist, start: int):
+
+        loaded = start
+        total = playlist.track_count
+        chunks = playlist.iter_chunks(start)
+
+        try:
+            async for chunk in chunks:
+
+                if self.is_closing:
+                    return
+
+                chunk = chunk[:total - loaded]
+
+                if not chunk:
+                    break
+
+                self.queue.extend(chunk)
+                loaded += len(chunk)
+
+                self.set_command_log(emoji="⏳", text=f"プレイリスト `{fix_characters(playlist.name, 25)}` を読み込み中: `{loaded}/{total}`", controller=True)
+                self.update = True
+
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+            self.set_command_log(emoji="⚠️", text=f"プレイリスト `{fix_characters(playlist.name, 25)}` の読み込みが中断されました: `{loaded}/{total}`", controller=True)
+            self.update = True
+            return
+        finally:
+            self.playlist_stream_task = None
+            await chunks.aclose()
+
+        self.set_command_log(emoji="🎶", text=f"プレイリスト `{fix_characters(playlist.name, 25)}` の読み込みが完了しました (`{loaded}` 曲)。", controller=True)
+        self.update = True
+
     def set_command_log(self, text="", emoji="", controller=False):
         if controller or not text:
             self.command_log = text
@@ -2494,6 +2815,10 @@ class LavalinkPlayer(wavelink.Player):
         self.message_updater_task = self.bot.loop.create_task(self.message_updater())
 
     async def invoke_np(self, force=False, interaction=None, rpc_update=False):
+        with metrics.controller_edit.time():
+            await self._invoke_np(force=force, interaction=interaction, rpc_update=rpc_update)
+
+    async def _invoke_np(self, force=False, interaction=None, rpc_update=False):
 
         if self.is_closing:
             return
@@ -3211,6 +3536,14 @@ class LavalinkPlayer(wavelink.Player):
 
     async def resolve_track(self, track: PartialTrack, force=False):
 
+        if track.id:
+            return
+
+        with metrics.resolve_track.time():
+            await self._resolve_track(track, force=force)
+
+    async def _resolve_track(self, track: PartialTrack, force=False):
+
         if track.id:
             return
 
@@ -3270,7 +3603,7 @@ class LavalinkPlayer(wavelink.Player):
                                                                               "ytmsearch:\"{title} - {author}\"",
                                                                               ])
                             self.native_yt = False
-                            await self.resolve_track(track)
+                            await self._resolve_track(track)
                             return
                         exceptions.append(e)
                         continue
@@ -3288,7 +3621,7 @@ class LavalinkPlayer(wavelink.Player):
                 except:
                     pass
 
-                has_exclude_tags = any(tag for tag in exclude_tags if tag.lower() in track.title.lower())
+                track_has_exclude_tags = has_exclude_tags(track.title)
 
                 tracks.extend(result)
 
@@ -3297,7 +3630,7 @@ class LavalinkPlayer(wavelink.Player):
                     if t.is_stream:
                         continue
 
-                    if not has_exclude_tags and any(tag for tag in exclude_tags if tag.lower() in t.title.lower()):
+                    if not track_has_exclude_tags and has_exclude_tags(t.title):
                         continue
 
                     if check_duration and not ((t.duration - 10000) < track.duration < (t.duration + 10000)):
@@ -3397,7 +3730,7 @@ class LavalinkPlayer(wavelink.Player):
                         self.set_command_log(f"エラーのためプレイヤーが終了しました: {e}", controller=True)
                         await self.destroy()
                         return
-                    await self.connect(self.last_channel.id)
+                    await self.bot.reconnect_manager.reconnect_voice(self, self.last_channel.id, priority_background)
 
                 self.locked = False
 
@@ -3664,6 +3997,16 @@ class LavalinkPlayer(wavelink.Player):
         except:
             pass
 
+        try:
+            self.playlist_stream_task.cancel()
+        except:
+            pass
+
+        try:
+            self.autoqueue_refill_task.cancel()
+        except:
+            pass
+
         try:
             self.event_queue_task.cancel()
         except:
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Optional
+
+priority_interactive = 0
+priority_background = 10
+
+
+class RateLimiter:
+
+    def __init__(self, requests: int = 100, window: float = 30):
+        self.capacity = requests
+        self.tokens = float(requests)
+        self.fill_rate = requests / window
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []
+        self.counter = itertools.count()
+        self.dispatch_task: Optional[asyncio.Task] = None
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.updated = self.blocked_until
+        self.tokens = 0
+
+    async def acquire(self, priority: int = priority_interactive):
+
+        future = asyncio.get_running_loop().create_future()
+
+        heapq.heappush(self.waiters, (priority, next(self.counter), future))
+
+        if not self.dispatch_task or self.dispatch_task.done():
+            self.dispatch_task = asyncio.create_task(self.dispatch())
+
+        await future
+
+    async def dispatch(self):
+
+        while self.waiters:
+
+            now = time.monotonic()
+
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+                continue
+
+            future = heapq.heappop(self.waiters)[2]
+
+            if future.done():
+                continue
+
+            self.tokens -= 1
+            future.set_result(None)
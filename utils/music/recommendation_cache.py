@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import time
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from cachetools import TLRUCache
+
+from utils.metrics import registry
+
+recommendation_cache_requests = registry.counter(
+    "musicbot_recommendation_cache_requests_total", "Consultas ao cache de recomendações (hit/miss/shared)."
+)
+
+cache_file = "./.recommendation_cache"
+
+
+def expiration(key, value, now):
+    # o valor guarda o horário (time.time) em que expira para que o prazo continue válido após reiniciar o bot.
+    return now + value[0] - time.time()
+
+
+class RecommendationCache:
+    """
+    Cache de recomendações compartilhado por todos os bots/servidores da pool.
+
+    Os itens expiram pelo ttl informado (ou o padrão), o excesso é descartado por LRU e buscas simultâneas
+    pela mesma chave aguardam uma única requisição (singleflight). As alterações são acrescentadas ao arquivo
+    periodicamente (fora do event loop) e o arquivo é reescrito só com os itens válidos quando cresce demais.
+    Sem path o cache fica somente em memória.
+    """
+
+    def __init__(self, maxsize: int = 2000, ttl: int = 21600, path: Optional[str] = cache_file, name: str = "recommendations"):
+        self.ttl = ttl
+        self.path = path
+        self.name = name
+        self.cache = TLRUCache(maxsize=maxsize, ttu=expiration)
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.journal: List[Tuple[str, tuple]] = []
+        self.journal_size = 0
+        self.modified = False
+        self.load()
+
+    def load(self):
+
+        if not self.path or not os.path.isfile(self.path):
+            return
+
+        now = time.time()
+
+        try:
+            with open(self.path, 'rb') as f:
+                while True:
+                    try:
+                        data = pickle.load(f)
+                    except EOFError:
+                        break
+                    # formato antigo: o cache inteiro salvo num único dict.
+                    items = data.items() if isinstance(data, dict) else [data]
+                    for key, value in items:
+                        self.journal_size += 1
+                        if value[0] > now:
+                            self.cache[key] = value
+        except Exception:
+            # registro incompleto no fim do arquivo (ex: bot encerrado durante a escrita).
+            traceback.print_exc()
+
+    def snapshot(self):
+        now = time.time()
+        return [(k, v) for k, v in list(self.cache.items()) if v[0] > now]
+
+    def save(self, data: List[Tuple[str, tuple]] = None):
+
+        if data is None:
+            data = self.snapshot()
+
+        with open(f"{self.path}.tmp", 'wb') as f:
+            for record in data:
+                pickle.dump(record, f)
+
+        os.replace(f"{self.path}.tmp", self.path)
+        self.journal_size = len(data)
+
+    def append(self, records: List[Tuple[str, tuple]]):
+
+        with open(self.path, 'ab') as f:
+            for record in records:
+                pickle.dump(record, f)
+
+        self.journal_size += len(records)
+
+    async def save_task(self, interval: int = 600):
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(interval)
+            if not self.modified:
+                continue
+            self.modified = False
+            records, self.journal = self.journal, []
+            try:
+                if self.journal_size + len(records) > max(len(self.cache) * 2, 1000):
+                    await loop.run_in_executor(None, self.save, self.snapshot())
+                else:
+                    await loop.run_in_executor(None, self.append, records)
+            except Exception:
+                traceback.print_exc()
+
+    def peek(self, key: str):
+        try:
+            return self.cache[key][1]
+        except KeyError:
+            return
+
+    def set(self, key: str, value: Any, ttl: int = None):
+        entry = self.cache[key] = (time.time() + (ttl or self.ttl), value)
+        if self.path:
+            self.journal.append((key, entry))
+            self.modified = True
+
+    def discard(self, key: str):
+        self.cache.pop(key, None)
+
+    async def get(self, key: str, factory: Callable[[], Awaitable], ttl: int = None):
+
+        try:
+            value = self.cache[key][1]
+        except KeyError:
+            pass
+        else:
+            recommendation_cache_requests.inc(cache=self.name, result="hit")
+            return value
+
+        try:
+            task = self.pending[key]
+        except KeyError:
+            pass
+        else:
+            recommendation_cache_requests.inc(cache=self.name, result="shared")
+            return await asyncio.shield(task)
+
+        recommendation_cache_requests.inc(cache=self.name, result="miss")
+
+        async def run():
+            value = await factory()
+            if value:
+                self.set(key, value, ttl)
+            return value
+
+        # a busca roda em uma task própria: cancelar quem iniciou a busca não cancela os outros bots aguardando a
+        # mesma chave.
+        task = self.pending[key] = asyncio.ensure_future(run())
+        task.add_done_callback(lambda t: self.pending_done(key, t))
+
+        return await asyncio.shield(task)
+
+    def pending_done(self, key: str, task: asyncio.Future):
+
+        if self.pending.get(key) is task:
+            del self.pending[key]
+
+        # evita o aviso de "exception was never retrieved" quando ninguém mais aguardava a chave.
+        if not task.cancelled():
+            task.exception()
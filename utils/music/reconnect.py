@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import random
+import traceback
+from typing import Dict, Optional, TYPE_CHECKING
+
+from utils.metrics import registry
+from utils.music.ratelimit import RateLimiter, priority_background, priority_interactive
+
+if TYPE_CHECKING:
+    import wavelink
+    from utils.client import BotCore
+    from utils.music.models import LavalinkPlayer
+
+voice_reconnect_pending = registry.gauge(
+    "musicbot_voice_reconnect_pending", "Reconexões em canais de voz aguardando na fila do shard."
+)
+player_migration_pending = registry.gauge(
+    "musicbot_player_migration_pending", "Players aguardando migração para outro node."
+)
+
+
+def jitter(delay: float, spread: float = 0.5) -> float:
+    # evita que vários players aguardem exatamente o mesmo tempo e repitam as requisições juntos.
+    return delay * random.uniform(1 - spread, 1 + spread)
+
+
+class ReconnectManager:
+    """
+    Coordena as reconexões em canais de voz e as migrações de players entre nodes de um bot após a queda de um
+    node ou um resume do gateway: as atualizações de voz são enfileiradas por shard (dentro do limite de envios do
+    gateway) e os players de um mesmo node são migrados em lotes em vez de todos ao mesmo tempo.
+    """
+
+    def __init__(self, bot: BotCore):
+        self.bot = bot
+        self.shard_ratelimiters: Dict[int, RateLimiter] = {}
+        self.voice_pending: Dict[int, int] = {}
+        self.migration_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.migrations: Dict[str, dict] = {}
+
+    def get_shard_ratelimiter(self, shard_id: int) -> RateLimiter:
+        try:
+            return self.shard_ratelimiters[shard_id]
+        except KeyError:
+            ratelimiter = self.shard_ratelimiters[shard_id] = RateLimiter(
+                requests=max(self.bot.config["VOICE_RECONNECT_SHARD_RATE"], 1), window=60
+            )
+            return ratelimiter
+
+    async def voice_slot(self, shard_id: Optional[int], priority: int = priority_interactive):
+
+        shard_id = shard_id or 0
+
+        self.voice_pending[shard_id] = self.voice_pending.get(shard_id, 0) + 1
+        voice_reconnect_pending.set(self.voice_pending[shard_id], bot=self.bot.identifier, shard=shard_id)
+
+        try:
+            await self.get_shard_ratelimiter(shard_id).acquire(priority)
+        finally:
+            self.voice_pending[shard_id] -= 1
+            voice_reconnect_pending.set(self.voice_pending[shard_id], bot=self.bot.identifier, shard=shard_id)
+
+    async def reconnect_voice(self, player: LavalinkPlayer, channel_id: int, priority: int = priority_interactive):
+        await self.voice_slot(player.guild.shard_id, priority)
+        await player.connect(channel_id)
+
+    def migrate(self, player: LavalinkPlayer, ignore_node: wavelink.Node = None, restart: bool = True):
+
+        if not restart and player._new_node_task and not player._new_node_task.done():
+            return
+
+        try:
+            player._new_node_task.cancel()
+        except:
+            pass
+
+        try:
+            node_id = player.node.identifier
+        except AttributeError:
+            node_id = ""
+
+        progress = self.migrations.setdefault(node_id, {"total": 0, "done": 0, "failed": 0})
+        progress["total"] += 1
+        self.update_migration_gauge(node_id)
+
+        task = player._new_node_task = self.bot.loop.create_task(self.migrate_player(player, node_id, ignore_node))
+        task.add_done_callback(lambda t: self.migration_done(t, node_id, progress))
+
+    def migrate_node(self, node: wavelink.Node):
+        for player in list(node.players.values()):
+            self.migrate(player, restart=False)
+
+    async def migrate_player(self, player: LavalinkPlayer, node_id: str, ignore_node: wavelink.Node = None):
+
+        try:
+            semaphore = self.migration_semaphores[node_id]
+        except KeyError:
+            semaphore = self.migration_semaphores[node_id] = asyncio.Semaphore(
+                max(self.bot.config["PLAYER_MIGRATION_BATCH_SIZE"], 1)
+            )
+
+        async with semaphore:
+            await player._wait_for_new_node(ignore_node=ignore_node)
+
+    def migration_done(self, task: asyncio.Task, node_id: str, progress: dict):
+
+        if task.cancelled():
+            progress["total"] -= 1
+        elif task.exception():
+            progress["failed"] += 1
+            traceback.print_exception(type(task.exception()), task.exception(), task.exception().__traceback__)
+        else:
+            progress["done"] += 1
+
+        self.update_migration_gauge(node_id)
+
+        if progress["done"] + progress["failed"] < progress["total"] or self.migrations.get(node_id) is not progress:
+            return
+
+        del self.migrations[node_id]
+        self.update_migration_gauge(node_id)
+
+        if progress["total"]:
+            print(f"🔀 - {self.bot.user} - [{node_id}] プレイヤーの移行が完了しました: "
+                  f"{progress['done']}/{progress['total']}（失敗: {progress['failed']}）")
+
+    def update_migration_gauge(self, node_id: str):
+
+        try:
+            progress = self.migrations[node_id]
+            pending = progress["total"] - progress["done"] - progress["failed"]
+        except KeyError:
+            pending = 0
+
+        player_migration_pending.set(pending, bot=self.bot.identifier, node=node_id)
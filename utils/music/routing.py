@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import disnake
+
+if TYPE_CHECKING:
+    from utils.client import BotCore, BotPool
+    from utils.others import CustomContext
+
+
+class PoolRouter:
+    """
+    Índice de quais bots da pool estão em cada servidor e em qual canal de voz cada um está conectado
+    (atualizado pelos eventos de entrada/saída de servidores e de voice state dos próprios bots).
+    """
+
+    def __init__(self, pool: BotPool):
+        self.pool = pool
+        self.pool_bots_cache: Dict[Optional[int], List[BotCore]] = {}
+        self.guild_members: Dict[int, Dict[int, BotCore]] = {}
+        self.voice_bots: Dict[int, Dict[int, BotCore]] = {}
+        self.bot_channels: Dict[Tuple[int, int], int] = {}
+
+    def invalidate(self):
+        self.pool_bots_cache.clear()
+
+    def pool_bots(self, guild_id: int) -> List[BotCore]:
+
+        key = guild_id if str(guild_id) in self.pool.guild_bots else None
+
+        try:
+            return self.pool_bots_cache[key]
+        except KeyError:
+            bots = self.pool_bots_cache[key] = self.pool.bots + self.pool.guild_bots.get(str(guild_id), [])
+            return bots
+
+    def load_bot(self, bot: BotCore):
+
+        self.remove_bot(bot)
+
+        for guild in bot.guilds:
+            self.add_guild(bot, guild)
+
+    def remove_bot(self, bot: BotCore):
+        for guild_id in list(self.guild_members):
+            self.remove_guild(bot, guild_id)
+
+    def add_guild(self, bot: BotCore, guild: disnake.Guild):
+
+        self.guild_members.setdefault(guild.id, {})[bot.user.id] = bot
+
+        try:
+            self.update_voice(bot, guild.id, guild.me.voice.channel.id)
+        except AttributeError:
+            pass
+
+    def remove_guild(self, bot: BotCore, guild_id: int):
+
+        self.update_voice(bot, guild_id, None)
+
+        try:
+            bots = self.guild_members[guild_id]
+            del bots[bot.user.id]
+        except KeyError:
+            return
+
+        if not bots:
+            del self.guild_members[guild_id]
+
+    def update_voice(self, bot: BotCore, guild_id: int, channel_id: Optional[int]):
+
+        if old_channel_id := self.bot_channels.pop((guild_id, bot.user.id), None):
+            try:
+                channels = self.voice_bots[guild_id]
+                if channels.get(old_channel_id) is bot:
+                    del channels[old_channel_id]
+                if not channels:
+                    del self.voice_bots[guild_id]
+            except KeyError:
+                pass
+
+        if channel_id:
+            self.bot_channels[(guild_id, bot.user.id)] = channel_id
+            self.voice_bots.setdefault(guild_id, {})[channel_id] = bot
+
+    def bots_in_guild(self, guild_id: int) -> List[BotCore]:
+        return sorted(self.guild_members.get(guild_id, {}).values(), key=lambda b: b.identifier)
+
+    def voice_bot(self, guild_id: int, channel_id: int) -> Optional[BotCore]:
+        try:
+            return self.voice_bots[guild_id][channel_id]
+        except KeyError:
+            return
+
+    @staticmethod
+    def can_reply(bot: BotCore, guild: disnake.Guild, channel_id: int) -> bool:
+
+        # o bot precisa receber a mensagem (ver o canal e o histórico) e conseguir responder nele.
+        if not (channel := bot.get_channel(channel_id)):
+            return False
+
+        if isinstance(channel, disnake.Thread):
+            perms = channel.parent.permissions_for(guild.me)
+            send_message_perm = perms.send_messages_in_threads
+        else:
+            perms = channel.permissions_for(guild.me)
+            send_message_perm = perms.send_messages
+
+        return perms.view_channel and perms.read_message_history and send_message_perm
+
+    def route_message(self, ctx: CustomContext) -> Optional[BotCore]:
+        """
+        Bot que deve processar um comando de prefixo: o bot conectado no canal de voz do membro ou o primeiro bot
+        livre (sem estar em canal de voz) que consiga ver e enviar mensagens no canal. O primeiro bot que recebe a
+        mensagem faz a escolha e os demais reaproveitam o resultado (pool.message_ids).
+        """
+
+        try:
+            voice_channel_id = ctx.author.voice.channel.id
+        except AttributeError:
+            voice_channel_id = None
+
+        if voice_channel_id and (bot := self.voice_bot(ctx.guild_id, voice_channel_id)):
+            if bot.bot_ready and (guild := bot.get_guild(ctx.guild_id)) and self.can_reply(bot, guild, ctx.channel.id):
+                return bot
+
+        for bot in self.bots_in_guild(ctx.guild_id):
+
+            if not bot.bot_ready:
+                continue
+
+            if not (guild := bot.get_guild(ctx.guild_id)) or guild.me.voice or not guild.get_member(ctx.author.id):
+                continue
+
+            if self.can_reply(bot, guild, ctx.channel.id):
+                return bot
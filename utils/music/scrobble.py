@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, List, Optional, TYPE_CHECKING
+
+from utils.music.lastfm_tools import LastFmException
+
+if TYPE_CHECKING:
+    from utils.music.lastfm_tools import LastFM
+
+queue_file = "./.lastfm_scrobble_queue"
+
+scrobble_batch_size = 50
+
+# 8: operation failed, 11: service offline, 16: temporarily unavailable, 29: rate limit
+retryable_codes = {8, 11, 16, 29}
+
+# o last.fm recusa scrobbles com mais de 14 dias.
+max_scrobble_age = 13 * 86400
+
+
+class ScrobbleDispatcher:
+    """
+    Fila de scrobbles compartilhada pela pool.
+
+    Os scrobbles são agrupados por session key e enviados em lotes de até 50 faixas (formato em lote do
+    track.scrobble), com várias contas sendo processadas ao mesmo tempo (limitado por `concurrency`).
+    Lotes que falham por instabilidade/ratelimit voltam pra fila com espera crescente e a fila é salva em
+    disco pra sobreviver a reinicializações. O histórico local de scrobbles também é gravado em lote.
+    """
+
+    def __init__(self, last_fm: LastFM, concurrency: int = 8, interval: float = 10, path: str = queue_file):
+        self.last_fm = last_fm
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = interval
+        self.path = path
+        self.queue: Dict[str, List[dict]] = self.load()
+        self.attempts: Dict[str, int] = {}
+        self.retry_after: Dict[str, float] = {}
+        self.history: Dict[int, List[dict]] = {}
+        self.wakeup = asyncio.Event()
+        self.modified = False
+        self.on_invalid_session: Optional[Callable[[int], Awaitable]] = None
+        self.save_history: Optional[Callable[[Dict[int, List[dict]]], Awaitable]] = None
+
+    def load(self):
+
+        if not os.path.isfile(self.path):
+            return {}
+
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            traceback.print_exc()
+            return {}
+
+    def save(self, data: dict):
+
+        with open(f"{self.path}.tmp", 'wb') as f:
+            pickle.dump(data, f)
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def scrobble(self, session_key: str, user_id: int, artist: str, track: str, album: str = None,
+                 duration: int = None, chosen_by_user: bool = True, timestamp: int = None):
+
+        items = self.queue.setdefault(session_key, [])
+
+        items.append(
+            {
+                "user_id": user_id,
+                "artist": artist,
+                "track": track,
+                "album": album,
+                "duration": duration,
+                "chosen_by_user": chosen_by_user,
+                "timestamp": timestamp or int(time.time() - 30),
+            }
+        )
+
+        self.modified = True
+
+        if len(items) >= scrobble_batch_size:
+            self.wakeup.set()
+
+    def add_history(self, user_id: int, entry: dict):
+        self.history.setdefault(user_id, []).append(entry)
+
+    async def update_nowplaying(self, requests: List[dict]):
+
+        async def send(kwargs: dict):
+            async with self.semaphore:
+                return await self.last_fm.update_nowplaying(**kwargs)
+
+        return await asyncio.gather(*[send(kwargs) for kwargs in requests], return_exceptions=True)
+
+    async def run(self):
+
+        while True:
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self.wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                traceback.print_exc()
+
+    async def flush(self):
+
+        now = time.time()
+
+        batches = []
+
+        for session_key, items in list(self.queue.items()):
+
+            if not items:
+                del self.queue[session_key]
+                continue
+
+            if self.retry_after.get(session_key, 0) > now:
+                continue
+
+            batches.append((session_key, items[:scrobble_batch_size]))
+            del items[:scrobble_batch_size]
+
+        if batches:
+            await asyncio.gather(*[self.send_batch(session_key, batch) for session_key, batch in batches])
+            self.modified = True
+
+        if self.history and self.save_history:
+            history, self.history = self.history, {}
+            try:
+                await self.save_history(history)
+            except Exception:
+                traceback.print_exc()
+
+        if self.modified:
+            self.modified = False
+            data = {k: list(v) for k, v in self.queue.items() if v}
+            await asyncio.get_running_loop().run_in_executor(None, self.save, data)
+
+    async def send_batch(self, session_key: str, batch: List[dict]):
+
+        try:
+            async with self.semaphore:
+                await self.last_fm.track_scrobble_batch(session_key, batch)
+
+        except LastFmException as e:
+
+            print(f"last.fm scrobble failed! user: {batch[0]['user_id']} - code: {e.code} - message: {e.message}")
+
+            if e.code == 9:
+                self.queue.pop(session_key, None)
+                if self.on_invalid_session:
+                    try:
+                        await self.on_invalid_session(batch[0]["user_id"])
+                    except Exception:
+                        traceback.print_exc()
+                return
+
+            if e.code in retryable_codes:
+                self.requeue(session_key, batch)
+
+        except Exception:
+            traceback.print_exc()
+            self.requeue(session_key, batch)
+
+        else:
+            self.attempts.pop(session_key, None)
+            self.retry_after.pop(session_key, None)
+
+    def requeue(self, session_key: str, batch: List[dict]):
+
+        min_timestamp = time.time() - max_scrobble_age
+
+        self.queue[session_key] = [i for i in batch if i["timestamp"] > min_timestamp] + self.queue.get(session_key, [])
+
+        attempts = self.attempts[session_key] = self.attempts.get(session_key, 0) + 1
+        self.retry_after[session_key] = time.time() + min(30 * 2 ** attempts, 3600)
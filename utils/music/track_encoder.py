@@ -2,13 +2,21 @@
 # https://github.com/devoxin/Lavalink.py/blob/development/lavalink/utils.py
 
 import struct
-from base64 import b64encode
-from io import BytesIO
-from typing import Final, Dict, Any, Mapping, Callable, Optional, Tuple
+from base64 import b64encode, b64decode
+from typing import Final, Dict, Any, Mapping, Callable, Optional, Tuple, Iterable, List, Union
 
 V2_KEYSET = {'title', 'author', 'length', 'identifier', 'isStream', 'uri', 'sourceName', 'position'}
 V3_KEYSET = V2_KEYSET | {'artworkUrl', 'isrc'}
 
+_UBYTE: Final = struct.Struct('B')
+_USHORT: Final = struct.Struct('>H')
+_INT: Final = struct.Struct('>i')
+_LONG: Final = struct.Struct('>Q')
+_SIGNED_LONG: Final = struct.Struct('>q')
+
+TRACK_INFO_VERSIONED: Final = 1 << 30
+TRACK_INFO_SIZE_MASK: Final = (1 << 30) - 1
+
 class _MissingObj:
     __slots__ = ()
 
@@ -22,29 +30,29 @@ class DataWriter:
     __slots__ = ('_buf',)
 
     def __init__(self):
-        self._buf: Final[BytesIO] = BytesIO()
+        # os 4 primeiros bytes são reservados para o header (preenchido no finish()).
+        self._buf: Final[bytearray] = bytearray(4)
+
+    def reset(self):
+        del self._buf[4:]
 
     def _write(self, data):
-        self._buf.write(data)
+        self._buf += data
 
     def write_byte(self, byte):
-        self._buf.write(byte)
+        self._buf += byte
 
     def write_boolean(self, boolean: bool):
-        enc = struct.pack('B', 1 if boolean else 0)
-        self.write_byte(enc)
+        self._buf.append(1 if boolean else 0)
 
     def write_unsigned_short(self, short: int):
-        enc = struct.pack('>H', short)
-        self._write(enc)
+        self._buf += _USHORT.pack(short)
 
     def write_int(self, integer: int):
-        enc = struct.pack('>i', integer)
-        self._write(enc)
+        self._buf += _INT.pack(integer)
 
     def write_long(self, long_value: int):
-        enc = struct.pack('>Q', long_value)
-        self._write(enc)
+        self._buf += _LONG.pack(long_value)
 
     def write_nullable_utf(self, utf_string: Optional[str]):
         self.write_boolean(bool(utf_string))
@@ -59,22 +67,56 @@ class DataWriter:
         if byte_len > 65535:
             raise OverflowError('UTF string may not exceed 65535 bytes!')
 
-        self.write_unsigned_short(byte_len)
-        self._write(utf)
+        self._buf += _USHORT.pack(byte_len)
+        self._buf += utf
 
     def finish(self) -> bytes:
-        with BytesIO() as track_buf:
-            byte_len = self._buf.getbuffer().nbytes
-            flags = byte_len | (1 << 30)
-            enc_flags = struct.pack('>i', flags)
-            track_buf.write(enc_flags)
+        _INT.pack_into(self._buf, 0, (len(self._buf) - 4) | TRACK_INFO_VERSIONED)
+        return bytes(self._buf)
+
+
+class DataReader:
+    __slots__ = ('_buf', '_pos')
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self._buf: Final = memoryview(data)
+        self._pos = 0
+
+    @property
+    def remaining(self) -> int:
+        return len(self._buf) - self._pos
+
+    def read_byte(self) -> int:
+        value = self._buf[self._pos]
+        self._pos += 1
+        return value
 
-            self._buf.seek(0)
-            track_buf.write(self._buf.read())
-            self._buf.close()
+    def read_boolean(self) -> bool:
+        return self.read_byte() != 0
 
-            track_buf.seek(0)
-            return track_buf.read()
+    def read_unsigned_short(self) -> int:
+        value, = _USHORT.unpack_from(self._buf, self._pos)
+        self._pos += 2
+        return value
+
+    def read_int(self) -> int:
+        value, = _INT.unpack_from(self._buf, self._pos)
+        self._pos += 4
+        return value
+
+    def read_long(self) -> int:
+        value, = _SIGNED_LONG.unpack_from(self._buf, self._pos)
+        self._pos += 8
+        return value
+
+    def read_utf(self) -> str:
+        size = self.read_unsigned_short()
+        value = bytes(self._buf[self._pos:self._pos + size]).decode('utf8', errors='replace')
+        self._pos += size
+        return value
+
+    def read_nullable_utf(self) -> Optional[str]:
+        return self.read_utf() if self.read_boolean() else None
 
 def _write_track_common(track: Dict[str, Any], writer: DataWriter):
     writer.write_utf(track['title'].encode('ascii', 'ignore').decode('ascii'))
@@ -137,13 +179,16 @@ def encode_track(track: Dict[str, Any],
     return (2, encode_track_v2(track, source_encoders))
 
 def encode_track_v2(track: Dict[str, Any],
-                    source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING) -> str:
+                    source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING,
+                    writer: Optional[DataWriter] = None) -> str:
     assert V2_KEYSET <= track.keys()
 
-    writer = DataWriter()
+    if writer is None:
+        writer = DataWriter()
+    else:
+        writer.reset()
 
-    version = struct.pack('B', 2)
-    writer.write_byte(version)
+    writer.write_byte(_UBYTE.pack(2))
     _write_track_common(track, writer)
     writer.write_utf(track['sourceName'])
 
@@ -156,12 +201,16 @@ def encode_track_v2(track: Dict[str, Any],
     return b64encode(enc).decode()
 
 def encode_track_v3(track: Dict[str, Any],
-                    source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING) -> str:
+                    source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING,
+                    writer: Optional[DataWriter] = None) -> str:
     assert V3_KEYSET <= track.keys()
 
-    writer = DataWriter()
-    version = struct.pack('B', 3)
-    writer.write_byte(version)
+    if writer is None:
+        writer = DataWriter()
+    else:
+        writer.reset()
+
+    writer.write_byte(_UBYTE.pack(3))
     _write_track_common(track, writer)
     writer.write_nullable_utf(track['artworkUrl'])
     writer.write_nullable_utf(track['isrc'])
@@ -174,3 +223,115 @@ def encode_track_v3(track: Dict[str, Any],
 
     enc = writer.finish()
     return b64encode(enc).decode()
+
+def encode_tracks(tracks: Iterable[Dict[str, Any]],
+                  source_encoders: Mapping[str, Callable[[DataWriter, Dict[str, Any]], None]] = MISSING) -> List[str]:
+    """
+    Encodes multiple track dicts, reusing a single :class:`DataWriter` buffer for the whole batch.
+
+    Parameters
+    ----------
+    tracks: Iterable[Dict[str, Union[Optional[str], int, bool]]]
+        The track dicts to serialize (see :func:`encode_track` for the required keys).
+    source_encoders: Mapping[:class:`str`, Callable[[:class:`DataWriter`]]
+        A mapping of source-specific encoders to use.
+
+    Returns
+    -------
+    List[str]
+        The encoded tracks, in the same order as the input.
+    """
+    writer = DataWriter()
+    encoded = []
+
+    for track in tracks:
+
+        track_keys = track.keys()
+
+        if V3_KEYSET <= track_keys:
+            encoded.append(encode_track_v3(track, source_encoders, writer))
+        elif V2_KEYSET <= track_keys:
+            encoded.append(encode_track_v2(track, source_encoders, writer))
+        else:
+            missing_keys = [k for k in V2_KEYSET if k not in track]
+            raise Exception(
+                f'Track object is missing keys required for serialization: {", ".join(missing_keys)}'
+            )
+
+    return encoded
+
+def decode_track(track: Union[str, bytes],
+                 source_decoders: Mapping[str, Callable[[DataReader, Dict[str, Any]], None]] = MISSING) -> Tuple[int, Dict[str, Any]]:
+    """
+    Decodes a base64 track string (Lavaplayer message format, versions 1 to 3) into a track dict.
+
+    Parameters
+    ----------
+    track: Union[:class:`str`, :class:`bytes`]
+        The base64 encoded track.
+    source_decoders: Mapping[:class:`str`, Callable[[:class:`DataReader`, Dict[str, Any]]]
+        A mapping of source-specific decoders, called after ``sourceName`` is read if it matches the key.
+        Source-specific fields without a decoder are skipped.
+
+    Raises
+    ------
+    :class:`Exception`
+        If the data is truncated or isn't a valid track message.
+
+    Returns
+    -------
+    Tuple[int, Dict[str, Any]]
+        A tuple containing (track_version, track_dict).
+    """
+    data = b64decode(track)
+
+    try:
+        return _read_track(DataReader(data), data, source_decoders)
+    except (struct.error, IndexError) as e:
+        raise Exception(f'Failed to decode track: {repr(e)}')
+
+def decode_tracks(tracks: Iterable[Union[str, bytes]],
+                  source_decoders: Mapping[str, Callable[[DataReader, Dict[str, Any]], None]] = MISSING) -> List[Dict[str, Any]]:
+    """
+    Decodes multiple base64 tracks.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The decoded track dicts, in the same order as the input.
+    """
+    return [decode_track(t, source_decoders)[1] for t in tracks]
+
+def _read_track(reader: DataReader, data: bytes,
+                source_decoders: Mapping[str, Callable[[DataReader, Dict[str, Any]], None]]) -> Tuple[int, Dict[str, Any]]:
+
+    header = reader.read_int()
+    size = header & TRACK_INFO_SIZE_MASK
+
+    if size != reader.remaining:
+        raise Exception(f'Failed to decode track: expected {size} bytes, got {reader.remaining}')
+
+    version = reader.read_byte() if header & TRACK_INFO_VERSIONED else 1
+
+    track = {
+        'title': reader.read_utf(),
+        'author': reader.read_utf(),
+        'length': reader.read_long(),
+        'identifier': reader.read_utf(),
+        'isStream': reader.read_boolean(),
+        'uri': reader.read_nullable_utf() if version >= 2 else None,
+    }
+
+    if version >= 3:
+        track['artworkUrl'] = reader.read_nullable_utf()
+        track['isrc'] = reader.read_nullable_utf()
+
+    track['sourceName'] = reader.read_utf()
+
+    if source_decoders is not MISSING and track['sourceName'] in source_decoders:
+        source_decoders[track['sourceName']](reader, track)
+
+    # a posição sempre fica nos últimos 8 bytes, após os campos específicos de cada source.
+    track['position'], = _SIGNED_LONG.unpack_from(data, len(data) - 8)
+
+    return version, track
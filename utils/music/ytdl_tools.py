@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import asyncio
 import re
+from functools import lru_cache
 
 import disnake
 import yt_dlp
@@ -42,9 +43,10 @@ YTDL_OPTS = {
     }
 }
 
-class YTDLTools:
-
-    extractors = [
+@lru_cache(maxsize=None)
+def get_extractors():
+    # a lista de extractors do yt-dlp é montada somente no primeiro uso (é lenta pra carregar).
+    return [
         {
             "name": type(e).__name__.lower(),
             "ie_key": e.ie_key(),
@@ -53,6 +55,13 @@ class YTDLTools:
         } for e in yt_dlp.list_extractors() if e._VALID_URL
     ]
 
+
+class YTDLTools:
+
+    @property
+    def extractors(self):
+        return get_extractors()
+
     def extract_info(self, url: str):
         return yt_dlp.YoutubeDL(YTDL_OPTS).extract_info(url=url, download=False)
 
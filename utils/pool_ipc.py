@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+import traceback
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from utils.client import BotPool
+
+# tempo máximo que a reivindicação de uma mensagem aguarda o processo que já tem um bot no canal de voz do membro.
+claim_preferred_timeout = 1.5
+
+
+class PoolSupervisor:
+    """
+    Processo principal no modo multi-processo: inicia POOL_WORKERS processos (cada um com uma parte dos bots),
+    mantém o estado que precisa ser compartilhado entre eles (mensagens já processadas e em qual canal de voz
+    cada bot está) e reinicia os processos que terminarem ou pararem de enviar heartbeat.
+
+    Protocolo: uma mensagem json por linha via tcp (127.0.0.1).
+    """
+
+    def __init__(self, pool: BotPool, workers: int, heartbeat_timeout: int = 60):
+        self.pool = pool
+        self.workers = workers
+        self.heartbeat_timeout = heartbeat_timeout
+        self.port: Optional[int] = None
+        self.processes: Dict[int, asyncio.subprocess.Process] = {}
+        self.connections: Dict[int, asyncio.StreamWriter] = {}
+        self.last_heartbeat: Dict[int, float] = {}
+        self.worker_stats: Dict[int, dict] = {}
+        self.restarts: Dict[int, int] = {}
+        self.started: Dict[int, float] = {}
+        self.restarting = set()
+        self.claims = TTLCache(ttl=30, maxsize=20000)
+        self.voice_states: Dict[int, Dict[int, Tuple[int, int]]] = {}
+
+    async def run(self):
+
+        server = await asyncio.start_server(self.handle_connection, host="127.0.0.1", port=0)
+        self.port = server.sockets[0].getsockname()[1]
+
+        print(f"🧩 - マルチプロセスモード: {self.workers}個のプロセスでボットを起動します (IPCポート: {self.port})")
+
+        for worker_id in range(self.workers):
+            await self.spawn(worker_id)
+
+        while True:
+            await asyncio.sleep(5)
+            try:
+                await self.health_check()
+            except Exception:
+                traceback.print_exc()
+
+    async def spawn(self, worker_id: int):
+
+        env = dict(
+            os.environ,
+            POOL_WORKER_ID=str(worker_id),
+            POOL_WORKERS=str(self.workers),
+            POOL_IPC_PORT=str(self.port),
+        )
+
+        self.processes[worker_id] = await asyncio.create_subprocess_exec(sys.executable, sys.argv[0], env=env)
+        self.started[worker_id] = time.monotonic()
+        self.last_heartbeat.pop(worker_id, None)
+
+        print(f"🧩 - プロセス {worker_id} を起動しました (PID: {self.processes[worker_id].pid})")
+
+    async def health_check(self):
+
+        now = time.monotonic()
+
+        for worker_id, process in list(self.processes.items()):
+
+            if worker_id in self.restarting:
+                continue
+
+            if process.returncode is None:
+
+                try:
+                    last_heartbeat = self.last_heartbeat[worker_id]
+                except KeyError:
+                    # o processo ainda está iniciando (carregando módulos/conectando os bots).
+                    last_heartbeat = self.started[worker_id] + self.heartbeat_timeout * 4
+
+                if now - last_heartbeat < self.heartbeat_timeout:
+                    continue
+
+                print(f"⚠️ - プロセス {worker_id} が応答しません。再起動します...")
+
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+
+            else:
+                print(f"⚠️ - プロセス {worker_id} が終了しました (コード: {process.returncode})。再起動します...")
+
+            self.restarting.add(worker_id)
+            asyncio.create_task(self.restart(worker_id))
+
+    async def restart(self, worker_id: int):
+
+        try:
+            await self.processes[worker_id].wait()
+
+            self.drop_worker(worker_id)
+
+            # reinícios seguidos aguardam cada vez mais (o contador é zerado após 10 minutos funcionando normalmente).
+            if time.monotonic() - self.started[worker_id] > 600:
+                self.restarts[worker_id] = 0
+
+            restarts = self.restarts[worker_id] = self.restarts.get(worker_id, 0) + 1
+
+            await asyncio.sleep(min(5 * 2 ** (restarts - 1), 300))
+
+            await self.spawn(worker_id)
+
+        except Exception:
+            traceback.print_exc()
+
+        finally:
+            self.restarting.discard(worker_id)
+
+    def drop_worker(self, worker_id: int):
+
+        try:
+            self.connections.pop(worker_id).close()
+        except Exception:
+            pass
+
+        self.worker_stats.pop(worker_id, None)
+
+        for guild_id, states in list(self.voice_states.items()):
+            for bot_id, (channel_id, worker) in list(states.items()):
+                if worker == worker_id:
+                    del states[bot_id]
+            if not states:
+                del self.voice_states[guild_id]
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+
+        worker_id = None
+
+        try:
+            while line := await reader.readline():
+
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+
+                op = data.get("op")
+
+                if op == "hello":
+                    worker_id = data["worker"]
+                    self.connections[worker_id] = writer
+                    self.last_heartbeat[worker_id] = time.monotonic()
+
+                elif worker_id is None:
+                    continue
+
+                elif op == "heartbeat":
+                    self.last_heartbeat[worker_id] = time.monotonic()
+                    self.worker_stats[worker_id] = data.get("stats", {})
+
+                elif op == "voice":
+                    self.update_voice_state(worker_id, data)
+
+                elif op == "claim":
+                    asyncio.create_task(self.reply_claim(writer, worker_id, data))
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            traceback.print_exc()
+        finally:
+            if worker_id is not None and self.connections.get(worker_id) is writer:
+                del self.connections[worker_id]
+            writer.close()
+
+    def update_voice_state(self, worker_id: int, data: dict):
+
+        states = self.voice_states.setdefault(data["guild_id"], {})
+
+        if data.get("channel_id"):
+            states[data["bot_id"]] = (data["channel_id"], worker_id)
+        else:
+            states.pop(data["bot_id"], None)
+            if not states:
+                del self.voice_states[data["guild_id"]]
+
+    def preferred_worker(self, guild_id: int, channel_id: Optional[int]):
+
+        if not channel_id:
+            return
+
+        for voice_channel_id, worker_id in self.voice_states.get(guild_id, {}).values():
+            if voice_channel_id == channel_id:
+                return worker_id
+
+    async def claim(self, worker_id: int, key: str, guild_id: int, channel_id: Optional[int]) -> bool:
+
+        try:
+            future, preferred = self.claims[key]
+        except KeyError:
+
+            future = asyncio.get_running_loop().create_future()
+            preferred = self.preferred_worker(guild_id, channel_id)
+            self.claims[key] = (future, preferred)
+
+            if preferred is None or preferred == worker_id or preferred not in self.connections:
+                future.set_result(worker_id)
+            else:
+                # o membro está num canal de voz com um bot de outro processo: ele tem prioridade se também
+                # recebeu a mensagem.
+                asyncio.get_running_loop().call_later(
+                    claim_preferred_timeout, lambda: future.done() or future.set_result(worker_id)
+                )
+
+        else:
+            if preferred == worker_id and not future.done():
+                future.set_result(worker_id)
+
+        return (await asyncio.shield(future)) == worker_id
+
+    async def reply_claim(self, writer: asyncio.StreamWriter, worker_id: int, data: dict):
+
+        try:
+            result = await self.claim(worker_id, data["key"], data["guild_id"], data.get("channel_id"))
+        except Exception:
+            traceback.print_exc()
+            result = True
+
+        try:
+            writer.write(json.dumps({"op": "reply", "id": data["id"], "result": result}).encode() + b"\n")
+            await writer.drain()
+        except Exception:
+            pass
+
+    def summary(self):
+        return {
+            worker_id: {
+                "pid": process.pid,
+                "alive": process.returncode is None,
+                "restarts": self.restarts.get(worker_id, 0),
+                "stats": self.worker_stats.get(worker_id, {}),
+            }
+            for worker_id, process in self.processes.items()
+        }
+
+
+class PoolIPCClient:
+    """
+    Conexão de um processo (worker) da pool com o supervisor. Em caso de falha na comunicação as operações
+    consideram que o processo pode seguir sozinho (mesmo comportamento do modo de processo único).
+    """
+
+    def __init__(self, pool: BotPool, worker_id: int, port: int, heartbeat_interval: int = 10):
+        self.pool = pool
+        self.worker_id = worker_id
+        self.port = port
+        self.heartbeat_interval = heartbeat_interval
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.counter = itertools.count()
+        self.parent_pid = os.getppid()
+
+    @property
+    def is_connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def run(self):
+
+        asyncio.create_task(self.heartbeat_task())
+
+        while True:
+
+            try:
+                reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+                self.send("hello", worker=self.worker_id)
+
+                while line := await reader.readline():
+                    data = json.loads(line)
+                    if data.get("op") == "reply":
+                        try:
+                            self.pending.pop(data["id"]).set_result(data["result"])
+                        except (KeyError, asyncio.InvalidStateError):
+                            pass
+
+            except (ConnectionError, OSError):
+                pass
+            except Exception:
+                traceback.print_exc()
+
+            self.writer = None
+
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_result(None)
+
+            self.pending.clear()
+
+            await asyncio.sleep(3)
+
+    async def heartbeat_task(self):
+
+        while True:
+
+            # o supervisor foi encerrado: finaliza o processo para não deixar bots duplicados rodando.
+            if os.getppid() != self.parent_pid:
+                print(f"⚠️ - プロセス {self.worker_id}: スーパーバイザーが終了したため、プロセスを終了します。")
+                os._exit(1)
+
+            bots = self.pool.get_all_bots()
+
+            self.send(
+                "heartbeat",
+                stats={
+                    "bots": len(bots),
+                    "ready": len([b for b in bots if b.bot_ready]),
+                    "guilds": sum(len(b.guilds) for b in bots),
+                    "players": sum(len(b.music.players) for b in bots),
+                }
+            )
+
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def send(self, op: str, **data):
+
+        if not self.is_connected:
+            return
+
+        try:
+            self.writer.write(json.dumps(dict(data, op=op)).encode() + b"\n")
+        except Exception:
+            traceback.print_exc()
+
+    async def request(self, op: str, timeout: float = 5, **data):
+
+        if not self.is_connected:
+            return
+
+        request_id = next(self.counter)
+
+        future = self.pending[request_id] = asyncio.get_running_loop().create_future()
+
+        self.send(op, id=request_id, **data)
+
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.pending.pop(request_id, None)
+
+    async def claim(self, key: str, guild_id: int, channel_id: Optional[int] = None) -> bool:
+        result = await self.request("claim", key=key, guild_id=guild_id, channel_id=channel_id)
+        return result is not False
+
+    def update_voice_state(self, guild_id: int, bot_id: int, channel_id: Optional[int]):
+        self.send("voice", guild_id=guild_id, bot_id=bot_id, channel_id=channel_id)
@@ -22,7 +22,6 @@ SOFTWARE.
 """
 import asyncio
 import logging
-from json import dumps
 from typing import Optional, Union
 
 import aiohttp
@@ -31,6 +30,7 @@ from disnake.ext import commands
 from .errors import *
 from .node import Node
 from .player import Player
+from .serializers import dumps
 
 __log__ = logging.getLogger(__name__)
 
@@ -57,6 +57,8 @@ class Client:
         self.bot = bot
         self.loop = bot.loop or asyncio.get_event_loop()
         self.session = session
+        # Optional separate session for node websockets (defaults to ``session``).
+        self.ws_session: Optional[aiohttp.ClientSession] = None
 
         self.nodes = {}
 
@@ -197,11 +199,12 @@ class Client:
         Optional[:class:`wavelink.node.Node`]
             The best available :class:`wavelink.node.Node` available to the :class:`.Client`.
         """
-        nodes = [n for n in self.nodes.values() if n != ignore_node and n.available and n.is_available]
+        nodes = [n for n in self.nodes.values() if n != ignore_node and n.available and n.is_available and not n.draining]
         if not nodes:
             return None
 
-        return sorted(nodes, key=lambda n: len(n.players))[0]
+        # nodes that are degrading/unhealthy only receive players when there is no healthier node.
+        return sorted(nodes, key=lambda n: (n.health, len(n.players)))[0]
 
     def get_node_by_region(self, region: str) -> Optional[Node]:
         """Retrieve the best available Node with the given region.
@@ -23,7 +23,6 @@ SOFTWARE.
 import asyncio
 import datetime
 import inspect
-import json
 import logging
 import os
 import re
@@ -31,12 +30,14 @@ import traceback
 from typing import Any, Callable, Dict, Optional, Union
 from urllib.parse import quote
 
-from rapidfuzz import fuzz
-
+from utils import metrics
+from utils.music.matching import filter_by_title, has_exclude_tags
 from utils.music.youtube_trusted_session_generator import Browser
 from .backoff import ExponentialBackoff
 from .errors import *
 from .player import Player, Track, TrackPlaylist
+from .serializers import dumps as json_dumps, loads, read_json
+from .stats import StatsHistory
 from .websocket import WebSocket
 
 __log__ = logging.getLogger(__name__)
@@ -46,8 +47,16 @@ yt_video_regex = re.compile(r"(?:v=|/)([0-9A-Za-z_-]{11})(?:[&?]|$)")
 spotify_regex = re.compile("https://open.spotify.com?.+(album|playlist|artist)/([a-zA-Z0-9]+)")
 deezer_regex = re.compile(r"(https?://)?(www\.)?deezer\.com/(?P<countrycode>[a-zA-Z]{2}/)?(?P<type>album|playlist|artist|profile)/(?P<identifier>[0-9]+)")
 soundcloud_regex = re.compile(r"https://soundcloud\.com/([^/]+)/sets/([^/]+)")
+search_prefix_regex = re.compile(r"^[a-z0-9]+search:", re.IGNORECASE)
+
+
+def normalize_query(query: str) -> str:
+    query = query.strip()
+    # buscas (ex: ytsearch:...) não diferenciam maiúsculas/minúsculas nem espaços extras, já links sim.
+    if search_prefix_regex.match(query):
+        return " ".join(query.lower().split())
+    return query
 
-exclude_tags = ["remix", "edit", "extend", "compilation", "mashup", "mixed"]
 
 class Node:
     """A WaveLink Node instance.
@@ -86,7 +95,7 @@ class Node:
                  user_agent: str = None,
                  auto_reconnect: bool = True,
                  resume_key: Optional[str] = None,
-                 dumps: Callable[[Dict[str, Any]], Union[str, bytes]] = json.dumps,
+                 dumps: Callable[[Dict[str, Any]], Union[str, bytes]] = json_dumps,
                  version: int = 3,
                  **kwargs
                  ):
@@ -121,7 +130,8 @@ class Node:
         self.available = True
         self.restarting = False
 
-        self.stats = None
+        self._stats = None
+        self._stats_history = StatsHistory()
         self.info = {}
 
         self.update_info()
@@ -165,6 +175,14 @@ class Node:
 
         return ws_connected and self.available and not self._closing and not self._is_connecting
 
+    @property
+    def draining(self) -> bool:
+        """Whether this node is being drained (its players are moved away and no new players are sent to it)."""
+        try:
+            return self.identifier in self._client.bot.pool.draining_nodes
+        except AttributeError:
+            return False
+
     def close(self) -> None:
         """Close the node and make it unavailable."""
         self.available = False
@@ -173,6 +191,43 @@ class Node:
         """Open the node and make it available."""
         self.available = True
 
+    @property
+    def stats(self):
+        """The latest stats received for this Lavalink server (shared by the nodes of every bot in the pool)."""
+        try:
+            return self._client.bot.pool.lavalink_stats[self.rest_uri]
+        except (AttributeError, KeyError):
+            return self._stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stats = value
+        try:
+            self._client.bot.pool.lavalink_stats[self.rest_uri] = value
+        except AttributeError:
+            pass
+
+        if value and self.stats_history.add(value):
+            level, reasons = self.stats_history.check()
+            metrics.lavalink_node_health.set(level, node=self.identifier)
+            for key in ("frame_loss", "cpu", "memory"):
+                if (current := self.stats_history.mean(key)) is not None:
+                    metrics.lavalink_node_stats.set(current, node=self.identifier, stat=key)
+                    metrics.lavalink_node_trend.set(self.stats_history.trend(key) * 60, node=self.identifier, stat=key)
+
+    @property
+    def stats_history(self) -> StatsHistory:
+        """Rolling history of the stats of this Lavalink server (shared by the nodes of every bot in the pool)."""
+        try:
+            return self._client.bot.pool.lavalink_stats_history.setdefault(self.rest_uri, self._stats_history)
+        except AttributeError:
+            return self._stats_history
+
+    @property
+    def health(self) -> int:
+        """0: healthy, 1: degrading (trend predicts a limit will be reached soon), 2: unhealthy."""
+        return self.stats_history.check()[0]
+
     @property
     def penalty(self) -> float:
         """Returns the load-balancing penalty for this node."""
@@ -288,7 +343,7 @@ class Node:
         if not self.session_id:
             try:
                 player = self._client.bot.music.players[guild_id]
-                player._new_node_task = player.bot.loop.create_task(player._wait_for_new_node())
+                player.bot.reconnect_manager.migrate(player, restart=False)
                 return
             except:
                 pass
@@ -299,22 +354,26 @@ class Node:
         uri: str = f"{self.rest_uri}/v4/sessions/{self.session_id}/players/{guild_id}?noReplace={no_replace}"
 
         retries = 3
+        backoff = ExponentialBackoff(base=0.75)
 
         while retries > 0:
 
-            async with self.session.patch(url=uri, json=data, headers=self._websocket.headers) as resp:
+            with metrics.lavalink_update_player.time(node=self.identifier):
+                async with self.session.patch(url=uri, json=data, headers=self._websocket.headers) as resp:
 
-                try:
-                    resp_data = await resp.json()
-                except:
-                    resp_data = await resp.text()
+                    try:
+                        resp_data = await read_json(resp)
+                    except:
+                        resp_data = await resp.text()
+
+            if resp.status == 200:
+                return resp_data
 
-                if resp.status == 200:
-                    return resp_data
+            metrics.lavalink_errors.inc(node=self.identifier, endpoint="update_player")
 
-                retries -= 1
+            retries -= 1
 
-                await asyncio.sleep(1.5)
+            await asyncio.sleep(backoff.delay())
 
         if new_node := self._client.get_best_node(ignore_node=self):
             await self.players[guild_id].change_node(new_node.identifier)
@@ -322,6 +381,50 @@ class Node:
 
         raise WavelinkException(f"{self.identifier}: UpdatePlayer Failed = {resp.status}: {resp_data}")
 
+    @property
+    def compatibility_key(self) -> str:
+        """Identifies nodes whose loadtracks results (and encoded tracks) can be reused by each other."""
+
+        # v3 has no /info endpoint: its sourceManagers are synthesized and say nothing about the installed plugins.
+        if self.version < 4 or not self.info.get("sourceManagers"):
+            return f"node:{self.identifier}"
+
+        plugins = self.info.get("plugins") or {}
+
+        if isinstance(plugins, dict):
+            plugins = sorted(f"{k}:{v}" for k, v in plugins.items())
+        else:
+            plugins = sorted(f"{p.get('name')}:{p.get('version')}" for p in plugins)
+
+        return f"v{self.version}:{','.join(sorted(self.info['sourceManagers']))}:{','.join(plugins)}"
+
+    async def request_tracks(self, query: str, *, retry_on_failure: bool = False) -> Optional[bytes]:
+
+        backoff = ExponentialBackoff(base=1)
+
+        base_uri = f'{self.rest_uri}/v4' if self.version == 4 else self.rest_uri
+
+        for attempt in range(2):
+
+            with metrics.lavalink_loadtracks.time(node=self.identifier):
+                async with self.session.get(f"{base_uri}/loadtracks?identifier={quote(query)}", headers={'Authorization': self.password}) as resp:
+                    status = resp.status
+                    if status == 200:
+                        return await resp.read()
+
+            metrics.lavalink_errors.inc(node=self.identifier, endpoint="loadtracks")
+
+            if not retry_on_failure:
+                __log__.info(f'REST | {self.identifier} | Status code ({status}) while retrieving tracks. Not retrying.')
+                return
+
+            retry = backoff.delay()
+
+            __log__.info(f'REST | {self.identifier} | Status code ({status}) while retrieving tracks. '
+                         f'Attempt {attempt} of 5, retrying in {retry} seconds.')
+
+            await asyncio.sleep(retry)
+
     async def get_tracks(self, query: str, *, retry_on_failure: bool = False, **kwargs) -> Union[list, TrackPlaylist, None]:
         """|coro|
 
@@ -343,8 +446,6 @@ class Node:
             A list of or TrackPlaylist instance of :class:`wavelink.player.Track` objects.
             This could be None if no tracks were found.
         """
-        backoff = ExponentialBackoff(base=1)
-
         ytid = None
         playlist_id = None
 
@@ -377,35 +478,29 @@ class Node:
 
         if not (data:=self._client.bot.pool.playlist_cache.get(cache_key)):
 
-            base_uri = f'{self.rest_uri}/v4' if self.version == 4 else self.rest_uri
-
-            for attempt in range(2):
-
-                async with self.session.get(f"{base_uri}/loadtracks?identifier={quote(query)}", headers={'Authorization': self.password}) as resp:
-
-                    if resp.status != 200:
-
-                        if not retry_on_failure:
-                            __log__.info(f'REST | {self.identifier} | Status code ({resp.status}) while retrieving tracks. Not retrying.')
-                            return
+            # o resultado é compartilhado entre os bots da pool (e entre nodes com os mesmos sources/plugins).
+            shared_key = f"{self.compatibility_key}:{normalize_query(query)}"
 
-                        retry = backoff.delay()
+            loadtracks_cache = self._client.bot.pool.loadtracks_cache
 
-                        __log__.info(f'REST | {self.identifier} | Status code ({resp.status}) while retrieving tracks. '
-                                     f'Attempt {attempt} of 5, retrying in {retry} seconds.')
+            body = await loadtracks_cache.get(
+                shared_key, lambda: self.request_tracks(query, retry_on_failure=retry_on_failure)
+            )
 
-                        await asyncio.sleep(retry)
-                        continue
+            if not body:
+                return
 
-                    try:
-                        data = await resp.json()
-                    except Exception as e:
-                        raise WavelinkException(f"{self.identifier}: Failed to parse json result. | Error: {repr(e)}")
+            try:
+                data = loads(body)
+            except Exception as e:
+                loadtracks_cache.discard(shared_key)
+                raise WavelinkException(f"{self.identifier}: Failed to parse json result. | Error: {repr(e)}")
 
-                    if isinstance(data, list):
-                        return data
+            if isinstance(data, list):
+                return data
 
-                    break
+            if data.get('loadType') in ('LOAD_FAILED', 'error', 'NO_MATCHES', 'empty'):
+                loadtracks_cache.discard(shared_key)
 
         loadtype = data.get('loadType')
 
@@ -531,13 +626,13 @@ class Node:
                     else:
                         return t.title.lower()
 
-                tracks_ = [t for t in tracks_ if fuzz.token_sort_ratio(chk(t), search) >= check_title]
+                tracks_ = filter_by_title(search, tracks_, [chk(t) for t in tracks_], check_title)
 
             else:
-                tracks_ = [t for t in tracks_ if fuzz.token_sort_ratio(f"{t.author} - {t.title}".lower(), search) >= check_title]
+                tracks_ = filter_by_title(search, tracks_, [f"{t.author} - {t.title}".lower() for t in tracks_], check_title)
 
-            if not any(tag for tag in exclude_tags if tag in search.lower()):
-                return [t for t in tracks_ if not any(tag for tag in exclude_tags if tag in t.title.lower())]
+            if not has_exclude_tags(search):
+                return [t for t in tracks_ if not has_exclude_tags(t.title)]
 
             return tracks_
 
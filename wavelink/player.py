@@ -39,6 +39,8 @@ from .events import *
 __all__ = ('Track', 'TrackPlaylist', 'Player')
 __log__ = logging.getLogger(__name__)
 
+ytid_regex = re.compile(r"^[a-zA-Z0-9_-]{11}$")
+
 
 class WavelinkVoiceClient(VoiceClient):
 
@@ -133,7 +135,7 @@ class Track:
 
         self.title = info.get('title', '')[:97]
         self.identifier = info.get('identifier', '')
-        self.ytid = self.identifier if re.match(r"^[a-zA-Z0-9_-]{11}$", self.identifier) else None
+        self.ytid = self.identifier if ytid_regex.match(self.identifier) else None
         self.length = info.get('length')
         self.duration = self.length
         self.author = info.get('author', '')[:97]
@@ -308,22 +310,23 @@ class Player:
         if self.node.version == 3:
             if {'sessionId', 'event'} == self._voice_state.keys():
                 await self.node._send(op='voiceUpdate', guildId=str(self.guild_id), **self._voice_state)
-        else:
-            try:
-                data = {
-                    "voice": {
-                        "sessionId": self._voice_state["sessionId"],
-                        "token": self._voice_state["event"]["token"],
-                        "endpoint": self._voice_state["event"]["endpoint"]
+        elif voice := self._voice_payload():
+            await self.node.update_player(self.guild_id, data={"voice": voice})
 
-                    }
-                }
-            except KeyError:
-                pprint.pprint(self._voice_state)
-                traceback.print_exc()
-                return
+    def _voice_payload(self) -> Optional[dict]:
 
-            await self.node.update_player(self.guild_id, data=data)
+        if not self._voice_state:
+            return
+
+        try:
+            return {
+                "sessionId": self._voice_state["sessionId"],
+                "token": self._voice_state["event"]["token"],
+                "endpoint": self._voice_state["event"]["endpoint"]
+            }
+        except KeyError:
+            pprint.pprint(self._voice_state)
+            traceback.print_exc()
 
     async def hook(self, event) -> None:
         if isinstance(event, TrackEnd) and event.reason in ("STOPPED", "FINISHED"):
@@ -670,25 +673,41 @@ class Player:
         self.node = node
         self.node.players[int(self.guild_id)] = self
 
-        if self.current and not self.auto_pause:
-            if self.node.version == 3:
+        if self.node.version == 3:
+
+            if self.current and not self.auto_pause:
                 await self.node._send(op='play', guildId=str(self.guild_id), track=self.current_encoded, startTime=int(self.position))
                 if self.paused:
                     await self.node._send(op='pause', guildId=str(self.guild_id), pause=self.paused)
-            else:
-                payload = {
+                self.last_update = time.time() * 1000
+
+            if self._voice_state:
+                await self._dispatch_voice_update()
+
+            if self.volume != 100:
+                await self.node._send(op='volume', guildId=str(self.guild_id), volume=self.volume)
+
+            return
+
+        # The whole player state (track, position, pause, volume, filters and voice) is sent in a single request.
+        payload = {
+            "volume": self.volume,
+            "filters": self.filters,
+        }
+
+        if self.current and not self.auto_pause:
+            payload.update(
+                {
                     "encodedTrack": self.current_encoded,
-                    "volume": self.volume,
                     "position": int(self.position),
                     "paused": self.paused,
-                    "filters": self.filters,
                 }
-                await self.node.update_player(self.guild_id, payload, replace=True)
+            )
 
-            self.last_update = time.time() * 1000
+        if voice := self._voice_payload():
+            payload["voice"] = voice
 
-        if self._voice_state:
-            await self._dispatch_voice_update()
+        await self.node.update_player(self.guild_id, payload, replace=True)
 
-        if self.volume != 100 and self.node.version == 3:
-            await self.node._send(op='volume', guildId=str(self.guild_id), volume=self.volume)
+        if "encodedTrack" in payload:
+            self.last_update = time.time() * 1000
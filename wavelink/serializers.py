@@ -0,0 +1,68 @@
+"""MIT License
+
+Copyright (c) 2019-2020 PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+from typing import Any, Callable, Union
+
+__all__ = ('backend', 'loads', 'dumps', 'read_json')
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if orjson is not None:
+    backend = 'orjson'
+    loads: Callable[[Union[str, bytes]], Any] = orjson.loads
+    dumps: Callable[[Any], Union[str, bytes]] = orjson.dumps
+
+elif msgspec is not None:
+    backend = 'msgspec'
+    loads = msgspec.json.decode
+    dumps = msgspec.json.encode
+
+else:
+    backend = 'json'
+    loads = json.loads
+    dumps = json.dumps
+
+
+async def read_json(response) -> Any:
+    """|coro|
+
+    Reads and decodes the body of an :class:`aiohttp.ClientResponse` using the fastest available JSON backend.
+
+    The raw bytes are handed directly to orjson/msgspec, skipping the intermediate str decode that
+    ``ClientResponse.json()`` does.
+    """
+    data = await response.read()
+
+    if backend == 'json':
+        return loads(data.decode(response.get_encoding()))
+
+    return loads(data)
@@ -19,6 +19,9 @@ AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE."""
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 
 
 class Penalty:
@@ -63,3 +66,124 @@ class Stats:
         self.frames_nulled = frame_stats.get('nulled', -1)
         self.frames_deficit = frame_stats.get('deficit', -1)
         self.penalty = Penalty(self)
+
+
+# Limits used to rank nodes by health (frame loss and memory/cpu usage in percent).
+default_health_limits = {"frame_loss": 1.0, "cpu": 90.0, "memory": 90.0}
+
+health_labels = ("healthy", "degrading", "unhealthy")
+
+
+class StatsHistory:
+    """A ring buffer with the latest stats received from a Lavalink server.
+
+    Keeps rolling aggregates and a linear trend of frame loss, cpu and memory usage so a node can be
+    avoided (or have players moved away) before the audio starts to degrade.
+    """
+
+    stats_interval = 60
+
+    def __init__(self, maxlen: int = 60, min_interval: float = 30, horizon: float = 300):
+        self.samples = deque(maxlen=maxlen)
+        # every bot of the pool receives the same stats from the server, only one sample per interval is kept.
+        self.min_interval = min_interval
+        self.horizon = horizon
+
+    def add(self, stats: Stats) -> bool:
+
+        now = time.monotonic()
+
+        if self.samples:
+
+            if now - self.samples[-1][0] < self.min_interval:
+                return False
+
+            # a gap in the samples (node disconnected) or a lower uptime (server restarted) starts a new series.
+            if now - self.samples[-1][0] > self.max_age or stats.uptime < self.samples[-1][1]["uptime"]:
+                self.samples.clear()
+
+        if stats.frames_deficit != -1:
+            # frame stats are the average per player in the last minute (3000 frames per minute).
+            frame_loss = (max(stats.frames_nulled, 0) + stats.frames_deficit) / 30
+        else:
+            frame_loss = None
+
+        self.samples.append(
+            (
+                now,
+                {
+                    "frame_loss": frame_loss,
+                    "cpu": stats.system_load * 100,
+                    "lavalink_cpu": stats.lavalink_load * 100,
+                    "memory": stats.memory_used / stats.memory_reservable * 100 if stats.memory_reservable else None,
+                    "players": stats.playing_players,
+                    "uptime": stats.uptime,
+                }
+            )
+        )
+
+        return True
+
+    @property
+    def max_age(self) -> float:
+        # Lavalink sends stats once a minute, so min_interval alone would make every sample look stale.
+        return max(self.min_interval, self.stats_interval) * 2
+
+    def values(self, key: str, window: int = None) -> List[Tuple[float, float]]:
+        # stats stopped arriving: the last samples no longer describe the server.
+        if not self.samples or time.monotonic() - self.samples[-1][0] > self.max_age:
+            return []
+        samples = list(self.samples)[-window:] if window else self.samples
+        return [(t, data[key]) for t, data in samples if data[key] is not None]
+
+    def mean(self, key: str, window: int = 3) -> Optional[float]:
+        if not (values := self.values(key, window)):
+            return None
+        return sum(v for t, v in values) / len(values)
+
+    def trend(self, key: str, window: int = 10) -> float:
+        """Least squares slope (change per second) of the latest samples."""
+
+        values = self.values(key, window)
+
+        if len(values) < 3:
+            return 0.0
+
+        start = values[0][0]
+        xs = [t - start for t, v in values]
+        ys = [v for t, v in values]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+
+        if not (variance := sum((x - mean_x) ** 2 for x in xs)):
+            return 0.0
+
+        return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+    def predict(self, key: str, seconds: float = None) -> Optional[float]:
+
+        if (current := self.mean(key)) is None:
+            return None
+
+        return max(current + self.trend(key) * (seconds or self.horizon), 0)
+
+    def check(self, limits: Dict[str, float] = None) -> Tuple[int, List[str]]:
+        """Return the health level (0: healthy, 1: degrading, 2: unhealthy) and the reasons found."""
+
+        level = 0
+        reasons = []
+
+        for key, limit in (limits or default_health_limits).items():
+
+            if not limit or (current := self.mean(key)) is None:
+                continue
+
+            if current >= limit:
+                level = 2
+                reasons.append(f"{key}: {current:.1f}%")
+
+            elif (predicted := self.predict(key)) >= limit:
+                level = max(level, 1)
+                reasons.append(f"{key}: {current:.1f}% -> {predicted:.1f}%")
+
+        return level, reasons
@@ -30,6 +30,7 @@ import aiohttp
 
 from .backoff import ExponentialBackoff
 from .events import *
+from .serializers import loads
 from .stats import Stats
 
 __log__ = logging.getLogger(__name__)
@@ -105,7 +106,8 @@ class WebSocket:
                 uri = f'ws://{base_uri}'
 
             if not self.is_connected:
-                self._websocket = await self._node.session.ws_connect(uri, headers=self.headers, heartbeat=self._node.heartbeat)
+                session = self._node._client.ws_session or self._node.session
+                self._websocket = await session.ws_connect(uri, headers=self.headers, heartbeat=self._node.heartbeat)
 
         except Exception as error:
             self._node.session_id = None
@@ -165,10 +167,19 @@ class WebSocket:
                 __log__.debug(f'WEBSOCKET | Received Payload:: <{msg.data}>')
 
                 try:
-                    json_data = msg.json()
+                    json_data = msg.json(loads=loads)
                 except Exception:
                     traceback.print_exc()
                     print(repr(msg))
+                    continue
+
+                # playerUpdate/stats não possuem awaits reais, então são processados aqui mesmo
+                # evitando criar uma task para cada frame recebido.
+                if json_data.get('op') in ('playerUpdate', 'stats'):
+                    try:
+                        await self.process_data(json_data)
+                    except Exception:
+                        traceback.print_exc()
                 else:
                     self.bot.loop.create_task(self.process_data(json_data))
 
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+import hmac
 import json
 import logging
 from os import environ
@@ -16,6 +17,7 @@ import tornado.websocket
 from packaging import version
 
 from config_loader import load_config
+from utils import metrics
 
 if TYPE_CHECKING:
     from utils.client import BotPool
@@ -134,6 +136,38 @@ class IndexHandler(tornado.web.RequestHandler):
         self.write(msg)
 
 
+class MetricsHandler(tornado.web.RequestHandler):
+
+    def initialize(self, pool: Optional[BotPool] = None, config: dict = None):
+        self.pool = pool
+        self.config = config
+
+    def get(self):
+
+        if token := self.config.get("METRICS_AUTH_TOKEN"):
+            auth = self.request.headers.get("Authorization", "")
+            if auth.startswith("Bearer "):
+                auth = auth[7:]
+            if not hmac.compare_digest(auth.encode(), token.encode()):
+                self.set_status(401)
+                return
+
+        players = metrics.registry.gauge("musicbot_players", "Players ativos por bot.")
+        latency = metrics.registry.gauge("musicbot_gateway_latency_seconds", "Latência do gateway do discord por bot.")
+
+        for bot in self.pool.get_all_bots():
+            if not bot.is_ready():
+                # bot desconectado: não exportar os últimos valores como se estivesse funcionando.
+                players.remove(bot=bot.identifier)
+                latency.remove(bot=bot.identifier)
+                continue
+            players.set(len(bot.music.players), bot=bot.identifier)
+            latency.set(bot.latency, bot=bot.identifier)
+
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(metrics.registry.render())
+
+
 class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
     def __init__(self, *args, **kwargs):
@@ -430,6 +464,7 @@ def run_app(pool: BotPool, message: str = "", config: dict = None):
     app = tornado.web.Application([
         (r'/', IndexHandler, {'pool': pool, 'message': message, 'config': config}),
         (r'/ws', WebSocketHandler),
+        (r'/metrics', MetricsHandler, {'pool': pool, 'config': config}),
     ])
 
     app.listen(port=config.get("PORT") or environ.get("PORT", 80))